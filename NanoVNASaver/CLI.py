@@ -0,0 +1,130 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+Headless sweeps for test stations, e.g.
+
+    NanoVNASaver sweep --start 1M --stop 30M --cal sol.cal --out dut.s2p
+
+Sweeps run on the Qt-free SweepEngine, PyQt5 is never imported.
+"""
+import argparse
+import logging
+import sys
+from typing import List
+
+from NanoVNASaver.Calibration import Calibration
+from NanoVNASaver.Formatting import parse_frequency
+from NanoVNASaver.Hardware.Hardware import Interface, get_interfaces, get_VNA
+from NanoVNASaver.Hardware.VNA import VNA
+from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.Settings.Sweep import Sweep
+from NanoVNASaver.Touchstone import Touchstone
+from NanoVNASaver.core import SweepEngine
+
+logger = logging.getLogger(__name__)
+
+
+def _frequency(value: str) -> int:
+    freq = parse_frequency(value)
+    if freq < 0:
+        raise argparse.ArgumentTypeError(f"invalid frequency: {value}")
+    return freq
+
+
+def add_parser(subparsers: argparse._SubParsersAction):
+    parser = subparsers.add_parser(
+        "sweep", help="sweep without GUI and write a Touchstone file",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-p", "--port",
+                        help="serial port, default: first detected device")
+    parser.add_argument("--start", type=_frequency, required=True,
+                        help="start frequency, e.g. 1M")
+    parser.add_argument("--stop", type=_frequency, required=True,
+                        help="stop frequency, e.g. 30M")
+    parser.add_argument("--points", type=int, default=101,
+                        help="data points per segment (default: 101)")
+    parser.add_argument("--segments", type=int, default=1,
+                        help="number of segments (default: 1)")
+    parser.add_argument("--cal", help="calibration file to apply")
+    parser.add_argument("--out", default="-",
+                        help="Touchstone file, .s1p or .s2p"
+                             " (default: s2p on stdout)")
+
+
+def open_vna(port: str = None) -> VNA:
+    if port:
+        iface = Interface("serial", "command line")
+        iface.port = port
+    else:
+        interfaces = get_interfaces()
+        if not interfaces:
+            raise IOError("No device found")
+        iface = interfaces[0]
+    logger.info("Connecting to %s", iface)
+    iface.open()
+    return get_VNA(iface)
+
+
+def load_calibration(filename: str) -> Calibration:
+    calibration = Calibration()
+    calibration.load(filename)
+    calibration.calc_corrections()
+    return calibration
+
+
+def write_touchstone(filename: str, data11: List[Datapoint],
+                     data21: List[Datapoint]):
+    ts = Touchstone(filename)
+    ts.s11data = data11
+    nr_params = 1
+    if filename == "-" or filename.lower().endswith(".s2p"):
+        nr_params = 4
+        ts.s21data = data21
+        ts.s12data = [Datapoint(dp.freq, 0, 0) for dp in data11]
+        ts.s22data = [Datapoint(dp.freq, 0, 0) for dp in data11]
+    if filename == "-":
+        sys.stdout.write(ts.saves(nr_params))
+    else:
+        ts.save(nr_params)
+
+
+def run(args: argparse.Namespace) -> int:
+    try:
+        sweep = Sweep(args.start, args.stop, args.points, args.segments)
+        calibration = load_calibration(args.cal) if args.cal else None
+        vna = open_vna(args.port)
+    except (IOError, ValueError) as exc:
+        logger.error("%s", exc)
+        return 1
+    try:
+        if args.points not in vna.valid_datapoints:
+            logger.error("%s supports %s data points", vna.name,
+                         ", ".join(str(p) for p in vna.valid_datapoints))
+            return 1
+        vna.datapoints = args.points
+        data11, data21 = SweepEngine(vna, calibration).measure(sweep)
+    except IOError as exc:
+        logger.error("Sweep failed: %s", exc)
+        return 1
+    finally:
+        vna.serial.close()
+
+    write_touchstone(args.out, data11, data21)
+    return 0
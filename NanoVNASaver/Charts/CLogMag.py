@@ -20,8 +20,10 @@ import math
 import logging
 from typing import List
 
+import numpy as np
 from PyQt5 import QtWidgets, QtGui
 
+from NanoVNASaver.Derived import Derived
 from NanoVNASaver.RFTools import Datapoint
 from .Frequency import FrequencyChart
 from .LogMag import LogMagChart
@@ -62,22 +64,27 @@ class CombinedLogMagChart(FrequencyChart):
     def setCombinedData(self, data11, data21):
         self.data11 = data11
         self.data21 = data21
-        self.update()
+        self.invalidateAxes()
 
     def setCombinedReference(self, data11, data21):
         self.reference11 = data11
         self.reference21 = data21
-        self.update()
+        self.invalidateAxes()
 
     def resetReference(self):
         self.reference11 = []
         self.reference21 = []
-        self.update()
+        self.invalidateAxes()
 
     def resetDisplayLimits(self):
         self.reference11 = []
         self.reference21 = []
-        self.update()
+        self.invalidateBackground()
+
+    def axes(self) -> tuple:
+        # the legend depends on the S11 traces
+        return ((bool(self.data11), bool(self.reference11)) +
+                super().axes()[2:])
 
     def drawChart(self, qp: QtGui.QPainter):
         qp.setPen(QtGui.QPen(self.textColor))
@@ -123,45 +130,10 @@ class CombinedLogMagChart(FrequencyChart):
             self.minValue = minValue
         else:
             # Find scaling
-            minValue = 100
-            maxValue = 0
-            for d in self.data11:
-                logmag = self.logMag(d)
-                if math.isinf(logmag):
-                    continue
-                if logmag > maxValue:
-                    maxValue = logmag
-                if logmag < minValue:
-                    minValue = logmag
-            for d in self.data21:
-                logmag = self.logMag(d)
-                if math.isinf(logmag):
-                    continue
-                if logmag > maxValue:
-                    maxValue = logmag
-                if logmag < minValue:
-                    minValue = logmag
-
-            for d in self.reference11:
-                if d.freq < self.fstart or d.freq > self.fstop:
-                    continue
-                logmag = self.logMag(d)
-                if math.isinf(logmag):
-                    continue
-                if logmag > maxValue:
-                    maxValue = logmag
-                if logmag < minValue:
-                    minValue = logmag
-            for d in self.reference21:
-                if d.freq < self.fstart or d.freq > self.fstop:
-                    continue
-                logmag = self.logMag(d)
-                if math.isinf(logmag):
-                    continue
-                if logmag > maxValue:
-                    maxValue = logmag
-                if logmag < minValue:
-                    minValue = logmag
+            minValue, maxValue = self.valueRange(
+                ("logMag", self.isInverted), self.logMags,
+                (self.data11, self.data21, self.reference11,
+                 self.reference21), (100, 0))
 
             minValue = 10*math.floor(minValue/10)
             self.minValue = minValue
@@ -280,10 +252,12 @@ class CombinedLogMagChart(FrequencyChart):
             qp.drawLine(self.leftMargin + self.chartWidth - 20, 14,
                         self.leftMargin + self.chartWidth - 15, 14)
 
-        self.drawData(qp, self.data11, self.sweepColor)
-        self.drawData(qp, self.data21, self.secondarySweepColor)
-        self.drawData(qp, self.reference11, self.referenceColor)
-        self.drawData(qp, self.reference21, self.secondaryReferenceColor)
+        key = ("logMag", self.isInverted)
+        for data, color in ((self.data11, self.sweepColor),
+                            (self.data21, self.secondarySweepColor),
+                            (self.reference11, self.referenceColor),
+                            (self.reference21, self.secondaryReferenceColor)):
+            self.drawData(qp, data, color, key=key, values=self.logMags)
         self.drawMarkers(qp, data=self.data11)
         self.drawMarkers(qp, data=self.data21)
 
@@ -303,6 +277,11 @@ class CombinedLogMagChart(FrequencyChart):
             return -p.gain
         return p.gain
 
+    def logMags(self, derived: Derived) -> np.ndarray:
+        if self.isInverted:
+            return -derived.gain
+        return derived.gain
+
     def copy(self):
         new_chart: LogMagChart = super().copy()
         new_chart.isInverted = self.isInverted
@@ -25,6 +25,8 @@ from PyQt5.QtCore import pyqtSignal
 
 from NanoVNASaver.RFTools import Datapoint
 from NanoVNASaver.Marker import Marker
+from .Layer import LayeredPainter, StaticLayer
+from .Renderer import Rect, TraceRenderer, draw_trace
 logger = logging.getLogger(__name__)
 
 
@@ -49,6 +51,7 @@ class Chart(QtWidgets.QWidget):
     name = ""
     sweepTitle = ""
     drawLines = False
+    backgroundRendering = False
     minChartHeight = 200
     minChartWidth = 200
     chartWidth = minChartWidth
@@ -81,55 +84,87 @@ class Chart(QtWidgets.QWidget):
         self.addAction(self.action_popout)
 
         self.swrMarkers = set()
+        self.staticLayer = StaticLayer()
+        self.traceRenderer: TraceRenderer = None
+
+    def layeredPainter(self) -> LayeredPainter:
+        """a painter caching everything drawn before its dynamic()
+        call as background of the next paints"""
+        return LayeredPainter(QtGui.QPainter(self), self.staticLayer, self)
+
+    def invalidateBackground(self):
+        """to be called when anything drawn in the background changes"""
+        self.staticLayer.invalidate()
+        self.update()
+
+    def invalidateAxes(self):
+        """to be called when new data might change the background,
+        charts with axes derived from the data check them on paint"""
+        self.update()
+
+    def paintTrace(self, qp: QtGui.QPainter, x, y, rect: Rect,
+                   point_pen: QtGui.QPen, line_pen: QtGui.QPen = None):
+        """draws a trace, or collects it when rendering in background"""
+        if self.traceRenderer is not None:
+            self.traceRenderer.add(qp, x, y, rect, point_pen, line_pen)
+        else:
+            draw_trace(qp, x, y, rect, point_pen, line_pen)
+
+    def finishTraces(self):
+        """to be called at the end of paintEvent"""
+        if self.traceRenderer is not None:
+            self.traceRenderer.finish()
 
     def setSweepColor(self, color: QtGui.QColor):
         self.sweepColor = color
-        self.update()
+        self.invalidateBackground()
 
     def setSecondarySweepColor(self, color: QtGui.QColor):
         self.secondarySweepColor = color
-        self.update()
+        self.invalidateBackground()
 
     def setReferenceColor(self, color: QtGui.QColor):
         self.referenceColor = color
-        self.update()
+        self.invalidateBackground()
 
     def setSecondaryReferenceColor(self, color: QtGui.QColor):
         self.secondaryReferenceColor = color
-        self.update()
+        self.invalidateBackground()
 
     def setBackgroundColor(self, color: QtGui.QColor):
         self.backgroundColor = color
         pal = self.palette()
         pal.setColor(QtGui.QPalette.Background, color)
         self.setPalette(pal)
-        self.update()
+        self.invalidateBackground()
 
     def setForegroundColor(self, color: QtGui.QColor):
         self.foregroundColor = color
-        self.update()
+        self.invalidateBackground()
 
     def setTextColor(self, color: QtGui.QColor):
         self.textColor = color
-        self.update()
+        self.invalidateBackground()
 
     def setReference(self, data):
         self.reference = data
-        self.update()
+        self.invalidateAxes()
 
     def resetReference(self):
         self.reference = []
-        self.update()
+        self.invalidateAxes()
 
     def setData(self, data):
         self.data = data
-        self.update()
+        self.invalidateAxes()
 
     def setMarkers(self, markers):
         self.markers = markers
 
     def setBands(self, bands):
         self.bands = bands
+        bands.dataChanged.connect(self.invalidateBackground)
+        bands.layoutChanged.connect(self.invalidateBackground)
 
     def setLineThickness(self, thickness):
         self.lineThickness = thickness
@@ -145,7 +180,7 @@ class Chart(QtWidgets.QWidget):
 
     def setSweepTitle(self, title):
         self.sweepTitle = title
-        self.update()
+        self.invalidateBackground()
 
     def getActiveMarker(self) -> Marker:
         if self.draggedMarker is not None:
@@ -179,6 +214,14 @@ class Chart(QtWidgets.QWidget):
     def getPosition(self, d: Datapoint) -> (int, int):
         return self.getXPosition(d), self.getYPosition(d)
 
+    def setBackgroundRendering(self, enabled: bool):
+        self.backgroundRendering = enabled
+        if not enabled:
+            self.traceRenderer = None
+        elif self.traceRenderer is None:
+            self.traceRenderer = TraceRenderer(self)
+        self.update()
+
     def setDrawLines(self, draw_lines):
         self.drawLines = draw_lines
         self.update()
@@ -261,8 +304,10 @@ class Chart(QtWidgets.QWidget):
         new_chart.swrColor = self.swrColor
         new_chart.markers = self.markers
         new_chart.swrMarkers = self.swrMarkers
-        new_chart.bands = self.bands
+        if self.bands is not None:
+            new_chart.setBands(self.bands)
         new_chart.drawLines = self.drawLines
+        new_chart.setBackgroundRendering(self.backgroundRendering)
         new_chart.markerSize = self.markerSize
         new_chart.drawMarkerNumbers = self.drawMarkerNumbers
         new_chart.filledMarkers = self.filledMarkers
@@ -274,7 +319,7 @@ class Chart(QtWidgets.QWidget):
 
     def addSWRMarker(self, swr: float):
         self.swrMarkers.add(swr)
-        self.update()
+        self.invalidateBackground()
 
     def removeSWRMarker(self, swr: float):
         try:
@@ -283,15 +328,15 @@ class Chart(QtWidgets.QWidget):
             logger.debug("KeyError from %s", self.name)
             return
         finally:
-            self.update()
+            self.invalidateBackground()
 
     def clearSWRMarkers(self):
         self.swrMarkers.clear()
-        self.update()
+        self.invalidateBackground()
 
     def setSWRColor(self, color: QtGui.QColor):
         self.swrColor = color
-        self.update()
+        self.invalidateBackground()
 
     def drawMarker(self, x, y, qp: QtGui.QPainter, color: QtGui.QColor, number=0):
         if self.markerAtTip:
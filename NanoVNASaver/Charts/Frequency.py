@@ -18,14 +18,17 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import math
 import logging
-from typing import List
+from typing import Callable, Hashable, Iterable, List, Sequence, Tuple
 
 import numpy as np
 from PyQt5 import QtWidgets, QtGui, QtCore
 
+from NanoVNASaver.Derived import Derived, derive
 from NanoVNASaver.Formatting import parse_frequency
 from NanoVNASaver.RFTools import Datapoint
 from .Chart import Chart
+from .Layer import EndOfStatic, StaticProbe, cached, dynamic
+from .Renderer import decimate
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +48,9 @@ class FrequencyChart(Chart):
 
     logarithmicX = False
 
+    # the values drawValues scales the y axis to
+    scaleAttributes: Tuple[str, ...] = ("minValue", "maxValue", "span")
+
     leftMargin = 30
     rightMargin = 20
     bottomMargin = 20
@@ -170,7 +176,7 @@ class FrequencyChart(Chart):
             self.fixedSpan = False
             self.action_automatic.setChecked(True)
             self.action_fixed_span.setChecked(False)
-        self.update()
+        self.invalidateBackground()
 
     def setFixedValues(self, fixed_values: bool):
         self.fixedValues = fixed_values
@@ -178,11 +184,11 @@ class FrequencyChart(Chart):
             self.fixedValues = False
             self.y_action_automatic.setChecked(True)
             self.y_action_fixed_span.setChecked(False)
-        self.update()
+        self.invalidateBackground()
 
     def setLogarithmicX(self, logarithmic: bool):
         self.logarithmicX = logarithmic
-        self.update()
+        self.invalidateBackground()
 
     def setMinimumFrequency(self):
         min_freq_str, selected = QtWidgets.QInputDialog.getText(
@@ -194,7 +200,7 @@ class FrequencyChart(Chart):
         if min_freq > 0 and not (self.fixedSpan and min_freq >= self.maxFrequency):
             self.minFrequency = min_freq
         if self.fixedSpan:
-            self.update()
+            self.invalidateBackground()
 
     def setMaximumFrequency(self):
         max_freq_str, selected = QtWidgets.QInputDialog.getText(
@@ -206,7 +212,7 @@ class FrequencyChart(Chart):
         if max_freq > 0 and not (self.fixedSpan and max_freq <= self.minFrequency):
             self.maxFrequency = max_freq
         if self.fixedSpan:
-            self.update()
+            self.invalidateBackground()
 
     def setMinimumValue(self):
         min_val, selected = QtWidgets.QInputDialog.getDouble(
@@ -218,7 +224,7 @@ class FrequencyChart(Chart):
         if not (self.fixedValues and min_val >= self.maxDisplayValue):
             self.minDisplayValue = min_val
         if self.fixedValues:
-            self.update()
+            self.invalidateBackground()
 
     def setMaximumValue(self):
         max_val, selected = QtWidgets.QInputDialog.getDouble(
@@ -230,7 +236,7 @@ class FrequencyChart(Chart):
         if not (self.fixedValues and max_val <= self.minDisplayValue):
             self.maxDisplayValue = max_val
         if self.fixedValues:
-            self.update()
+            self.invalidateBackground()
 
     def resetDisplayLimits(self):
         self.fixedValues = False
@@ -239,7 +245,7 @@ class FrequencyChart(Chart):
         self.action_automatic.setChecked(True)
         self.logarithmicX = False
         self.action_set_linear_x.setChecked(True)
-        self.update()
+        self.invalidateBackground()
 
     def getXPosition(self, d: Datapoint) -> int:
         span = self.fstop - self.fstart
@@ -253,6 +259,46 @@ class FrequencyChart(Chart):
                 self.chartWidth * (d.freq - self.fstart) / span)
         return math.floor(self.width()/2)
 
+    def getXPositions(self, freq) -> np.ndarray:
+        """getXPosition for a sequence of frequencies at once"""
+        freq = np.asarray(freq, dtype=np.float64)
+        span = self.fstop - self.fstart
+        if span <= 0:
+            return np.full(len(freq), math.floor(self.width()/2), dtype=float)
+        if self.logarithmicX:
+            span = math.log(self.fstop) - math.log(self.fstart)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                position = (np.log(freq) - math.log(self.fstart)) / span
+        else:
+            position = (freq - self.fstart) / span
+        return self.leftMargin + np.round(self.chartWidth * position)
+
+    def valueRange(self, key: Hashable,
+                   values: Callable[[Derived], np.ndarray],
+                   traces: Iterable[Sequence[Datapoint]],
+                   initial: Tuple[float, float] = (math.inf, -math.inf),
+                   window: bool = True) -> Tuple[float, float]:
+        """min and max of the finite values of all traces for autoscaling,
+        widened to include initial. Unless window is False, only the shown
+        frequency span counts. Cached per trace, key and span."""
+        fstart, fstop = ((self.fstart, self.fstop) if window else
+                         (-math.inf, math.inf))
+        low, high = initial
+        for trace in traces:
+            if len(trace) == 0:
+                continue
+            trace_low, trace_high = derive(trace).extent(
+                key, values, fstart, fstop)
+            if not math.isnan(trace_low):
+                low = min(low, trace_low)
+                high = max(high, trace_high)
+        return low, high
+
+    def plotRect(self) -> Tuple[int, int, int, int]:
+        return (self.leftMargin, self.topMargin,
+                self.leftMargin + self.chartWidth,
+                self.topMargin + self.chartHeight)
+
     def frequencyAtPosition(self, x, limit=True) -> int:
         """
         Calculates the frequency at a given X-position
@@ -367,7 +413,7 @@ class FrequencyChart(Chart):
             self.maxFrequency = max(freq1, freq2)
             self.setFixedSpan(True)
 
-        self.update()
+        self.invalidateBackground()
 
     def mouseMoveEvent(self, a0: QtGui.QMouseEvent):
         if a0.buttons() == QtCore.Qt.RightButton:
@@ -408,12 +454,36 @@ class FrequencyChart(Chart):
     def resizeEvent(self, a0: QtGui.QResizeEvent) -> None:
         self.chartWidth = a0.size().width()-self.rightMargin-self.leftMargin
         self.chartHeight = a0.size().height() - self.bottomMargin - self.topMargin
+        self.invalidateBackground()
+
+    def invalidateAxes(self):
+        self.staticLayer.stale = True
         self.update()
 
+    def axes(self) -> tuple:
+        """what the background depends on besides the settings"""
+        return ((bool(self.data), bool(self.reference),
+                 self.fstart, self.fstop) +
+                tuple(getattr(self, name, None)
+                      for name in self.scaleAttributes))
+
     def paintEvent(self, a0: QtGui.QPaintEvent) -> None:
-        qp = QtGui.QPainter(self)
-        self.drawChart(qp)
+        qp = self.layeredPainter()
+        layer = self.staticLayer
+        if qp.cached and layer.stale:
+            probe = StaticProbe()
+            try:
+                self.drawChart(probe)
+                self.drawValues(probe)
+            except EndOfStatic:
+                pass
+            qp.cached = self.axes() == layer.axes
+        layer.stale = False
+        if not qp.cached:
+            self.drawChart(qp)
         self.drawValues(qp)
+        qp.dynamic()
+        layer.axes = self.axes()
         if (len(self.data) > 0 and
                 (self.data[0].freq > self.fstop or
                  self.data[len(self.data)-1].freq < self.fstart)
@@ -435,6 +505,7 @@ class FrequencyChart(Chart):
             bottom_right = QtCore.QPoint(self.draggedBoxCurrent[0], self.draggedBoxCurrent[1])
             rect = QtCore.QRect(top_left, bottom_right)
             qp.drawRect(rect)
+        self.finishTraces()
         qp.end()
 
     def drawChart(self, qp: QtGui.QPainter):
@@ -448,6 +519,8 @@ class FrequencyChart(Chart):
         self.drawTitle(qp)
 
     def drawFrequencyTicks(self, qp):
+        if cached(qp):
+            return
         fspan = self.fstop - self.fstart
         qp.setPen(self.textColor)
         qp.drawText(self.leftMargin - 20,
@@ -469,6 +542,8 @@ class FrequencyChart(Chart):
                         Chart.shortenFrequency(freq))
 
     def drawBands(self, qp, fstart, fstop):
+        if cached(qp):
+            return
         qp.setBrush(self.bands.color)
         qp.setPen(QtGui.QColor(128, 128, 128, 0))  # Don't outline the bands
         for (_, start, end) in self.bands.bands:
@@ -499,38 +574,73 @@ class FrequencyChart(Chart):
                 pass
 
     def drawData(self, qp: QtGui.QPainter, data: List[Datapoint],
-                 color: QtGui.QColor, y_function=None):
-        if y_function is None:
-            y_function = self.getYPosition
+                 color: QtGui.QColor, key: Hashable,
+                 values: Callable[[Derived], np.ndarray],
+                 y_positions: Callable[[np.ndarray], np.ndarray] = None):
+        """draws values of the data at y_positions, getYPositions by
+        default. Data denser than the plot is decimated, from the
+        unrounded values, which have to order the points like
+        y_positions does. Those decimations are cached under key per
+        snapshot and x axis."""
+        if y_positions is None:
+            y_positions = self.getYPositions
+        if not data:
+            return
+        dynamic(qp)
+        derived = derive(data)
+        x = self.getXPositions(derived.freq)
+        y = y_positions(values(derived))
+        if len(data) > 4 * self.chartWidth:
+            left = self.leftMargin
+            right = self.leftMargin + self.chartWidth
+            indices = derived.cached(
+                ("decimated", key, self.fstart, self.fstop,
+                 self.logarithmicX, left, right),
+                lambda: decimate(x, values(derived), left, right))
+            x, y = x[indices], y[indices]
+        self.drawTrace(qp, x, y, color)
+
+    def getYPositions(self, values: np.ndarray) -> np.ndarray:
+        """getYPosition for the values drawData gets at once"""
+        return self.yPositions(values, self.maxValue, self.span)
+
+    def yPositions(self, values: np.ndarray,
+                   maximum: float, span: float) -> np.ndarray:
+        """y positions on a linear axis down from maximum, NaN for
+        values not finite"""
+        with np.errstate(invalid="ignore"):
+            y = self.topMargin + np.round(
+                (maximum - values) / span * self.chartHeight)
+        return np.where(np.isfinite(y), y, np.nan)
+
+    def logYPositions(self, values: np.ndarray,
+                      maximum: float, span: float) -> np.ndarray:
+        """y positions on a logarithmic axis down from maximum, -1 for
+        values it can not show"""
+        minimum = maximum - span
+        if maximum <= 0 or minimum <= 0:
+            return np.full(len(values), -1.0)
+        log_span = math.log(maximum) - math.log(minimum)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            y = self.topMargin + np.round(
+                (math.log(maximum) - np.log(values)) /
+                log_span * self.chartHeight)
+        return np.where(np.isfinite(y), y, -1)
+
+    def drawTrace(self, qp: QtGui.QPainter, x: np.ndarray, y: np.ndarray,
+                  color: QtGui.QColor):
+        """draws pixel coordinate arrays, NaN in y leaves a gap"""
+        dynamic(qp)
         pen = QtGui.QPen(color)
         pen.setWidth(self.pointSize)
-        line_pen = QtGui.QPen(color)
-        line_pen.setWidth(self.lineThickness)
-        qp.setPen(pen)
-        for i, d in enumerate(data):
-            x = self.getXPosition(d)
-            y = y_function(d)
-            if y is None:
-                continue
-            if self.isPlotable(x, y):
-                qp.drawPoint(int(x), int(y))
-            if self.drawLines and i > 0:
-                prevx = self.getXPosition(data[i - 1])
-                prevy = y_function(data[i - 1])
-                if prevy is None:
-                    continue
-                qp.setPen(line_pen)
-                if self.isPlotable(x, y) and self.isPlotable(prevx, prevy):
-                    qp.drawLine(x, y, prevx, prevy)
-                elif self.isPlotable(x, y) and not self.isPlotable(prevx, prevy):
-                    new_x, new_y = self.getPlotable(x, y, prevx, prevy)
-                    qp.drawLine(x, y, new_x, new_y)
-                elif not self.isPlotable(x, y) and self.isPlotable(prevx, prevy):
-                    new_x, new_y = self.getPlotable(prevx, prevy, x, y)
-                    qp.drawLine(prevx, prevy, new_x, new_y)
-                qp.setPen(pen)
+        line_pen = None
+        if self.drawLines:
+            line_pen = QtGui.QPen(color)
+            line_pen.setWidth(self.lineThickness)
+        self.paintTrace(qp, x, y, self.plotRect(), pen, line_pen)
 
     def drawMarkers(self, qp, data=None, y_function=None):
+        dynamic(qp)
         if data is None:
             data = self.data
         if y_function is None:
@@ -549,29 +659,6 @@ class FrequencyChart(Chart):
                self.leftMargin <= x <= self.leftMargin + self.chartWidth and \
                self.topMargin <= y <= self.topMargin + self.chartHeight
 
-    def getPlotable(self, x, y, distantx, distanty):
-        p1 = np.array([x, y])
-        p2 = np.array([distantx, distanty])
-        # First check the top line
-        if distanty < self.topMargin:
-            p3 = np.array([self.leftMargin, self.topMargin])
-            p4 = np.array([self.leftMargin + self.chartWidth, self.topMargin])
-        elif distanty > self.topMargin + self.chartHeight:
-            p3 = np.array([self.leftMargin, self.topMargin + self.chartHeight])
-            p4 = np.array([self.leftMargin + self.chartWidth, self.topMargin + self.chartHeight])
-        else:
-            return x, y
-        da = p2 - p1
-        db = p4 - p3
-        dp = p1 - p3
-        dap = np.array([-da[1], da[0]])
-        denom = np.dot(dap, db)
-        if denom != 0:
-            num = np.dot(dap, dp)
-            result = (num / denom.astype(float)) * db + p3
-            return result[0], result[1]
-        return x, y
-
     def copy(self):
         new_chart: FrequencyChart = super().copy()
         new_chart.fstart = self.fstart
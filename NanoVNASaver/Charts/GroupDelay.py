@@ -24,12 +24,15 @@ import numpy as np
 
 from PyQt5 import QtWidgets, QtGui
 
+from NanoVNASaver.Derived import Derived, derive
 from NanoVNASaver.RFTools import Datapoint
 from .Frequency import FrequencyChart
 logger = logging.getLogger(__name__)
 
 
 class GroupDelayChart(FrequencyChart):
+    scaleAttributes = ("minDelay", "maxDelay", "span")
+
     def __init__(self, name="", reflective=True):
         super().__init__(name)
         self.leftMargin = 40
@@ -42,9 +45,10 @@ class GroupDelayChart(FrequencyChart):
         self.span = 0
 
         self.reflective = reflective
+        self.aperture = 1
 
-        self.groupDelay = []
-        self.groupDelayReference = []
+        self.groupDelay = np.zeros(0)
+        self.groupDelayReference = np.zeros(0)
 
         self.minDisplayValue = -180
         self.maxDisplayValue = 180
@@ -58,11 +62,18 @@ class GroupDelayChart(FrequencyChart):
         self.setPalette(pal)
         self.setAutoFillBackground(True)
 
+        self.y_menu.addSeparator()
+        self.action_set_aperture = QtWidgets.QAction(
+            f"Aperture ({self.aperture})")
+        self.action_set_aperture.triggered.connect(self.setAperture)
+        self.y_menu.addAction(self.action_set_aperture)
+
     def copy(self):
         new_chart: GroupDelayChart = super().copy()
         new_chart.reflective = self.reflective
+        new_chart.aperture = self.aperture
         new_chart.groupDelay = self.groupDelay.copy()
-        new_chart.groupDelayReference = self.groupDelay.copy()
+        new_chart.groupDelayReference = self.groupDelayReference.copy()
         return new_chart
 
     def setReference(self, data):
@@ -70,60 +81,39 @@ class GroupDelayChart(FrequencyChart):
 
         self.calculateGroupDelay()
 
+    def resetReference(self):
+        self.setReference([])
+
     def setData(self, data):
         self.data = data
 
         self.calculateGroupDelay()
 
+    def contextMenuEvent(self, event):
+        self.action_set_aperture.setText(f"Aperture ({self.aperture})")
+        super().contextMenuEvent(event)
+
+    def setAperture(self):
+        aperture, selected = QtWidgets.QInputDialog.getInt(
+            self, "Aperture",
+            "Set number of points to either side", value=self.aperture,
+            min=1, max=100)
+        if not selected:
+            return
+        self.aperture = aperture
+        self.calculateGroupDelay()
+
     def calculateGroupDelay(self):
-        rawData = []
-        for d in self.data:
-            rawData.append(d.phase)
-
-        rawReference = []
-        for d in self.reference:
-            rawReference.append(d.phase)
-
-        if len(self.data) > 1:
-            unwrappedData = np.degrees(np.unwrap(rawData))
-            self.groupDelay = []
-            for i in range(len(self.data)):
-                # TODO: Replace with call to RFTools.groupDelay
-                if i == 0:
-                    phase_change = unwrappedData[1] - unwrappedData[0]
-                    freq_change = self.data[1].freq - self.data[0].freq
-                elif i == len(self.data)-1:
-                    idx = len(self.data)-1
-                    phase_change = unwrappedData[idx] - unwrappedData[idx-1]
-                    freq_change = self.data[idx].freq - self.data[idx-1].freq
-                else:
-                    phase_change = unwrappedData[i+1] - unwrappedData[i-1]
-                    freq_change = self.data[i+1].freq - self.data[i-1].freq
-                delay = (-phase_change / (freq_change * 360)) * 10e8
-                if not self.reflective:
-                    delay /= 2
-                self.groupDelay.append(delay)
-
-        if len(self.reference) > 1:
-            unwrappedReference = np.degrees(np.unwrap(rawReference))
-            self.groupDelayReference = []
-            for i in range(len(self.reference)):
-                if i == 0:
-                    phase_change = unwrappedReference[1] - unwrappedReference[0]
-                    freq_change = self.reference[1].freq - self.reference[0].freq
-                elif i == len(self.reference)-1:
-                    idx = len(self.reference)-1
-                    phase_change = unwrappedReference[idx] - unwrappedReference[idx-1]
-                    freq_change = self.reference[idx].freq - self.reference[idx-1].freq
-                else:
-                    phase_change = unwrappedReference[i+1] - unwrappedReference[i-1]
-                    freq_change = self.reference[i+1].freq - self.reference[i-1].freq
-                delay = (-phase_change / (freq_change * 360)) * 10e8
-                if not self.reflective:
-                    delay /= 2
-                self.groupDelayReference.append(delay)
+        self.groupDelay = self.delays(derive(self.data))
+        self.groupDelayReference = self.delays(derive(self.reference))
+        self.invalidateAxes()
 
-        self.update()
+    def delays(self, derived: Derived) -> np.ndarray:
+        """group delays in ns"""
+        delay = derived.groupDelay(self.aperture) * 1e9
+        if not self.reflective:
+            delay = delay / 2
+        return delay
 
     def drawChart(self, qp: QtGui.QPainter):
         qp.setPen(QtGui.QPen(self.textColor))
@@ -145,12 +135,15 @@ class GroupDelayChart(FrequencyChart):
         if self.fixedValues:
             min_delay = self.minDisplayValue
             max_delay = self.maxDisplayValue
-        elif self.data:
-            min_delay = math.floor(np.min(self.groupDelay))
-            max_delay = math.ceil(np.max(self.groupDelay))
-        elif self.reference:
-            min_delay = math.floor(np.min(self.groupDelayReference))
-            max_delay = math.ceil(np.max(self.groupDelayReference))
+        else:
+            min_delay, max_delay = self.valueRange(
+                ("groupDelay", self.aperture, self.reflective),
+                self.delays,
+                (self.data or self.reference,), window=False)
+            if math.isinf(min_delay):
+                min_delay = max_delay = 0
+            min_delay = math.floor(min_delay)
+            max_delay = math.ceil(max_delay)
 
         span = max_delay - min_delay
         if span == 0:
@@ -204,55 +197,14 @@ class GroupDelayChart(FrequencyChart):
 
         self.drawFrequencyTicks(qp)
 
-        color = self.sweepColor
-        pen = QtGui.QPen(color)
-        pen.setWidth(self.pointSize)
-        line_pen = QtGui.QPen(color)
-        line_pen.setWidth(self.lineThickness)
-        qp.setPen(pen)
-        for i in range(len(self.data)):
-            x = self.getXPosition(self.data[i])
-            y = self.getYPositionFromDelay(self.groupDelay[i])
-            if self.isPlotable(x, y):
-                qp.drawPoint(int(x), int(y))
-            if self.drawLines and i > 0:
-                prevx = self.getXPosition(self.data[i - 1])
-                prevy = self.getYPositionFromDelay(self.groupDelay[i - 1])
-                qp.setPen(line_pen)
-                if self.isPlotable(x, y) and self.isPlotable(prevx, prevy):
-                    qp.drawLine(x, y, prevx, prevy)
-                elif self.isPlotable(x, y) and not self.isPlotable(prevx, prevy):
-                    new_x, new_y = self.getPlotable(x, y, prevx, prevy)
-                    qp.drawLine(x, y, new_x, new_y)
-                elif not self.isPlotable(x, y) and self.isPlotable(prevx, prevy):
-                    new_x, new_y = self.getPlotable(prevx, prevy, x, y)
-                    qp.drawLine(prevx, prevy, new_x, new_y)
-                qp.setPen(pen)
-
-        color = self.referenceColor
-        pen = QtGui.QPen(color)
-        pen.setWidth(self.pointSize)
-        line_pen = QtGui.QPen(color)
-        line_pen.setWidth(self.lineThickness)
-        qp.setPen(pen)
-        for i in range(len(self.reference)):
-            x = self.getXPosition(self.reference[i])
-            y = self.getYPositionFromDelay(self.groupDelayReference[i])
-            if self.isPlotable(x, y):
-                qp.drawPoint(int(x), int(y))
-            if self.drawLines and i > 0:
-                prevx = self.getXPosition(self.reference[i - 1])
-                prevy = self.getYPositionFromDelay(self.groupDelayReference[i - 1])
-                qp.setPen(line_pen)
-                if self.isPlotable(x, y) and self.isPlotable(prevx, prevy):
-                    qp.drawLine(x, y, prevx, prevy)
-                elif self.isPlotable(x, y) and not self.isPlotable(prevx, prevy):
-                    new_x, new_y = self.getPlotable(x, y, prevx, prevy)
-                    qp.drawLine(x, y, new_x, new_y)
-                elif not self.isPlotable(x, y) and self.isPlotable(prevx, prevy):
-                    new_x, new_y = self.getPlotable(prevx, prevy, x, y)
-                    qp.drawLine(prevx, prevy, new_x, new_y)
-                qp.setPen(pen)
+        self.drawTrace(
+            qp, self.getXPositions(derive(self.data).freq),
+            self.getYPositionFromDelay(self.groupDelay),
+            self.sweepColor)
+        self.drawTrace(
+            qp, self.getXPositions(derive(self.reference).freq),
+            self.getYPositionFromDelay(self.groupDelayReference),
+            self.referenceColor)
 
         self.drawMarkers(qp)
 
@@ -264,10 +216,11 @@ class GroupDelayChart(FrequencyChart):
             delay = self.groupDelayReference[self.reference.index(d)]
         else:
             delay = 0
-        return self.getYPositionFromDelay(delay)
+        return int(self.getYPositionFromDelay(delay))
 
-    def getYPositionFromDelay(self, delay: float):
-        return self.topMargin + round((self.maxDelay - delay) / self.span * self.chartHeight)
+    def getYPositionFromDelay(self, delay):
+        """takes a single delay or an array of delays"""
+        return self.topMargin + np.round((self.maxDelay - delay) / self.span * self.chartHeight)
 
     def valueAtPosition(self, y) -> List[float]:
         absy = y - self.topMargin
@@ -20,8 +20,10 @@ import math
 import logging
 from typing import List
 
+import numpy as np
 from PyQt5 import QtWidgets, QtGui
 
+from NanoVNASaver.Derived import Derived
 from NanoVNASaver.RFTools import Datapoint
 from NanoVNASaver.SITools import Format, Value
 from .Frequency import FrequencyChart
@@ -93,22 +95,9 @@ class InductanceChart(FrequencyChart):
             self.minValue = minValue
         else:
             # Find scaling
-            minValue = 1
-            maxValue = -1
-            for d in self.data:
-                val = d.inductiveEquivalent()
-                if val > maxValue:
-                    maxValue = val
-                if val < minValue:
-                    minValue = val
-            for d in self.reference:  # Also check min/max for the reference sweep
-                if d.freq < self.fstart or d.freq > self.fstop:
-                    continue
-                val = d.inductiveEquivalent()
-                if val > maxValue:
-                    maxValue = val
-                if val < minValue:
-                    minValue = val
+            minValue, maxValue = self.valueRange(
+                "inductiveEquivalent", self.inductances,
+                (self.data, self.reference), (1, -1))
             self.maxValue = maxValue
             self.minValue = minValue
 
@@ -138,8 +127,11 @@ class InductanceChart(FrequencyChart):
         qp.drawText(3, self.chartHeight+self.topMargin, str(Value(minValue, fmt=fmt)))
         self.drawFrequencyTicks(qp)
 
-        self.drawData(qp, self.data, self.sweepColor)
-        self.drawData(qp, self.reference, self.referenceColor)
+        values = self.inductances
+        self.drawData(qp, self.data, self.sweepColor,
+                      key="inductiveEquivalent", values=values)
+        self.drawData(qp, self.reference, self.referenceColor,
+                      key="inductiveEquivalent", values=values)
         self.drawMarkers(qp)
 
     def getYPosition(self, d: Datapoint) -> int:
@@ -147,6 +139,10 @@ class InductanceChart(FrequencyChart):
                 round((self.maxValue - d.inductiveEquivalent()) /
                       self.span * self.chartHeight))
 
+    @staticmethod
+    def inductances(derived: Derived) -> np.ndarray:
+        return derived.inductiveEquivalent()
+
     def valueAtPosition(self, y) -> List[float]:
         absy = y - self.topMargin
         val = -1 * ((absy / self.chartHeight * self.span) - self.maxValue)
@@ -0,0 +1,171 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+from typing import List, Tuple
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+logger = logging.getLogger(__name__)
+
+# value types are copied when recorded, charts modify and reuse them
+VALUE_TYPES = (QtGui.QPen, QtGui.QBrush, QtGui.QColor, QtGui.QFont,
+               QtGui.QPainterPath, QtGui.QPolygon, QtGui.QPolygonF,
+               QtCore.QPoint, QtCore.QPointF, QtCore.QRect, QtCore.QRectF,
+               QtCore.QLine, QtCore.QLineF)
+
+
+def snapshot(args: tuple) -> tuple:
+    return tuple(type(arg)(arg) if isinstance(arg, VALUE_TYPES) else arg
+                 for arg in args)
+
+
+# painter methods that only query state, everything else not drawing
+# changes state and is recorded, e.g. set*, save, restore and transforms
+QUERIES = {"background", "backgroundMode", "boundingRect", "brush",
+           "brushOrigin", "clipBoundingRect", "clipPath", "clipRegion",
+           "combinedTransform", "compositionMode", "device",
+           "deviceTransform", "font", "fontInfo", "fontMetrics",
+           "hasClipping", "isActive", "layoutDirection", "opacity",
+           "paintEngine", "pen", "renderHints", "testRenderHint",
+           "transform", "viewTransformEnabled", "viewport", "window",
+           "worldMatrixEnabled", "worldTransform"}
+
+
+class StaticLayer:
+    """The cached background of a chart, rendered to a pixmap.
+
+    The owner calls invalidate() whenever something drawn in the
+    background changes, e.g. colours, span or scale settings. New data
+    only marks the axes as stale: the owner then compares the axes it
+    derives from the data with those the pixmap was drawn for. Size,
+    pixel ratio and font are checked on every paint."""
+
+    def __init__(self):
+        self.size: Tuple = ()
+        self.pixmap: QtGui.QPixmap = None
+        self.axes: Tuple = None
+        self.stale = False
+
+    def invalidate(self):
+        self.pixmap = None
+
+    def isValid(self, size: Tuple) -> bool:
+        return self.pixmap is not None and self.size == size
+
+
+class LayeredPainter:
+    """Wraps the painter of a paintEvent.
+
+    If the layer is valid, cached is True: the chart may skip its
+    background code, and background draw calls it still makes are
+    dropped. Otherwise draw calls before dynamic() are recorded and
+    state changes are recorded and applied. dynamic() renders a new
+    recording to the layer pixmap and draws the pixmap. Later calls
+    go straight to the painter."""
+
+    def __init__(self, painter: QtGui.QPainter, layer: StaticLayer,
+                 widget: QtWidgets.QWidget):
+        self.painter = painter
+        self.layer = layer
+        self.widget = widget
+        self.calls: List[Tuple[str, tuple]] = []
+        self.static = True
+        self.ratio = widget.devicePixelRatioF()
+        self.size = (widget.width(), widget.height(), self.ratio,
+                     widget.font())
+        self.cached = layer.isValid(self.size)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.painter, name)
+        if not self.static or name in QUERIES:
+            return attr
+        if name.startswith(("draw", "fill", "erase")):
+            if self.cached:
+                return _ignore
+            return lambda *args: self.calls.append((name, snapshot(args)))
+        if self.cached:
+            return attr
+
+        def apply(*args):
+            self.calls.append((name, snapshot(args)))
+            return attr(*args)
+        return apply
+
+    def dynamic(self):
+        """ends the static part of the chart"""
+        if not self.static:
+            return
+        self.static = False
+        layer = self.layer
+        if not self.cached:
+            pixmap = QtGui.QPixmap(self.widget.size() * self.ratio)
+            pixmap.setDevicePixelRatio(self.ratio)
+            pixmap.fill(QtCore.Qt.transparent)
+            painter = QtGui.QPainter(pixmap)
+            painter.setFont(self.widget.font())
+            for name, args in self.calls:
+                getattr(painter, name)(*args)
+            painter.end()
+            layer.pixmap = pixmap
+            layer.size = self.size
+            self.calls = []
+        # the recorded state changes stay applied for the dynamic part
+        self.painter.save()
+        self.painter.resetTransform()
+        self.painter.setClipping(False)
+        self.painter.drawPixmap(0, 0, layer.pixmap)
+        self.painter.restore()
+
+    def end(self):
+        self.dynamic()
+        self.painter.end()
+
+
+class EndOfStatic(Exception):
+    """raised by StaticProbe at the start of the dynamic part"""
+
+
+class StaticProbe:
+    """Stands in for the painter to run only the static part of a
+    paint, without drawing, e.g. to find the axes new data results in.
+    Painter methods do nothing, dynamic() raises EndOfStatic."""
+    static = True
+    cached = True
+
+    def __getattr__(self, name: str):
+        return _ignore
+
+    def dynamic(self):
+        raise EndOfStatic()
+
+
+def _ignore(*_args):
+    pass
+
+
+def dynamic(qp: QtGui.QPainter):
+    """marks the start of the dynamic part for layered painters"""
+    if isinstance(qp, (LayeredPainter, StaticProbe)):
+        qp.dynamic()
+
+
+def cached(qp: QtGui.QPainter) -> bool:
+    """True if background drawing can be skipped"""
+    return (isinstance(qp, (LayeredPainter, StaticProbe)) and
+            qp.static and qp.cached)
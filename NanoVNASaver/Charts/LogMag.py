@@ -20,8 +20,10 @@ import math
 import logging
 from typing import List
 
+import numpy as np
 from PyQt5 import QtWidgets, QtGui
 
+from NanoVNASaver.Derived import Derived
 from NanoVNASaver.RFTools import Datapoint
 from .Frequency import FrequencyChart
 
@@ -95,26 +97,9 @@ class LogMagChart(FrequencyChart):
             self.minValue = minValue
         else:
             # Find scaling
-            minValue = 100
-            maxValue = -100
-            for d in self.data:
-                logmag = self.logMag(d)
-                if math.isinf(logmag):
-                    continue
-                if logmag > maxValue:
-                    maxValue = logmag
-                if logmag < minValue:
-                    minValue = logmag
-            for d in self.reference:  # Also check min/max for the reference sweep
-                if d.freq < self.fstart or d.freq > self.fstop:
-                    continue
-                logmag = self.logMag(d)
-                if math.isinf(logmag):
-                    continue
-                if logmag > maxValue:
-                    maxValue = logmag
-                if logmag < minValue:
-                    minValue = logmag
+            minValue, maxValue = self.valueRange(
+                ("logMag", self.isInverted), self.logMags,
+                (self.data, self.reference), (100, -100))
 
             minValue = 10*math.floor(minValue/10)
             self.minValue = minValue
@@ -201,8 +186,11 @@ class LogMagChart(FrequencyChart):
             qp.drawLine(self.leftMargin, y, self.leftMargin + self.chartWidth, y)
             qp.drawText(self.leftMargin + 3, y - 1, "VSWR: " + str(vswr))
 
-        self.drawData(qp, self.data, self.sweepColor)
-        self.drawData(qp, self.reference, self.referenceColor)
+        values = self.logMags
+        self.drawData(qp, self.data, self.sweepColor,
+                      key=("logMag", self.isInverted), values=values)
+        self.drawData(qp, self.reference, self.referenceColor,
+                      key=("logMag", self.isInverted), values=values)
         self.drawMarkers(qp)
 
     def getYPosition(self, d: Datapoint) -> int:
@@ -221,6 +209,11 @@ class LogMagChart(FrequencyChart):
             return -p.gain
         return p.gain
 
+    def logMags(self, derived: Derived) -> np.ndarray:
+        if self.isInverted:
+            return -derived.gain
+        return derived.gain
+
     def copy(self):
         new_chart: LogMagChart = super().copy()
         new_chart.isInverted = self.isInverted
@@ -20,8 +20,10 @@ import math
 import logging
 from typing import List
 
+import numpy as np
 from PyQt5 import QtWidgets, QtGui
 
+from NanoVNASaver.Derived import Derived
 from NanoVNASaver.RFTools import Datapoint
 from .Frequency import FrequencyChart
 from .LogMag import LogMagChart
@@ -85,22 +87,9 @@ class MagnitudeZChart(FrequencyChart):
             self.minValue = minValue
         else:
             # Find scaling
-            minValue = 100
-            maxValue = 0
-            for d in self.data:
-                mag = self.magnitude(d)
-                if mag > maxValue:
-                    maxValue = mag
-                if mag < minValue:
-                    minValue = mag
-            for d in self.reference:  # Also check min/max for the reference sweep
-                if d.freq < self.fstart or d.freq > self.fstop:
-                    continue
-                mag = self.magnitude(d)
-                if mag > maxValue:
-                    maxValue = mag
-                if mag < minValue:
-                    minValue = mag
+            minValue, maxValue = self.valueRange(
+                "impedanceMagnitude", self.magnitudes,
+                (self.data, self.reference), (100, 0))
 
             minValue = 10*math.floor(minValue/10)
             self.minValue = minValue
@@ -136,14 +125,21 @@ class MagnitudeZChart(FrequencyChart):
         qp.drawText(3, self.chartHeight+self.topMargin, str(minValue))
         self.drawFrequencyTicks(qp)
 
-        self.drawData(qp, self.data, self.sweepColor)
-        self.drawData(qp, self.reference, self.referenceColor)
+        values = self.magnitudes
+        self.drawData(qp, self.data, self.sweepColor,
+                      key="impedanceMagnitude", values=values)
+        self.drawData(qp, self.reference, self.referenceColor,
+                      key="impedanceMagnitude", values=values)
         self.drawMarkers(qp)
 
     def getYPosition(self, d: Datapoint) -> int:
         mag = self.magnitude(d)
         return self.topMargin + round((self.maxValue - mag) / self.span * self.chartHeight)
 
+    @staticmethod
+    def magnitudes(derived: Derived) -> np.ndarray:
+        return np.abs(derived.impedance())
+
     def valueAtPosition(self, y) -> List[float]:
         absy = y - self.topMargin
         val = -1 * ((absy / self.chartHeight * self.span) - self.maxValue)
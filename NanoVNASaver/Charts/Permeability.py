@@ -20,8 +20,10 @@ import math
 import logging
 from typing import List
 
+import numpy as np
 from PyQt5 import QtWidgets, QtGui
 
+from NanoVNASaver.Derived import Derived
 from NanoVNASaver.Marker import Marker
 from NanoVNASaver.RFTools import Datapoint
 from NanoVNASaver.SITools import Format, Value
@@ -30,6 +32,8 @@ logger = logging.getLogger(__name__)
 
 
 class PermeabilityChart(FrequencyChart):
+    scaleAttributes = ("max", "span")
+
     def __init__(self, name=""):
         super().__init__(name)
         self.leftMargin = 40
@@ -75,7 +79,7 @@ class PermeabilityChart(FrequencyChart):
 
     def setLogarithmicY(self, logarithmic: bool):
         self.logarithmicY = logarithmic
-        self.update()
+        self.invalidateBackground()
 
     def copy(self):
         new_chart: PermeabilityChart = super().copy()
@@ -125,36 +129,9 @@ class PermeabilityChart(FrequencyChart):
             min_val = self.minDisplayValue
             max_val = self.maxDisplayValue
         else:
-            min_val = 1000
-            max_val = -1000
-            for d in self.data:
-                imp = d.impedance()
-                re, im = imp.real, imp.imag
-                re = re * 10e6 / d.freq
-                im = im * 10e6 / d.freq
-                if re > max_val:
-                    max_val = re
-                if re < min_val:
-                    min_val = re
-                if im > max_val:
-                    max_val = im
-                if im < min_val:
-                    min_val = im
-            for d in self.reference:  # Also check min/max for the reference sweep
-                if d.freq < fstart or d.freq > fstop:
-                    continue
-                imp = d.impedance()
-                re, im = imp.real, imp.imag
-                re = re * 10e6 / d.freq
-                im = im * 10e6 / d.freq
-                if re > max_val:
-                    max_val = re
-                if re < min_val:
-                    min_val = re
-                if im > max_val:
-                    max_val = im
-                if im < min_val:
-                    min_val = im
+            min_val, max_val = self.valueRange(
+                "permeability", self.permeabilities,
+                (self.data, self.reference), (1000, -1000))
 
         if self.logarithmicY:
             min_val = max(0.01, min_val)
@@ -184,8 +161,6 @@ class PermeabilityChart(FrequencyChart):
 
         self.drawFrequencyTicks(qp)
 
-        primary_pen = pen
-        secondary_pen = QtGui.QPen(self.secondarySweepColor)
         if len(self.data) > 0:
             c = QtGui.QColor(self.sweepColor)
             c.setAlpha(255)
@@ -201,53 +176,11 @@ class PermeabilityChart(FrequencyChart):
                 self.leftMargin + self.chartWidth, 9,
                 self.leftMargin + self.chartWidth + 5, 9)
 
-        primary_pen.setWidth(self.pointSize)
-        secondary_pen.setWidth(self.pointSize)
-        line_pen.setWidth(self.lineThickness)
+        self.drawData(qp, self.data, self.sweepColor,
+                      ("permeabilityRe", self.logarithmicY), self.realValues)
+        self.drawData(qp, self.data, self.secondarySweepColor,
+                      ("permeabilityIm", self.logarithmicY), self.imagValues)
 
-        for i in range(len(self.data)):
-            x = self.getXPosition(self.data[i])
-            y_re = self.getReYPosition(self.data[i])
-            y_im = self.getImYPosition(self.data[i])
-            qp.setPen(primary_pen)
-            if self.isPlotable(x, y_re):
-                qp.drawPoint(x, y_re)
-            qp.setPen(secondary_pen)
-            if self.isPlotable(x, y_im):
-                qp.drawPoint(x, y_im)
-            if self.drawLines and i > 0:
-                prev_x = self.getXPosition(self.data[i - 1])
-                prev_y_re = self.getReYPosition(self.data[i-1])
-                prev_y_im = self.getImYPosition(self.data[i-1])
-
-                # Real part first
-                line_pen.setColor(self.sweepColor)
-                qp.setPen(line_pen)
-                if self.isPlotable(x, y_re) and self.isPlotable(prev_x, prev_y_re):
-                    qp.drawLine(x, y_re, prev_x, prev_y_re)
-                elif self.isPlotable(x, y_re) and not self.isPlotable(prev_x, prev_y_re):
-                    new_x, new_y = self.getPlotable(x, y_re, prev_x, prev_y_re)
-                    qp.drawLine(x, y_re, new_x, new_y)
-                elif not self.isPlotable(x, y_re) and self.isPlotable(prev_x, prev_y_re):
-                    new_x, new_y = self.getPlotable(prev_x, prev_y_re, x, y_re)
-                    qp.drawLine(prev_x, prev_y_re, new_x, new_y)
-
-                # Imag part second
-                line_pen.setColor(self.secondarySweepColor)
-                qp.setPen(line_pen)
-                if self.isPlotable(x, y_im) and self.isPlotable(prev_x, prev_y_im):
-                    qp.drawLine(x, y_im, prev_x, prev_y_im)
-                elif self.isPlotable(x, y_im) and not self.isPlotable(prev_x, prev_y_im):
-                    new_x, new_y = self.getPlotable(x, y_im, prev_x, prev_y_im)
-                    qp.drawLine(x, y_im, new_x, new_y)
-                elif not self.isPlotable(x, y_im) and self.isPlotable(prev_x, prev_y_im):
-                    new_x, new_y = self.getPlotable(prev_x, prev_y_im, x, y_im)
-                    qp.drawLine(prev_x, prev_y_im, new_x, new_y)
-
-        primary_pen.setColor(self.referenceColor)
-        line_pen.setColor(self.referenceColor)
-        secondary_pen.setColor(self.secondaryReferenceColor)
-        qp.setPen(primary_pen)
         if len(self.reference) > 0:
             c = QtGui.QColor(self.referenceColor)
             c.setAlpha(255)
@@ -263,46 +196,10 @@ class PermeabilityChart(FrequencyChart):
             qp.drawLine(self.leftMargin + self.chartWidth, 14,
                         self.leftMargin + self.chartWidth + 5, 14)
 
-        for i in range(len(self.reference)):
-            if self.reference[i].freq < fstart or self.reference[i].freq > fstop:
-                continue
-            x = self.getXPosition(self.reference[i])
-            y_re = self.getReYPosition(self.reference[i])
-            y_im = self.getImYPosition(self.reference[i])
-            qp.setPen(primary_pen)
-            if self.isPlotable(x, y_re):
-                qp.drawPoint(x, y_re)
-            qp.setPen(secondary_pen)
-            if self.isPlotable(x, y_im):
-                qp.drawPoint(x, y_im)
-            if self.drawLines and i > 0:
-                prev_x = self.getXPosition(self.reference[i - 1])
-                prev_y_re = self.getReYPosition(self.reference[i-1])
-                prev_y_im = self.getImYPosition(self.reference[i-1])
-
-                line_pen.setColor(self.referenceColor)
-                qp.setPen(line_pen)
-                # Real part first
-                if self.isPlotable(x, y_re) and self.isPlotable(prev_x, prev_y_re):
-                    qp.drawLine(x, y_re, prev_x, prev_y_re)
-                elif self.isPlotable(x, y_re) and not self.isPlotable(prev_x, prev_y_re):
-                    new_x, new_y = self.getPlotable(x, y_re, prev_x, prev_y_re)
-                    qp.drawLine(x, y_re, new_x, new_y)
-                elif not self.isPlotable(x, y_re) and self.isPlotable(prev_x, prev_y_re):
-                    new_x, new_y = self.getPlotable(prev_x, prev_y_re, x, y_re)
-                    qp.drawLine(prev_x, prev_y_re, new_x, new_y)
-
-                line_pen.setColor(self.secondaryReferenceColor)
-                qp.setPen(line_pen)
-                # Imag part second
-                if self.isPlotable(x, y_im) and self.isPlotable(prev_x, prev_y_im):
-                    qp.drawLine(x, y_im, prev_x, prev_y_im)
-                elif self.isPlotable(x, y_im) and not self.isPlotable(prev_x, prev_y_im):
-                    new_x, new_y = self.getPlotable(x, y_im, prev_x, prev_y_im)
-                    qp.drawLine(x, y_im, new_x, new_y)
-                elif not self.isPlotable(x, y_im) and self.isPlotable(prev_x, prev_y_im):
-                    new_x, new_y = self.getPlotable(prev_x, prev_y_im, x, y_im)
-                    qp.drawLine(prev_x, prev_y_im, new_x, new_y)
+        self.drawData(qp, self.reference, self.referenceColor,
+                      ("permeabilityRe", self.logarithmicY), self.realValues)
+        self.drawData(qp, self.reference, self.secondaryReferenceColor,
+                      ("permeabilityIm", self.logarithmicY), self.imagValues)
 
         # Now draw the markers
         for m in self.markers:
@@ -314,6 +211,31 @@ class PermeabilityChart(FrequencyChart):
                 self.drawMarker(x, y_re, qp, m.color, self.markers.index(m)+1)
                 self.drawMarker(x, y_im, qp, m.color, self.markers.index(m)+1)
 
+    @staticmethod
+    def permeabilities(derived: Derived) -> np.ndarray:
+        """real and imaginary parts scaled like getReYPosition and
+        getImYPosition"""
+        imp = derived.impedance()
+        return np.stack((imp.real, imp.imag)) * 10e6 / derived.freq
+
+    def scaledValues(self, values: np.ndarray) -> np.ndarray:
+        """values ordered like the y positions, those the logarithmic
+        scale can not show are placed at the top"""
+        if self.logarithmicY:
+            return np.where(values > 0, values, np.inf)
+        return values
+
+    def realValues(self, derived: Derived) -> np.ndarray:
+        return self.scaledValues(self.permeabilities(derived)[0])
+
+    def imagValues(self, derived: Derived) -> np.ndarray:
+        return self.scaledValues(self.permeabilities(derived)[1])
+
+    def getYPositions(self, values: np.ndarray) -> np.ndarray:
+        if self.logarithmicY:
+            return self.logYPositions(values, self.max, self.span)
+        return self.yPositions(values, self.max, self.span)
+
     def getImYPosition(self, d: Datapoint) -> int:
         im = d.impedance().imag
         im = im * 10e6 / d.freq
@@ -24,6 +24,7 @@ import numpy as np
 
 from PyQt5 import QtWidgets, QtGui
 
+from NanoVNASaver.Derived import derive
 from NanoVNASaver.RFTools import Datapoint
 from .Frequency import FrequencyChart
 
@@ -31,6 +32,8 @@ logger = logging.getLogger(__name__)
 
 
 class PhaseChart(FrequencyChart):
+    scaleAttributes = ("minAngle", "maxAngle", "span")
+
     def __init__(self, name=""):
         super().__init__(name)
         self.leftMargin = 40
@@ -72,7 +75,7 @@ class PhaseChart(FrequencyChart):
 
     def setUnwrap(self, unwrap: bool):
         self.unwrap = unwrap
-        self.update()
+        self.invalidateBackground()
 
     def drawValues(self, qp: QtGui.QPainter):
         if len(self.data) == 0 and len(self.reference) == 0:
@@ -83,26 +86,22 @@ class PhaseChart(FrequencyChart):
         line_pen.setWidth(self.lineThickness)
 
         if self.unwrap:
-            rawData = []
-            for d in self.data:
-                rawData.append(d.phase)
-
-            rawReference = []
-            for d in self.reference:
-                rawReference.append(d.phase)
-
-            self.unwrappedData = np.degrees(np.unwrap(rawData))
-            self.unwrappedReference = np.degrees(np.unwrap(rawReference))
+            self.unwrappedData = np.degrees(
+                derive(self.data).unwrappedPhase)
+            self.unwrappedReference = np.degrees(
+                derive(self.reference).unwrappedPhase)
 
         if self.fixedValues:
             minAngle = self.minDisplayValue
             maxAngle = self.maxDisplayValue
-        elif self.unwrap and self.data:
-            minAngle = math.floor(np.min(self.unwrappedData))
-            maxAngle = math.ceil(np.max(self.unwrappedData))
-        elif self.unwrap and self.reference:
-            minAngle = math.floor(np.min(self.unwrappedReference))
-            maxAngle = math.ceil(np.max(self.unwrappedReference))
+        elif self.unwrap:
+            minAngle, maxAngle = self.valueRange(
+                "unwrappedPhase", lambda d: np.degrees(d.unwrappedPhase),
+                (self.data or self.reference,), window=False)
+            if math.isinf(minAngle):
+                minAngle, maxAngle = -180, 180
+            minAngle = math.floor(minAngle)
+            maxAngle = math.ceil(maxAngle)
         else:
             minAngle = -180
             maxAngle = 180
@@ -159,10 +158,18 @@ class PhaseChart(FrequencyChart):
 
         self.drawFrequencyTicks(qp)
 
-        self.drawData(qp, self.data, self.sweepColor)
-        self.drawData(qp, self.reference, self.referenceColor)
+        self.drawAngles(qp, self.data, self.unwrappedData, self.sweepColor)
+        self.drawAngles(qp, self.reference, self.unwrappedReference,
+                        self.referenceColor)
         self.drawMarkers(qp)
 
+    def drawAngles(self, qp: QtGui.QPainter, data, unwrapped,
+                   color: QtGui.QColor):
+        derived = derive(data)
+        angle = unwrapped if self.unwrap else np.degrees(derived.phase)
+        self.drawTrace(qp, self.getXPositions(derived.freq),
+                       self.getYPositionFromAngle(angle), color)
+
     def getYPosition(self, d: Datapoint) -> int:
         if self.unwrap:
             if d in self.data:
@@ -173,7 +180,12 @@ class PhaseChart(FrequencyChart):
                 angle = math.degrees(d.phase)
         else:
             angle = math.degrees(d.phase)
-        return self.topMargin + round((self.maxAngle - angle) / self.span * self.chartHeight)
+        return int(self.getYPositionFromAngle(angle))
+
+    def getYPositionFromAngle(self, angle):
+        """takes a single angle or an array of angles in degrees"""
+        return self.topMargin + np.round(
+            (self.maxAngle - angle) / self.span * self.chartHeight)
 
     def valueAtPosition(self, y) -> List[float]:
         absy = y - self.topMargin
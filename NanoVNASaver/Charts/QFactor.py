@@ -20,8 +20,10 @@ import math
 import logging
 from typing import List
 
+import numpy as np
 from PyQt5 import QtWidgets, QtGui
 
+from NanoVNASaver.Derived import Derived
 from NanoVNASaver.RFTools import Datapoint
 from .Frequency import FrequencyChart
 
@@ -29,6 +31,8 @@ logger = logging.getLogger(__name__)
 
 
 class QualityFactorChart(FrequencyChart):
+    scaleAttributes = ("minQ", "maxQ", "span")
+
     def __init__(self, name=""):
         super().__init__(name)
         self.leftMargin = 35
@@ -60,11 +64,9 @@ class QualityFactorChart(FrequencyChart):
             minQ = self.minDisplayValue
         else:
             minQ = 0
-            maxQ = 0
-            for d in self.data:
-                Q = d.qFactor()
-                if Q > maxQ:
-                    maxQ = Q
+            _, maxQ = self.valueRange(
+                "qFactor", self.qFactors, (self.data,), (0, 0),
+                window=False)
             scale = 0
             if maxQ > 0:
                 scale = max(scale, math.floor(math.log10(maxQ)))
@@ -131,14 +133,24 @@ class QualityFactorChart(FrequencyChart):
             self.drawBands(qp, fstart, fstop)
 
         self.drawFrequencyTicks(qp)
-        self.drawData(qp, self.data, self.sweepColor)
-        self.drawData(qp, self.reference, self.referenceColor)
+        values = self.qFactors
+        self.drawData(qp, self.data, self.sweepColor,
+                      key="qFactor", values=values)
+        self.drawData(qp, self.reference, self.referenceColor,
+                      key="qFactor", values=values)
         self.drawMarkers(qp)
 
     def getYPosition(self, d: Datapoint) -> int:
         Q = d.qFactor()
         return self.topMargin + round((self.maxQ - Q) / self.span * self.chartHeight)
 
+    @staticmethod
+    def qFactors(derived: Derived) -> np.ndarray:
+        return derived.qFactor()
+
+    def getYPositions(self, values: np.ndarray) -> np.ndarray:
+        return self.yPositions(values, self.maxQ, self.span)
+
     def valueAtPosition(self, y) -> List[float]:
         absy = y - self.topMargin
         val = -1 * ((absy / self.chartHeight * self.span) - self.maxQ)
@@ -20,6 +20,7 @@ import math
 import logging
 from typing import List
 
+import numpy as np
 from PyQt5 import QtWidgets, QtGui
 
 from NanoVNASaver.Marker import Marker
@@ -32,6 +33,8 @@ logger = logging.getLogger(__name__)
 
 
 class RealImaginaryChart(FrequencyChart):
+    scaleAttributes = ("max_real", "max_imag", "span_real", "span_imag")
+
     def __init__(self, name=""):
         super().__init__(name)
         self.leftMargin = 45
@@ -173,34 +176,12 @@ class RealImaginaryChart(FrequencyChart):
             min_imag = self.minDisplayImag
             max_imag = self.maxDisplayImag
         else:
-            min_real = 1000
-            min_imag = 1000
-            max_real = 0
-            max_imag = -1000
-            for d in self.data:
-                imp = d.impedance()
-                re, im = imp.real, imp.imag
-                if re > max_real:
-                    max_real = re
-                if re < min_real:
-                    min_real = re
-                if im > max_imag:
-                    max_imag = im
-                if im < min_imag:
-                    min_imag = im
-            for d in self.reference:  # Also check min/max for the reference sweep
-                if d.freq < fstart or d.freq > fstop:
-                    continue
-                imp = d.impedance()
-                re, im = imp.real, imp.imag
-                if re > max_real:
-                    max_real = re
-                if re < min_real:
-                    min_real = re
-                if im > max_imag:
-                    max_imag = im
-                if im < min_imag:
-                    min_imag = im
+            min_real, max_real = self.valueRange(
+                "resistance", lambda d: d.impedance().real,
+                (self.data, self.reference), (1000, 0))
+            min_imag, max_imag = self.valueRange(
+                "reactance", lambda d: d.impedance().imag,
+                (self.data, self.reference), (1000, -1000))
 
             # Always have at least 8 numbered horizontal lines
             max_real = max(8, math.ceil(max_real))
@@ -267,8 +248,6 @@ class RealImaginaryChart(FrequencyChart):
 
         self.drawFrequencyTicks(qp)
 
-        primary_pen = pen
-        secondary_pen = QtGui.QPen(self.secondarySweepColor)
         if len(self.data) > 0:
             c = QtGui.QColor(self.sweepColor)
             c.setAlpha(255)
@@ -283,53 +262,11 @@ class RealImaginaryChart(FrequencyChart):
             qp.drawLine(self.leftMargin + self.chartWidth, 9,
                         self.leftMargin + self.chartWidth + 5, 9)
 
-        primary_pen.setWidth(self.pointSize)
-        secondary_pen.setWidth(self.pointSize)
-        line_pen.setWidth(self.lineThickness)
+        self.drawData(qp, self.data, self.sweepColor, "resistance",
+                      lambda d: d.impedance().real, self.getReYPositions)
+        self.drawData(qp, self.data, self.secondarySweepColor, "reactance",
+                      lambda d: d.impedance().imag, self.getImYPositions)
 
-        for i in range(len(self.data)):
-            x = self.getXPosition(self.data[i])
-            y_re = self.getReYPosition(self.data[i])
-            y_im = self.getImYPosition(self.data[i])
-            qp.setPen(primary_pen)
-            if self.isPlotable(x, y_re):
-                qp.drawPoint(x, y_re)
-            qp.setPen(secondary_pen)
-            if self.isPlotable(x, y_im):
-                qp.drawPoint(x, y_im)
-            if self.drawLines and i > 0:
-                prev_x = self.getXPosition(self.data[i - 1])
-                prev_y_re = self.getReYPosition(self.data[i-1])
-                prev_y_im = self.getImYPosition(self.data[i-1])
-
-                # Real part first
-                line_pen.setColor(self.sweepColor)
-                qp.setPen(line_pen)
-                if self.isPlotable(x, y_re) and self.isPlotable(prev_x, prev_y_re):
-                    qp.drawLine(x, y_re, prev_x, prev_y_re)
-                elif self.isPlotable(x, y_re) and not self.isPlotable(prev_x, prev_y_re):
-                    new_x, new_y = self.getPlotable(x, y_re, prev_x, prev_y_re)
-                    qp.drawLine(x, y_re, new_x, new_y)
-                elif not self.isPlotable(x, y_re) and self.isPlotable(prev_x, prev_y_re):
-                    new_x, new_y = self.getPlotable(prev_x, prev_y_re, x, y_re)
-                    qp.drawLine(prev_x, prev_y_re, new_x, new_y)
-
-                # Imag part second
-                line_pen.setColor(self.secondarySweepColor)
-                qp.setPen(line_pen)
-                if self.isPlotable(x, y_im) and self.isPlotable(prev_x, prev_y_im):
-                    qp.drawLine(x, y_im, prev_x, prev_y_im)
-                elif self.isPlotable(x, y_im) and not self.isPlotable(prev_x, prev_y_im):
-                    new_x, new_y = self.getPlotable(x, y_im, prev_x, prev_y_im)
-                    qp.drawLine(x, y_im, new_x, new_y)
-                elif not self.isPlotable(x, y_im) and self.isPlotable(prev_x, prev_y_im):
-                    new_x, new_y = self.getPlotable(prev_x, prev_y_im, x, y_im)
-                    qp.drawLine(prev_x, prev_y_im, new_x, new_y)
-
-        primary_pen.setColor(self.referenceColor)
-        line_pen.setColor(self.referenceColor)
-        secondary_pen.setColor(self.secondaryReferenceColor)
-        qp.setPen(primary_pen)
         if len(self.reference) > 0:
             c = QtGui.QColor(self.referenceColor)
             c.setAlpha(255)
@@ -345,46 +282,11 @@ class RealImaginaryChart(FrequencyChart):
             qp.drawLine(self.leftMargin + self.chartWidth, 14,
                         self.leftMargin + self.chartWidth + 5, 14)
 
-        for i in range(len(self.reference)):
-            if self.reference[i].freq < fstart or self.reference[i].freq > fstop:
-                continue
-            x = self.getXPosition(self.reference[i])
-            y_re = self.getReYPosition(self.reference[i])
-            y_im = self.getImYPosition(self.reference[i])
-            qp.setPen(primary_pen)
-            if self.isPlotable(x, y_re):
-                qp.drawPoint(x, y_re)
-            qp.setPen(secondary_pen)
-            if self.isPlotable(x, y_im):
-                qp.drawPoint(x, y_im)
-            if self.drawLines and i > 0:
-                prev_x = self.getXPosition(self.reference[i - 1])
-                prev_y_re = self.getReYPosition(self.reference[i-1])
-                prev_y_im = self.getImYPosition(self.reference[i-1])
-
-                line_pen.setColor(self.referenceColor)
-                qp.setPen(line_pen)
-                # Real part first
-                if self.isPlotable(x, y_re) and self.isPlotable(prev_x, prev_y_re):
-                    qp.drawLine(x, y_re, prev_x, prev_y_re)
-                elif self.isPlotable(x, y_re) and not self.isPlotable(prev_x, prev_y_re):
-                    new_x, new_y = self.getPlotable(x, y_re, prev_x, prev_y_re)
-                    qp.drawLine(x, y_re, new_x, new_y)
-                elif not self.isPlotable(x, y_re) and self.isPlotable(prev_x, prev_y_re):
-                    new_x, new_y = self.getPlotable(prev_x, prev_y_re, x, y_re)
-                    qp.drawLine(prev_x, prev_y_re, new_x, new_y)
-
-                line_pen.setColor(self.secondaryReferenceColor)
-                qp.setPen(line_pen)
-                # Imag part second
-                if self.isPlotable(x, y_im) and self.isPlotable(prev_x, prev_y_im):
-                    qp.drawLine(x, y_im, prev_x, prev_y_im)
-                elif self.isPlotable(x, y_im) and not self.isPlotable(prev_x, prev_y_im):
-                    new_x, new_y = self.getPlotable(x, y_im, prev_x, prev_y_im)
-                    qp.drawLine(x, y_im, new_x, new_y)
-                elif not self.isPlotable(x, y_im) and self.isPlotable(prev_x, prev_y_im):
-                    new_x, new_y = self.getPlotable(prev_x, prev_y_im, x, y_im)
-                    qp.drawLine(prev_x, prev_y_im, new_x, new_y)
+        self.drawData(qp, self.reference, self.referenceColor, "resistance",
+                      lambda d: d.impedance().real, self.getReYPositions)
+        self.drawData(qp, self.reference, self.secondaryReferenceColor,
+                      "reactance", lambda d: d.impedance().imag,
+                      self.getImYPositions)
 
         # Now draw the markers
         for m in self.markers:
@@ -404,6 +306,12 @@ class RealImaginaryChart(FrequencyChart):
         re = d.impedance().real
         return self.topMargin + round((self.max_real - re) / self.span_real * self.chartHeight)
 
+    def getImYPositions(self, values: np.ndarray) -> np.ndarray:
+        return self.yPositions(values, self.max_imag, self.span_imag)
+
+    def getReYPositions(self, values: np.ndarray) -> np.ndarray:
+        return self.yPositions(values, self.max_real, self.span_real)
+
     def valueAtPosition(self, y) -> List[float]:
         absy = y - self.topMargin
         valRe = -1 * ((absy / self.chartHeight * self.span_real) - self.max_real)
@@ -429,7 +337,7 @@ class RealImaginaryChart(FrequencyChart):
             self.maxFrequency = max(freq1, freq2)
             self.setFixedSpan(True)
 
-        self.update()
+        self.invalidateBackground()
 
     def getNearestMarker(self, x, y) -> Marker:
         if len(self.data) == 0:
@@ -458,7 +366,7 @@ class RealImaginaryChart(FrequencyChart):
         if not (self.fixedValues and min_val >= self.maxDisplayReal):
             self.minDisplayReal = min_val
         if self.fixedValues:
-            self.update()
+            self.invalidateBackground()
 
     def setMaximumRealValue(self):
         max_val, selected = QtWidgets.QInputDialog.getDouble(
@@ -470,7 +378,7 @@ class RealImaginaryChart(FrequencyChart):
         if not (self.fixedValues and max_val <= self.minDisplayReal):
             self.maxDisplayReal = max_val
         if self.fixedValues:
-            self.update()
+            self.invalidateBackground()
 
     def setMinimumImagValue(self):
         min_val, selected = QtWidgets.QInputDialog.getDouble(
@@ -482,7 +390,7 @@ class RealImaginaryChart(FrequencyChart):
         if not (self.fixedValues and min_val >= self.maxDisplayImag):
             self.minDisplayImag = min_val
         if self.fixedValues:
-            self.update()
+            self.invalidateBackground()
 
     def setMaximumImagValue(self):
         max_val, selected = QtWidgets.QInputDialog.getDouble(
@@ -494,7 +402,7 @@ class RealImaginaryChart(FrequencyChart):
         if not (self.fixedValues and max_val <= self.minDisplayImag):
             self.maxDisplayImag = max_val
         if self.fixedValues:
-            self.update()
+            self.invalidateBackground()
 
     def setFixedValues(self, fixed_values: bool):
         self.fixedValues = fixed_values
@@ -504,7 +412,7 @@ class RealImaginaryChart(FrequencyChart):
             self.fixedValues = False
             self.y_action_automatic.setChecked(True)
             self.y_action_fixed_span.setChecked(False)
-        self.update()
+        self.invalidateBackground()
 
     def contextMenuEvent(self, event):
         self.action_set_fixed_start.setText(
@@ -0,0 +1,237 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+Vectorized trace drawing: pixel coordinates are handled as NumPy arrays,
+clipped against the plot rectangle at once and handed to QPainter as a
+few polylines instead of one call per point. Traces denser than the
+plot are decimated to a few points per pixel column first.
+Optionally, TraceRenderer does all this on the thread pool.
+"""
+import logging
+from typing import Iterator, List, Tuple
+
+import numpy as np
+from PyQt5 import QtCore, QtGui, QtWidgets
+from PyQt5.QtCore import pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+Rect = Tuple[float, float, float, float]
+
+
+def clip_segments(x: np.ndarray, y: np.ndarray, rect: Rect
+                  ) -> Tuple[np.ndarray, ...]:
+    """Liang-Barsky clipping of the segments between consecutive points
+    against rect (left, top, right, bottom).
+
+    Returns the clipped start and end coordinates, the mask of visible
+    segments and the clipping parameters t0 and t1 (0 and 1 if the
+    segment start or end is not clipped)."""
+    left, top, right, bottom = rect
+    x0, y0, x1, y1 = x[:-1], y[:-1], x[1:], y[1:]
+    dx = x1 - x0
+    dy = y1 - y0
+    t0 = np.zeros(len(dx))
+    t1 = np.ones(len(dx))
+    visible = np.isfinite(dx) & np.isfinite(dy)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for p, q in ((-dx, x0 - left), (dx, right - x0),
+                     (-dy, y0 - top), (dy, bottom - y0)):
+            r = q / p
+            t0 = np.where(p < 0, np.maximum(t0, r), t0)
+            t1 = np.where(p > 0, np.minimum(t1, r), t1)
+            visible &= (p != 0) | (q >= 0)
+    visible &= t0 <= t1
+    return (x0 + t0 * dx, y0 + t0 * dy, x0 + t1 * dx, y0 + t1 * dy,
+            visible, t0, t1)
+
+
+def runs(x: np.ndarray, y: np.ndarray,
+         rect: Rect) -> Iterator[np.ndarray]:
+    """yields the visible parts of the line through x, y as
+    (n, 2) arrays of connected points"""
+    if len(x) < 2:
+        return
+    cx0, cy0, cx1, cy1, visible, t0, t1 = clip_segments(x, y, rect)
+    joined = visible[:-1] & visible[1:] & (t1[:-1] >= 1) & (t0[1:] <= 0)
+    starts = np.flatnonzero(visible & ~np.concatenate(([False], joined)))
+    ends = np.flatnonzero(visible & ~np.concatenate((joined, [False])))
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        points = np.empty((end - start + 2, 2))
+        points[0] = cx0[start], cy0[start]
+        points[1:, 0] = cx1[start:end + 1]
+        points[1:, 1] = cy1[start:end + 1]
+        yield points
+
+
+def decimate(x: np.ndarray, y: np.ndarray, left: float,
+             right: float) -> np.ndarray:
+    """indices of the points needed to draw a trace with ascending x at
+    pixel resolution: per pixel column between left and right the first,
+    lowest, highest and last point, so peaks and nulls are kept. The
+    nearest points outside are kept for the lines leaving the plot."""
+    if len(x) < 2 or not np.all(x[1:] >= x[:-1]):
+        return np.arange(len(x))
+    lo = max(int(np.searchsorted(x, left, side="left")) - 1, 0)
+    hi = min(int(np.searchsorted(x, right, side="right")) + 1, len(x))
+    columns = np.floor(x[lo:hi])
+    starts = np.flatnonzero(
+        np.concatenate(([True], columns[1:] != columns[:-1])))
+    count = hi - lo
+    if count <= 4 * len(starts):
+        return np.arange(lo, hi)
+    ends = np.append(starts[1:], count) - 1
+    group = np.repeat(np.arange(len(starts)),
+                      np.diff(np.append(starts, count)))
+    values = y[lo:hi]
+    nan = np.isnan(values)
+    lowest = np.lexsort((np.where(nan, np.inf, values), group))[starts]
+    highest = np.lexsort((np.where(nan, np.inf, -values), group))[starts]
+    return lo + np.unique(np.concatenate((starts, ends, lowest, highest)))
+
+
+def inside(x: np.ndarray, y: np.ndarray, rect: Rect) -> np.ndarray:
+    left, top, right, bottom = rect
+    with np.errstate(invalid="ignore"):
+        return (x >= left) & (x <= right) & (y >= top) & (y <= bottom)
+
+
+def polygon(points: np.ndarray) -> QtGui.QPolygonF:
+    """copies an (n, 2) array into a QPolygonF without a Python loop"""
+    result = QtGui.QPolygonF()
+    result.fill(QtCore.QPointF(), len(points))
+    if len(points):
+        buffer = result.data()
+        buffer.setsize(points.size * points.itemsize)
+        np.frombuffer(buffer, dtype=np.float64).reshape(-1, 2)[:] = points
+    return result
+
+
+def draw_trace(qp: QtGui.QPainter, x: np.ndarray, y: np.ndarray,
+               rect: Rect, point_pen: QtGui.QPen,
+               line_pen: QtGui.QPen = None):
+    """draws the points of a trace inside rect and, with line_pen given,
+    the lines between them. Non-finite y values are gaps."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) > 4 * (rect[2] - rect[0]):
+        keep = decimate(x, y, rect[0], rect[2])
+        x = x[keep]
+        y = y[keep]
+    if line_pen is not None:
+        qp.setPen(line_pen)
+        for points in runs(x, y, rect):
+            qp.drawPolyline(polygon(points))
+    mask = inside(x, y, rect)
+    qp.setPen(point_pen)
+    qp.drawPoints(polygon(np.column_stack((x[mask], y[mask]))))
+
+
+Trace = Tuple[np.ndarray, np.ndarray, Rect, QtGui.QPen, QtGui.QPen]
+
+
+def same_traces(a: List[Trace], b: List[Trace]) -> bool:
+    return len(a) == len(b) and all(
+        np.array_equal(ta[0], tb[0], equal_nan=True) and
+        np.array_equal(ta[1], tb[1], equal_nan=True) and
+        ta[2:] == tb[2:] for ta, tb in zip(a, b))
+
+
+class RenderJob(QtCore.QRunnable):
+    def __init__(self, renderer: "TraceRenderer", serial: int,
+                 size: Tuple[int, int, float], traces: List[Trace]):
+        super().__init__()
+        self.renderer = renderer
+        self.serial = serial
+        self.size = size
+        self.traces = traces
+
+    def run(self):
+        if self.serial != self.renderer.serial:
+            return  # superseded before it started
+        width, height, ratio = self.size
+        image = QtGui.QImage(round(width * ratio), round(height * ratio),
+                             QtGui.QImage.Format_ARGB32_Premultiplied)
+        image.setDevicePixelRatio(ratio)
+        image.fill(QtCore.Qt.transparent)
+        qp = QtGui.QPainter(image)
+        for trace in self.traces:
+            draw_trace(qp, *trace)
+        qp.end()
+        try:
+            self.renderer.finished.emit(self.serial, image)
+        except RuntimeError:
+            logger.debug("Chart was deleted while rendering")
+
+
+class TraceRenderer(QtCore.QObject):
+    """Renders the traces of a chart into QImages on the thread pool.
+
+    During a paint the traces are only collected and the last finished
+    frame is drawn in their place. If the traces differ from the newest
+    frame, a new one is rendered and the chart updated once it is done.
+    Frames superseded before they start are dropped, finished frames
+    are only shown if they are newer than the one shown."""
+    finished = pyqtSignal(int, QtGui.QImage)
+
+    def __init__(self, widget: QtWidgets.QWidget,
+                 pool: QtCore.QThreadPool = None):
+        super().__init__(widget)
+        self.widget = widget
+        self.pool = pool or QtCore.QThreadPool.globalInstance()
+        self.image: QtGui.QImage = None
+        self.traces: List[Trace] = []
+        self.drawn = False
+        self.serial = 0
+        self.shown = 0
+        self.pending: List[Trace] = []
+        self.size: Tuple[int, int, float] = ()
+        self.finished.connect(self.show)
+
+    def add(self, qp: QtGui.QPainter, x: np.ndarray, y: np.ndarray,
+            rect: Rect, point_pen: QtGui.QPen,
+            line_pen: QtGui.QPen = None):
+        """collects a trace, arguments as for draw_trace"""
+        if not self.drawn and self.image is not None:
+            qp.drawImage(QtCore.QPointF(0, 0), self.image)
+        self.drawn = True
+        self.traces.append((
+            np.array(x, dtype=np.float64), np.array(y, dtype=np.float64),
+            tuple(rect), QtGui.QPen(point_pen),
+            None if line_pen is None else QtGui.QPen(line_pen)))
+
+    def finish(self):
+        """ends the paint, starts rendering if the traces changed"""
+        traces, self.traces = self.traces, []
+        self.drawn = False
+        size = (self.widget.width(), self.widget.height(),
+                self.widget.devicePixelRatioF())
+        if size == self.size and same_traces(traces, self.pending):
+            return
+        self.serial += 1
+        self.pending = traces
+        self.size = size
+        self.pool.start(RenderJob(self, self.serial, size, traces))
+
+    def show(self, serial: int, image: QtGui.QImage):
+        if serial <= self.shown:
+            return
+        self.shown = serial
+        self.image = image
+        self.widget.update()
@@ -150,10 +150,12 @@ class SParameterChart(FrequencyChart):
         qp.drawText(3, self.chartHeight+self.topMargin, str(minValue))
         self.drawFrequencyTicks(qp)
 
-        self.drawData(qp, self.data, self.sweepColor, self.getReYPosition)
-        self.drawData(qp, self.reference, self.referenceColor, self.getReYPosition)
-        self.drawData(qp, self.data, self.secondarySweepColor, self.getImYPosition)
-        self.drawData(qp, self.reference, self.secondaryReferenceColor, self.getImYPosition)
+        for data, color in ((self.data, self.sweepColor),
+                            (self.reference, self.referenceColor)):
+            self.drawData(qp, data, color, "re", lambda d: d.z.real)
+        for data, color in ((self.data, self.secondarySweepColor),
+                            (self.reference, self.secondaryReferenceColor)):
+            self.drawData(qp, data, color, "im", lambda d: d.z.imag)
         self.drawMarkers(qp, y_function=self.getReYPosition)
         self.drawMarkers(qp, y_function=self.getImYPosition)
 
@@ -16,7 +16,6 @@
 #
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
-import math
 import logging
 
 from PyQt5 import QtGui, QtCore
@@ -40,10 +39,12 @@ class SmithChart(SquareChart):
         self.setAutoFillBackground(True)
 
     def paintEvent(self, a0: QtGui.QPaintEvent) -> None:
-        qp = QtGui.QPainter(self)
-        # qp.begin(self)  # Apparently not needed?
-        self.drawSmithChart(qp)
+        qp = self.layeredPainter()
+        if not qp.cached:
+            self.drawSmithChart(qp)
+        qp.dynamic()
         self.drawValues(qp)
+        self.finishTraces()
         qp.end()
 
     def drawSmithChart(self, qp: QtGui.QPainter):
@@ -115,55 +116,6 @@ class SmithChart(SquareChart):
                 QtCore.QRect(centerX - 50, centerY - 4 + r, 100, 20),
                 QtCore.Qt.AlignCenter, str(swr))
 
-    def drawValues(self, qp: QtGui.QPainter):
-        if len(self.data) == 0 and len(self.reference) == 0:
-            return
-        pen = QtGui.QPen(self.sweepColor)
-        pen.setWidth(self.pointSize)
-        line_pen = QtGui.QPen(self.sweepColor)
-        line_pen.setWidth(self.lineThickness)
-        highlighter = QtGui.QPen(QtGui.QColor(20, 0, 255))
-        highlighter.setWidth(1)
-        qp.setPen(pen)
-        for i in range(len(self.data)):
-            x = self.getXPosition(self.data[i])
-            y = int(self.height()/2 + self.data[i].im * -1 * self.chartHeight/2)
-            qp.drawPoint(x, y)
-            if self.drawLines and i > 0:
-                prevx = self.getXPosition(self.data[i-1])
-                prevy = int(self.height() / 2 + self.data[i-1].im * -1 * self.chartHeight / 2)
-                qp.setPen(line_pen)
-                qp.drawLine(x, y, prevx, prevy)
-                qp.setPen(pen)
-        pen.setColor(self.referenceColor)
-        line_pen.setColor(self.referenceColor)
-        qp.setPen(pen)
-        if len(self.data) > 0:
-            fstart = self.data[0].freq
-            fstop = self.data[len(self.data)-1].freq
-        else:
-            fstart = self.reference[0].freq
-            fstop = self.reference[len(self.reference)-1].freq
-        for i in range(len(self.reference)):
-            data = self.reference[i]
-            if data.freq < fstart or data.freq > fstop:
-                continue
-            x = self.getXPosition(data)
-            y = int(self.height()/2 + data.im * -1 * self.chartHeight/2)
-            qp.drawPoint(x, y)
-            if self.drawLines and i > 0:
-                prevx = self.getXPosition(self.reference[i-1])
-                prevy = int(self.height() / 2 + self.reference[i-1].im * -1 * self.chartHeight / 2)
-                qp.setPen(line_pen)
-                qp.drawLine(x, y, prevx, prevy)
-                qp.setPen(pen)
-        # Now draw the markers
-        for m in self.markers:
-            if m.location != -1:
-                x = self.getXPosition(self.data[m.location])
-                y = self.height() / 2 + self.data[m.location].im * -1 * self.chartHeight / 2
-                self.drawMarker(x, y, qp, m.color, self.markers.index(m)+1)
-
     def getXPosition(self, d: Datapoint) -> int:
         return int(self.width()/2 + d.re * self.chartWidth/2)
 
@@ -172,34 +124,3 @@ class SmithChart(SquareChart):
 
     def heightForWidth(self, a0: int) -> int:
         return a0
-
-    def mouseMoveEvent(self, a0: QtGui.QMouseEvent) -> None:
-        if a0.buttons() == QtCore.Qt.RightButton:
-            a0.ignore()
-            return
-        x = a0.x()
-        y = a0.y()
-        absx = x - (self.width() - self.chartWidth) / 2
-        absy = y - (self.height() - self.chartHeight) / 2
-        if absx < 0 or absx > self.chartWidth or absy < 0 or absy > self.chartHeight \
-                or len(self.data) == len(self.reference) == 0:
-            a0.ignore()
-            return
-        a0.accept()
-
-        if len(self.data) > 0:
-            target = self.data
-        else:
-            target = self.reference
-        positions = []
-        for d in target:
-            thisx = self.width() / 2 + d.re * self.chartWidth / 2
-            thisy = self.height() / 2 + d.im * -1 * self.chartHeight / 2
-            positions.append(math.sqrt((x - thisx)**2 + (y - thisy)**2))
-
-        minimum_position = positions.index(min(positions))
-        m = self.getActiveMarker()
-        if m is not None:
-            m.setFrequency(str(round(target[minimum_position].freq)))
-            m.frequencyInput.setText(str(round(target[minimum_position].freq)))
-        return
@@ -17,10 +17,15 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import logging
+from typing import Sequence
 
-from PyQt5 import QtWidgets, QtGui
+import numpy as np
+from PyQt5 import QtWidgets, QtGui, QtCore
 
 from NanoVNASaver.Charts.Chart import Chart
+from NanoVNASaver.Derived import derive
+from NanoVNASaver.RFTools import Datapoint
+from .Layer import dynamic
 
 logger = logging.getLogger(__name__)
 
@@ -43,4 +48,71 @@ class SquareChart(Chart):
         else:
             min_dimension = min(a0.size().height(), a0.size().width())
             self.chartWidth = self.chartHeight = min_dimension - 40
-        self.update()
+        self.invalidateBackground()
+
+    def pixels(self, data: Sequence[Datapoint]) -> np.ndarray:
+        """maps the reflection coefficients of data to the chart as
+        complex pixel positions x + jy, in one affine transform"""
+        z = derive(data).z
+        return (complex(self.width() / 2, self.height() / 2) +
+                z.real * (self.chartWidth / 2) -
+                1j * z.imag * (self.chartHeight / 2))
+
+    def drawValues(self, qp: QtGui.QPainter):
+        if len(self.data) == 0 and len(self.reference) == 0:
+            return
+        dynamic(qp)
+        rect = (0, 0, self.width(), self.height())
+        pen = QtGui.QPen(self.sweepColor)
+        pen.setWidth(self.pointSize)
+        line_pen = None
+        if self.drawLines:
+            line_pen = QtGui.QPen(self.sweepColor)
+            line_pen.setWidth(self.lineThickness)
+        data = self.pixels(self.data)
+        if len(data) > 0:
+            self.paintTrace(qp, np.trunc(data.real), np.trunc(data.imag),
+                            rect, pen, line_pen)
+        if len(self.reference) > 0:
+            pen = QtGui.QPen(pen)
+            pen.setColor(self.referenceColor)
+            if line_pen is not None:
+                line_pen = QtGui.QPen(line_pen)
+                line_pen.setColor(self.referenceColor)
+            target = self.data if len(self.data) > 0 else self.reference
+            freq = derive(self.reference).freq
+            low = np.searchsorted(freq, target[0].freq, side="left")
+            high = np.searchsorted(freq, target[-1].freq, side="right")
+            reference = self.pixels(self.reference)[low:high]
+            if len(reference) > 0:
+                self.paintTrace(qp, np.trunc(reference.real),
+                                np.trunc(reference.imag), rect, pen, line_pen)
+        for m in self.markers:
+            if m.location != -1 and m.location < len(data):
+                x, y = self.getPosition(self.data[m.location])
+                self.drawMarker(x, y, qp, m.color, self.markers.index(m) + 1)
+
+    def mouseMoveEvent(self, a0: QtGui.QMouseEvent) -> None:
+        if a0.buttons() == QtCore.Qt.RightButton:
+            a0.ignore()
+            return
+        x = a0.x()
+        y = a0.y()
+        absx = x - (self.width() - self.chartWidth) / 2
+        absy = y - (self.height() - self.chartHeight) / 2
+        if absx < 0 or absx > self.chartWidth or absy < 0 or absy > self.chartHeight \
+                or len(self.data) == len(self.reference) == 0:
+            a0.ignore()
+            return
+        a0.accept()
+
+        if len(self.data) > 0:
+            target = self.data
+        else:
+            target = self.reference
+        minimum_position = int(np.argmin(
+            np.abs(self.pixels(target) - complex(x, y))))
+        m = self.getActiveMarker()
+        if m is not None:
+            m.setFrequency(str(round(target[minimum_position].freq)))
+            m.frequencyInput.setText(str(round(target[minimum_position].freq)))
@@ -20,8 +20,10 @@ import math
 import logging
 from typing import List
 
+import numpy as np
 from PyQt5 import QtWidgets, QtGui
 
+from NanoVNASaver.Derived import Derived
 from NanoVNASaver.RFTools import Datapoint
 from .Frequency import FrequencyChart
 
@@ -29,6 +31,7 @@ logger = logging.getLogger(__name__)
 
 
 class VSWRChart(FrequencyChart):
+    scaleAttributes = ("maxVSWR", "span")
     logarithmicY = False
     maxVSWR = 3
     span = 2
@@ -67,7 +70,7 @@ class VSWRChart(FrequencyChart):
 
     def setLogarithmicY(self, logarithmic: bool):
         self.logarithmicY = logarithmic
-        self.update()
+        self.invalidateBackground()
 
     def copy(self):
         new_chart: VSWRChart = super().copy()
@@ -105,11 +108,8 @@ class VSWRChart(FrequencyChart):
             maxVSWR = self.maxDisplayValue
         else:
             minVSWR = 1
-            maxVSWR = 3
-            for d in self.data:
-                vswr = d.vswr
-                if vswr > maxVSWR:
-                    maxVSWR = vswr
+            _, maxVSWR = self.valueRange(
+                "vswr", lambda d: d.vswr, (self.data,), (1, 3))
             maxVSWR = min(self.maxDisplayValue, math.ceil(maxVSWR))
         self.maxVSWR = maxVSWR
         span = maxVSWR-minVSWR
@@ -176,8 +176,11 @@ class VSWRChart(FrequencyChart):
             qp.drawLine(self.leftMargin, y, self.leftMargin + self.chartWidth, y)
             qp.drawText(self.leftMargin + 3, y - 1, str(vswr))
 
-        self.drawData(qp, self.data, self.sweepColor)
-        self.drawData(qp, self.reference, self.referenceColor)
+        values = self.vswrs
+        self.drawData(qp, self.data, self.sweepColor,
+                      key=("vswr", self.logarithmicY), values=values)
+        self.drawData(qp, self.reference, self.referenceColor,
+                      key=("vswr", self.logarithmicY), values=values)
         self.drawMarkers(qp)
 
     def getYPositionFromValue(self, vswr) -> int:
@@ -192,9 +195,21 @@ class VSWRChart(FrequencyChart):
                 round((math.log(self.maxVSWR) - math.log(vswr)) / span * self.chartHeight))
         return self.topMargin + round((self.maxVSWR - vswr) / self.span * self.chartHeight)
 
+    def vswrs(self, derived: Derived) -> np.ndarray:
+        """VSWR ordered like the y positions, values the logarithmic
+        scale can not show are placed at the top"""
+        if self.logarithmicY:
+            return np.where(derived.vswr > 0, derived.vswr, np.inf)
+        return derived.vswr
+
     def getYPosition(self, d: Datapoint) -> int:
         return self.getYPositionFromValue(d.vswr)
 
+    def getYPositions(self, values: np.ndarray) -> np.ndarray:
+        if self.logarithmicY:
+            return self.logYPositions(values, self.maxVSWR, self.span)
+        return self.yPositions(values, self.maxVSWR, self.span)
+
     def valueAtPosition(self, y) -> List[float]:
         absy = y - self.topMargin
         if self.logarithmicY:
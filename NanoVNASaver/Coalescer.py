@@ -0,0 +1,88 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+from threading import Lock
+from time import monotonic
+from typing import Tuple
+
+from PyQt5 import QtCore
+from PyQt5.QtCore import pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+MAX_RATE = 25.0
+
+
+class UpdateCoalescer(QtCore.QObject):
+    """Rate limits data update notifications.
+
+    notify() may be called from any thread at any rate. updated is
+    emitted in the GUI thread at most max_rate times per second with the
+    union of the index ranges changed since the last emit. An empty
+    range (start == stop) only signals progress. Receivers read the
+    latest data themselves, so intermediate states are skipped."""
+    updated = pyqtSignal(int, int)
+    _pending = pyqtSignal()
+
+    def __init__(self, max_rate: float = MAX_RATE,
+                 parent: QtCore.QObject = None):
+        super().__init__(parent)
+        self.max_rate = max_rate
+        self._lock = Lock()
+        self._range: Tuple[int, int] = None
+        self._scheduled = False
+        self._last = 0.0
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._emit)
+        self._pending.connect(self._schedule, QtCore.Qt.QueuedConnection)
+
+    def notify(self, start: int = 0, stop: int = 0):
+        with self._lock:
+            if self._range is None or self._range[0] == self._range[1]:
+                self._range = (start, stop)
+            elif start < stop:
+                self._range = (min(self._range[0], start),
+                               max(self._range[1], stop))
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._pending.emit()
+
+    def flush(self):
+        """emits a pending update immediately, also if its _schedule
+        is still queued. To be called in the GUI thread."""
+        self._timer.stop()
+        self._emit()
+
+    def _schedule(self):
+        wait = 0.0
+        if self.max_rate > 0:
+            wait = self._last + 1 / self.max_rate - monotonic()
+        self._timer.start(max(0, round(wait * 1000)))
+
+    def _emit(self):
+        with self._lock:
+            if self._range is None:
+                return
+            start, stop = self._range
+            self._range = None
+            self._scheduled = False
+        self._last = monotonic()
+        self.updated.emit(start, stop)
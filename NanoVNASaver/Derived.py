@@ -0,0 +1,168 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import math
+from typing import Callable, Hashable, Sequence, Tuple
+
+import numpy as np
+
+from NanoVNASaver.RFTools import Datapoint, group_delay
+
+
+class Derived:
+    """Vectorized quantities derived from a sequence of datapoints.
+
+    Mirrors the Datapoint properties as arrays. Every array is calculated
+    on first use, kept read-only and shared by all readers."""
+
+    def __init__(self, data: Sequence[Datapoint]):
+        self.data = data
+        self._cache = {}
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def cached(self, key, func: Callable[[], np.ndarray]) -> np.ndarray:
+        """returns the read-only array func() calculated on first use"""
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        with np.errstate(divide="ignore", invalid="ignore"):
+            value = np.asarray(func())
+        value.setflags(write=False)
+        self._cache[key] = value
+        return value
+
+    def extent(self, key: Hashable, values: Callable[["Derived"], np.ndarray],
+               fstart: float = -math.inf, fstop: float = math.inf
+               ) -> Tuple[float, float]:
+        """min and max of the finite values(self) from fstart to fstop,
+        NaN if there are none. The last axis of values runs along freq.
+        Cached under key and the frequency window."""
+        def extent():
+            freq = self.freq
+            window = (freq >= fstart) & (freq <= fstop)
+            selected = np.asarray(values(self), dtype=float)[..., window]
+            selected = np.where(np.isfinite(selected), selected, np.nan)
+            if np.isnan(selected).all():
+                return np.full(2, np.nan)
+            return np.array([np.nanmin(selected), np.nanmax(selected)])
+        low, high = self.cached(("extent", key, fstart, fstop), extent)
+        return float(low), float(high)
+
+    @property
+    def freq(self) -> np.ndarray:
+        return self.cached("freq", lambda: np.array(
+            [dp.freq for dp in self.data], dtype=np.int64))
+
+    @property
+    def z(self) -> np.ndarray:
+        """the reflection or transmission coefficient"""
+        return self.cached("z", lambda: np.array(
+            [complex(dp.re, dp.im) for dp in self.data], dtype=complex))
+
+    @property
+    def mag(self) -> np.ndarray:
+        return self.cached("mag", lambda: np.abs(self.z))
+
+    @property
+    def gain(self) -> np.ndarray:
+        """magnitude in dB, -inf for zero magnitude"""
+        return self.cached("gain", lambda: 20 * np.log10(self.mag))
+
+    @property
+    def phase(self) -> np.ndarray:
+        return self.cached("phase", lambda: np.angle(self.z))
+
+    @property
+    def unwrappedPhase(self) -> np.ndarray:
+        return self.cached("unwrappedPhase", lambda: np.unwrap(self.phase))
+
+    @property
+    def vswr(self) -> np.ndarray:
+        def vswr():
+            mag = self.mag
+            return np.where(mag == 1, 1.0, (1 + mag) / (1 - mag))
+        return self.cached("vswr", vswr)
+
+    def groupDelay(self, aperture: int = 1) -> np.ndarray:
+        """group delay in seconds, see RFTools.group_delay"""
+        return self.cached(("groupDelay", aperture), lambda: group_delay(
+            self.freq, self.phase, aperture))
+
+    def impedance(self, ref_impedance: float = 50) -> np.ndarray:
+        def impedance():
+            z = self.z
+            return np.where(z == 1, complex(math.inf, 0),
+                            (-z - 1) / (z - 1) * ref_impedance)
+        return self.cached(("impedance", ref_impedance), impedance)
+
+    def admittance(self, ref_impedance: float = 50) -> np.ndarray:
+        return self.cached(("admittance", ref_impedance),
+                           lambda: 1 / self.impedance(ref_impedance))
+
+    def qFactor(self, ref_impedance: float = 50) -> np.ndarray:
+        def q():
+            imp = self.impedance(ref_impedance)
+            return np.where(imp.real == 0, -1.0,
+                            np.abs(imp.imag / imp.real))
+        return self.cached(("qFactor", ref_impedance), q)
+
+    def capacitiveEquivalent(self, ref_impedance: float = 50) -> np.ndarray:
+        def capacitance():
+            freq = self.freq
+            imag = self.impedance(ref_impedance).imag
+            return np.select(
+                [freq == 0, imag == 0],
+                [-math.inf, math.inf],
+                -(1 / (freq * 2 * math.pi * imag)))
+        return self.cached(("capacitiveEquivalent", ref_impedance),
+                           capacitance)
+
+    def inductiveEquivalent(self, ref_impedance: float = 50) -> np.ndarray:
+        def inductance():
+            freq = self.freq
+            imag = self.impedance(ref_impedance).imag
+            return np.where(freq == 0, 0.0, imag / (freq * 2 * math.pi))
+        return self.cached(("inductiveEquivalent", ref_impedance),
+                           inductance)
+
+
+class Trace(tuple):
+    """An immutable sequence of datapoints carrying its Derived cache"""
+
+    @property
+    def derived(self) -> Derived:
+        try:
+            return self._derived
+        except AttributeError:
+            self._derived = Derived(self)
+            return self._derived
+
+
+def derive(data: Sequence[Datapoint]) -> Derived:
+    """returns the shared cache of a Trace, a new one for other data"""
+    if isinstance(data, Trace):
+        return data.derived
+    return Derived(data)
+
+
+def as_trace(data: Sequence[Datapoint]) -> Trace:
+    """returns data as Trace, keeping the cache of an existing one"""
+    return data if isinstance(data, Trace) else Trace(data)
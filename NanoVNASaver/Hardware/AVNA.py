@@ -39,4 +39,6 @@ class AVNA(VNA):
         list(self.exec_command("resume"))
 
     def setSweep(self, start, stop):
+        self.start = start
+        self.stop = stop
         list(self.exec_command(f"sweep {start} {stop} {self.datapoints}"))
@@ -0,0 +1,80 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, Coroutine
+
+from PyQt5 import QtCore
+from PyQt5.QtCore import pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBridge(QtCore.QObject):
+    """Runs an asyncio event loop beside the Qt event loop.
+
+    Coroutines are submitted from the GUI thread and executed on a
+    background loop thread, their results are delivered back to the GUI
+    thread through a queued signal, so the GUI never blocks on I/O."""
+    _done = pyqtSignal(object, object, object)
+
+    def __init__(self, parent: QtCore.QObject = None):
+        super().__init__(parent)
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run, name="AsyncBridge", daemon=True)
+        self._done.connect(self._deliver, QtCore.Qt.QueuedConnection)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro: Coroutine,
+               callback: Callable[[object], None] = None,
+               errback: Callable[[BaseException], None] = None) -> Future:
+        """schedules coro on the loop thread. callback or errback are
+        called in the GUI thread once it is done. Cancel the returned
+        future to cancel the coroutine."""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        future.add_done_callback(
+            lambda f: self._done.emit(f, callback, errback))
+        return future
+
+    def _deliver(self, future: Future, callback, errback):
+        if future.cancelled():
+            logger.debug("Coroutine was cancelled")
+            return
+        exc = future.exception()
+        if exc is not None:
+            if errback is None:
+                logger.error("Unhandled error in coroutine: %s", exc)
+                return
+            errback(exc)
+        elif callback is not None:
+            callback(future.result())
+
+    def stop(self):
+        """stops the loop, coroutines still running are dropped"""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(2.5)
+        if not self._thread.is_alive():
+            self.loop.close()
@@ -0,0 +1,114 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Tuple
+
+from NanoVNASaver.Hardware.VNA import VNA
+from NanoVNASaver.Settings.Sweep import Sweep
+from NanoVNASaver.core.SweepEngine import SweepEngine
+
+logger = logging.getLogger(__name__)
+
+# driver calls of a segment read: sweep range, frequencies, two channels
+SEGMENT_CALLS = 4
+
+Values = List[Tuple[float, float]]
+
+
+class AsyncVNA:
+    """Awaitable front end for the blocking VNA drivers.
+
+    Every device gets its own single worker thread, so commands to one
+    device stay serialized while any number of devices share an event
+    loop. Timeouts and cancellation abort the running driver command,
+    see VNA.abort(); the binary NanoVNA-V2 protocol checks for it
+    between FIFO reads. Segments are read by a SweepEngine, so corrupt
+    points are recovered the same way as in the GUI sweep."""
+
+    def __init__(self, vna: VNA, timeout: float = 10.0):
+        self.vna = vna
+        self.timeout = timeout
+        self.engine = SweepEngine(vna)
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"{vna.name}")
+
+    def __str__(self):
+        return f"{self.vna.name} on {self.vna.serial}"
+
+    async def _call(self, func, *args, timeout: float = None):
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, partial(func, *args))
+        try:
+            return await asyncio.wait_for(
+                future, self.timeout if timeout is None else timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            logger.debug("Aborting %s command", self)
+            self.vna.abort()
+            raise
+
+    async def command(self, command: str,
+                      timeout: float = None) -> List[str]:
+        return await self._call(
+            lambda: list(self.vna.exec_command(command)), timeout=timeout)
+
+    async def set_sweep(self, start: int, stop: int):
+        await self._call(self.vna.setSweep, start, stop)
+
+    async def read_frequencies(self) -> List[int]:
+        return await self._call(self.vna.readFrequencies)
+
+    async def read_values(self, value: str) -> List[str]:
+        return await self._call(self.vna.readValues, value)
+
+    async def read_segment(self, start: int, stop: int
+                           ) -> Tuple[List[int], Values, Values]:
+        frequencies, values11, values21 = await self._call(
+            self.engine.readSegment, start, stop,
+            timeout=self.timeout * SEGMENT_CALLS)
+        if not frequencies:
+            raise IOError(f"{self}: failed reading {start} to {stop}")
+        return frequencies, values11, values21
+
+    async def sweep(self, sweep: Sweep) -> Tuple[List[int], Values, Values]:
+        frequencies = []
+        values11 = []
+        values21 = []
+        for i in range(sweep.segments):
+            start, stop = sweep.get_index_range(i)
+            freq, tmp11, tmp21 = await self.read_segment(start, stop)
+            frequencies += freq
+            values11 += tmp11
+            values21 += tmp21
+        if sweep.segments > 1:
+            await self._call(self.vna.resetSweep, sweep.start, sweep.end)
+        return frequencies, values11, values21
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+async def sweep_devices(devices: List[AsyncVNA], sweep: Sweep) -> list:
+    """sweeps all devices concurrently on the running event loop.
+    Failed devices return their exception instead of a result."""
+    return await asyncio.gather(
+        *(device.sweep(sweep) for device in devices),
+        return_exceptions=True)
@@ -0,0 +1,78 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+import math
+from typing import Dict, List, Tuple
+
+from NanoVNASaver.Hardware.VNA import _max_retries
+
+logger = logging.getLogger(__name__)
+
+# S21 noise floor in dB measured with REFERENCE_BW IF bandwidth
+REFERENCE_BW = 1000
+NOISE_FLOOR = -80.0
+DEFAULT_SNR = 20.0
+
+
+def noise_floor(bandwidth: int, floor: float = NOISE_FLOOR) -> float:
+    """noise floor in dB at the given IF bandwidth"""
+    return floor + 10 * math.log10(bandwidth / REFERENCE_BW)
+
+
+class BandwidthScheduler:
+    """Picks an IF bandwidth per sweep segment.
+
+    The lowest S21 level a segment had in the previous sweep decides
+    how narrow the bandwidth has to be to keep the noise floor snr dB
+    below it. As the sweep time (_max_retries) only grows with narrower
+    bandwidths, taking the widest sufficient bandwidth for every segment
+    minimizes the total sweep time."""
+
+    def __init__(self, bandwidths: List[int], default: int,
+                 snr: float = DEFAULT_SNR, floor: float = NOISE_FLOOR):
+        self.bandwidths = sorted(bandwidths)
+        self.default = default
+        self.snr = snr
+        self.floor = floor
+        self.levels: Dict[int, float] = {}
+
+    def reset(self):
+        self.levels = {}
+
+    def update(self, segment: int, values21: List[Tuple[float, float]]):
+        """stores the lowest S21 level in dB of a segment"""
+        if not values21:
+            return
+        magnitude = min(math.hypot(re, im) for re, im in values21)
+        self.levels[segment] = 20 * math.log10(max(magnitude, 1e-12))
+
+    def choose(self, segment: int) -> int:
+        level = self.levels.get(segment)
+        if level is None:
+            return self.default
+        usable = [bw for bw in self.bandwidths
+                  if noise_floor(bw, self.floor) + self.snr <= level]
+        if not usable:
+            return self.bandwidths[0]
+        return usable[-1]
+
+    def estimate(self, segments: int, datapoints: int) -> int:
+        """estimated sweep time of all segments in read retries"""
+        return sum(_max_retries(self.choose(i), datapoints)
+                   for i in range(segments))
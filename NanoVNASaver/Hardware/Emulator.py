@@ -0,0 +1,177 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+Emulates the text shell of a NanoVNA on a local pseudo terminal, so the
+serial drivers can be exercised without hardware (POSIX only).
+"""
+import logging
+import math
+import os
+import random
+import select
+import threading
+import tty
+from time import sleep
+from typing import Callable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def resonator(freq: int, r: float = 5.0, l: float = 1e-6,
+              c: float = 127e-12) -> Tuple[complex, complex]:
+    """S11 and S21 of a series RLC circuit between the ports"""
+    omega = 2 * math.pi * freq
+    z = complex(r, omega * l - 1 / (omega * c))
+    return (z - 50) / (z + 50), 100 / (100 + z)
+
+
+class Emulator:
+    """A NanoVNA answering on a pty. Use port as serial device name."""
+
+    def __init__(self,
+                 info: str = "NanoVNA-H",
+                 version: str = "1.0.45",
+                 dut: Callable[[int], Tuple[complex, complex]] = resonator,
+                 glitch_rate: float = 0.0,
+                 delay: float = 0.0,
+                 seed: int = 0):
+        self.info = info
+        self.version = version
+        self.dut = dut
+        self.glitch_rate = glitch_rate
+        self.delay = delay
+        self.bandwidths = (10, 30, 100, 300, 1000, 2000)
+        self.bandwidth = 1000
+        self.start = 50000
+        self.stop = 900000000
+        self.points = 101
+        self.commands: List[str] = []
+        self._random = random.Random(seed)
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._serve, name=f"Emulator {self.port}", daemon=True)
+        self._thread.start()
+
+    def __str__(self):
+        return f"{self.port} ({self.info} emulator)"
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        os.close(self._master)
+        os.close(self._slave)
+
+    def frequencies(self, start: int, stop: int, points: int) -> List[int]:
+        if points < 2:
+            return [start]
+        return [start + (stop - start) * i // (points - 1)
+                for i in range(points)]
+
+    def _value(self, value: complex) -> str:
+        if self._random.random() < self.glitch_rate:
+            return "12.5 -11.25"
+        return f"{value.real:.9f} {value.imag:.9f}"
+
+    def _set_sweep(self, args: List[str]):
+        if len(args) >= 2:
+            self.start, self.stop = int(args[0]), int(args[1])
+        if len(args) >= 3:
+            self.points = int(args[2])
+
+    def _scan(self, args: List[str]) -> List[str]:
+        self._set_sweep(args)
+        mask = int(args[3], 0) if len(args) > 3 else 0
+        lines = []
+        for freq in self.frequencies(self.start, self.stop, self.points):
+            s11, s21 = self.dut(freq)
+            fields = []
+            if mask & 0b001:
+                fields.append(str(freq))
+            if mask & 0b010:
+                fields.append(self._value(s11))
+            if mask & 0b100:
+                fields.append(self._value(s21))
+            if fields:
+                lines.append(" ".join(fields))
+        return lines
+
+    def execute(self, line: str) -> List[str]:
+        cmd, *args = line.split()
+        self.commands.append(line)
+        if self.delay:
+            sleep(self.delay)
+        if cmd == "help":
+            return ["Commands: help info version sweep scan frequencies"
+                    " data bandwidth resume pause cal capture"]
+        if cmd == "info":
+            return [self.info, "2016-2020 Copyright @edy555",
+                    "Emulated on a pseudo terminal"]
+        if cmd == "version":
+            return [self.version]
+        if cmd == "bandwidth":
+            if args:
+                self.bandwidth = int(args[0])
+                return []
+            return ["usage: bandwidth {" +
+                    "|".join(str(bw) for bw in self.bandwidths) + "}"]
+        if cmd == "sweep":
+            self._set_sweep(args)
+            return []
+        if cmd == "scan":
+            return self._scan(args)
+        if cmd == "frequencies":
+            return [str(f) for f in self.frequencies(
+                self.start, self.stop, self.points)]
+        if cmd == "data":
+            channel = int(args[0]) if args else 0
+            return [self._value(self.dut(f)[channel]) for f in
+                    self.frequencies(self.start, self.stop, self.points)]
+        if cmd == "cal":
+            return ["calibration: none"]
+        if cmd in ("resume", "pause"):
+            return []
+        return [f"{cmd}?"]
+
+    def _write(self, text: str):
+        data = text.encode("ascii")
+        while data and not self._stop.is_set():
+            written = os.write(self._master, data)
+            data = data[written:]
+
+    def _serve(self):
+        buffer = b""
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._master], [], [], 0.05)
+            if not ready:
+                continue
+            try:
+                buffer += os.read(self._master, 1024)
+            except OSError:
+                return
+            while b"\r" in buffer:
+                line, buffer = buffer.split(b"\r", 1)
+                line = line.decode("ascii", errors="replace").strip()
+                if not line:
+                    self._write("ch> ")
+                    continue
+                output = [line] + self.execute(line)
+                self._write("\r\n".join(output) + "\r\nch> ")
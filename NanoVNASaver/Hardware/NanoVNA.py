@@ -22,7 +22,6 @@ from typing import List
 
 import serial
 import numpy as np
-from PyQt5 import QtGui
 
 from NanoVNASaver.Hardware.Serial import drain_serial, Interface
 from NanoVNASaver.Hardware.VNA import VNA
@@ -40,8 +39,6 @@ class NanoVNA(VNA):
         super().__init__(iface)
         self.sweep_method = "sweep"
         self.read_features()
-        self.start = 27000000
-        self.stop = 30000000
         self._sweepdata = []
 
     def _capture_data(self) -> bytes:
@@ -68,7 +65,8 @@ class NanoVNA(VNA):
                 ((rgb_array & 0x07E0) << 5) +
                 ((rgb_array & 0x001F) << 3))
 
-    def getScreenshot(self) -> QtGui.QPixmap:
+    def getScreenshot(self) -> 'QtGui.QPixmap':
+        from PyQt5 import QtGui  # pylint: disable=import-outside-toplevel
         logger.debug("Capturing screenshot...")
         if not self.connected():
             return QtGui.QPixmap()
@@ -109,10 +107,10 @@ class NanoVNA(VNA):
             self.features.add("Scan command")
             self.sweep_method = "scan"
 
-    def readFrequencies(self) -> List[int]:
-        logger.debug("readFrequencies: %s", self.sweep_method)
+    def queryFrequencies(self) -> List[int]:
+        logger.debug("queryFrequencies: %s", self.sweep_method)
         if self.sweep_method != "scan_mask":
-            return super().readFrequencies()
+            return super().queryFrequencies()
         return [int(line) for line in self.exec_command(
             f"scan {self.start} {self.stop} {self.datapoints} 0b001")]
 
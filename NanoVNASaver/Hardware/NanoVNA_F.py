@@ -20,7 +20,6 @@ import logging
 
 import serial
 import numpy as np
-from PyQt5 import QtGui
 
 from NanoVNASaver.Hardware.NanoVNA import NanoVNA
 
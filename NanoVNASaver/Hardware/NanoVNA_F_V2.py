@@ -3,7 +3,6 @@ from NanoVNASaver.Hardware.Serial import drain_serial, Interface
 import serial
 import struct
 import numpy as np
-from PyQt5 import QtGui
 
 from NanoVNASaver.Hardware.NanoVNA import NanoVNA
 
@@ -15,7 +14,8 @@ class NanoVNA_F_V2(NanoVNA):
     screenwidth = 800
     screenheight = 480
 
-    def getScreenshot(self) -> QtGui.QPixmap:
+    def getScreenshot(self) -> 'QtGui.QPixmap':
+        from PyQt5 import QtGui  # pylint: disable=import-outside-toplevel
         logger.debug("Capturing screenshot...")
         if not self.connected():
             return QtGui.QPixmap()
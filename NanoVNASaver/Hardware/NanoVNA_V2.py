@@ -83,6 +83,7 @@ class NanoVNA_V2(VNA):
 
         self.sweepStartHz = 200e6
         self.sweepStepHz = 1e6
+        self.sweepPoints = self.datapoints
 
         self._sweepdata = []
         self._updateSweep()
@@ -115,7 +116,9 @@ class NanoVNA_V2(VNA):
             s21hack = "S21 hack" in self.features
             # reset protocol to known state
             timeout = self.serial.timeout
+            generation = self._aborts
             with self.serial.lock:
+                self.check_abort(generation, value)
                 self.serial.write(pack("<Q", 0))
                 sleep(WRITE_SLEEP)
                 # cmd: write register 0x30 to clear FIFO
@@ -129,45 +132,48 @@ class NanoVNA_V2(VNA):
                 # we read at most 255 values at a time and the time required empirically is
                 # just over 3 seconds for 101 points or 7 seconds for 255 points
                 self.serial.timeout = min(pointstodo, 255) * 0.035 + 0.1
-                while pointstodo > 0:
-                    logger.info("reading values")
-                    pointstoread = min(255, pointstodo)
-                    # cmd: read FIFO, addr 0x30
-                    self.serial.write(
-                        pack("<BBB",
-                             _CMD_READFIFO, _ADDR_VALUES_FIFO,
-                             pointstoread))
-                    sleep(WRITE_SLEEP)
-                    # each value is 32 bytes
-                    nBytes = pointstoread * 32
-
-                    # serial .read() will try to read nBytes bytes in timeout secs
-                    arr = self.serial.read(nBytes)
-                    if nBytes != len(arr):
-                        logger.warning("expected %d bytes, got %d",
-                                       nBytes, len(arr))
-                        # the way to retry on timeout is keep the data already read
-                        # then try to read the rest of the data into the array
-                        if nBytes > len(arr):
-                            arr = arr + self.serial.read(nBytes - len(arr))
-                    if nBytes != len(arr):
-                        return []
-
-                    freq_index = -1
-                    for i in range(pointstoread):
-                        (fwd_real, fwd_imag, rev0_real, rev0_imag, rev1_real,
-                         rev1_imag, freq_index) = unpack_from(
-                             "<iiiiiihxxxxxx", arr, i * 32)
-                        fwd = complex(fwd_real, fwd_imag)
-                        refl = complex(rev0_real, rev0_imag)
-                        thru = complex(rev1_real, rev1_imag)
-                        if i == 0:
-                            logger.debug("Freq index from: %i", freq_index)
-                        self._sweepdata[freq_index] = (refl / fwd, thru / fwd)
-                    logger.debug("Freq index to: %i", freq_index)
-
-                    pointstodo = pointstodo - pointstoread
-            self.serial.timeout = timeout
+                try:
+                    while pointstodo > 0:
+                        logger.info("reading values")
+                        self.check_abort(generation, value)
+                        pointstoread = min(255, pointstodo)
+                        # cmd: read FIFO, addr 0x30
+                        self.serial.write(
+                            pack("<BBB",
+                                 _CMD_READFIFO, _ADDR_VALUES_FIFO,
+                                 pointstoread))
+                        sleep(WRITE_SLEEP)
+                        # each value is 32 bytes
+                        nBytes = pointstoread * 32
+
+                        # serial .read() will try to read nBytes bytes in timeout secs
+                        arr = self.serial.read(nBytes)
+                        if nBytes != len(arr):
+                            logger.warning("expected %d bytes, got %d",
+                                           nBytes, len(arr))
+                            # the way to retry on timeout is keep the data already read
+                            # then try to read the rest of the data into the array
+                            if nBytes > len(arr):
+                                arr = arr + self.serial.read(nBytes - len(arr))
+                        if nBytes != len(arr):
+                            return []
+
+                        freq_index = -1
+                        for i in range(pointstoread):
+                            (fwd_real, fwd_imag, rev0_real, rev0_imag, rev1_real,
+                             rev1_imag, freq_index) = unpack_from(
+                                 "<iiiiiihxxxxxx", arr, i * 32)
+                            fwd = complex(fwd_real, fwd_imag)
+                            refl = complex(rev0_real, rev0_imag)
+                            thru = complex(rev1_real, rev1_imag)
+                            if i == 0:
+                                logger.debug("Freq index from: %i", freq_index)
+                            self._sweepdata[freq_index] = (refl / fwd, thru / fwd)
+                        logger.debug("Freq index to: %i", freq_index)
+
+                        pointstodo = pointstodo - pointstoread
+                finally:
+                    self.serial.timeout = timeout
 
             if s21hack:
                 self._sweepdata = self._sweepdata[1:]
@@ -215,10 +221,12 @@ class NanoVNA_V2(VNA):
 
     def setSweep(self, start, stop):
         step = (stop - start) / (self.datapoints - 1)
-        if start == self.sweepStartHz and step == self.sweepStepHz:
+        if (start == self.sweepStartHz and step == self.sweepStepHz and
+                self.datapoints == self.sweepPoints):
             return
         self.sweepStartHz = start
         self.sweepStepHz = step
+        self.sweepPoints = self.datapoints
         logger.info('NanoVNAV2: set sweep start %d step %d',
                     self.sweepStartHz, self.sweepStepHz)
         self._updateSweep()
@@ -17,12 +17,13 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import logging
+import math
 from collections import OrderedDict
+from threading import Lock
 from time import sleep
-from typing import List, Iterator
-
-from PyQt5 import QtGui
+from typing import List, Iterator, Tuple
 
+from NanoVNASaver.Settings.Sweep import device_grid
 from NanoVNASaver.Version import Version
 from NanoVNASaver.Hardware.Serial import Interface, drain_serial
 
@@ -37,6 +38,9 @@ DISLORD_BW = OrderedDict((
     (2000, 0),
 ))
 WAIT = 0.05
+# once the local frequency plan matched the device, only every
+# PLAN_CHECK_INTERVAL'th frequency read is checked against the device
+PLAN_CHECK_INTERVAL = 25
 
 
 def _max_retries(bandwidth: int, datapoints: int) -> int:
@@ -44,6 +48,31 @@ def _max_retries(bandwidth: int, datapoints: int) -> int:
                  (1000 / bandwidth) ** 1.30 * (datapoints / 101))
 
 
+def parse_values(lines: List[str], validate: bool = False
+                 ) -> Tuple[List[Tuple[float, float]], List[int]]:
+    """parse_values converts "re im" lines read from the device into
+    value tuples. Unparsable or, if validate is set, implausible
+    values are returned as NaN and their indices are listed as bad"""
+    values = []
+    bad = []
+    for i, line in enumerate(lines):
+        try:
+            a, b = line.split(" ")
+            real, imag = float(a), float(b)
+        except ValueError as exc:
+            logger.warning("Could not parse data value (%s): %s", line, exc)
+            values.append((math.nan, math.nan))
+            bad.append(i)
+            continue
+        if validate and (abs(real) > 9.5 or abs(imag) > 9.5):
+            logger.warning("Got a non plausible data value: (%s)", line)
+            values.append((math.nan, math.nan))
+            bad.append(i)
+            continue
+        values.append((real, imag))
+    return values, bad
+
+
 class VNA:
     name = "VNA"
     valid_datapoints = (101, 51, 11)
@@ -57,6 +86,12 @@ class VNA:
         self.datapoints = self.valid_datapoints[0]
         self.bandwidth = 1000
         self.bw_method = "ttrftech"
+        self.start = 27000000
+        self.stop = 30000000
+        self.plan_verified = False
+        self._plan_reads = 0
+        self._aborts = 0
+        self._abort_lock = Lock()
         if self.connected():
             self.version = self.readVersion()
             self.read_features()
@@ -84,7 +119,9 @@ class VNA:
 
     def exec_command(self, command: str, wait: float = WAIT) -> Iterator[str]:
         logger.debug("exec_command(%s)", command)
+        generation = self._aborts
         with self.serial.lock:
+            self.check_abort(generation, command)
             drain_serial(self.serial)
             self.serial.write(f"{command}\r".encode('ascii'))
             sleep(wait)
@@ -92,6 +129,7 @@ class VNA:
             max_retries = _max_retries(self.bandwidth, self.datapoints)
             logger.debug("Max retries: %s", max_retries)
             while True:
+                self.check_abort(generation, command)
                 line = self.serial.readline()
                 line = line.decode("ascii").strip()
                 if not line:
@@ -107,6 +145,18 @@ class VNA:
                     break
                 yield line
 
+    def abort(self):
+        """makes running commands, and those already waiting for the
+        serial lock, give up with an IOError"""
+        with self._abort_lock:
+            self._aborts += 1
+
+    def check_abort(self, generation: int, command: str):
+        """raises IOError if abort() was called since generation
+        was read from self._aborts"""
+        if self._aborts != generation:
+            raise IOError(f"{command} aborted")
+
     def read_features(self):
         result = " ".join(self.exec_command("help")).split()
         logger.debug("result:\n%s", result)
@@ -140,9 +190,29 @@ class VNA:
             raise IOError(f"set_bandwith({bandwidth}: {result}")
         self.bandwidth = bandwidth
 
-    def readFrequencies(self) -> List[int]:
+    def frequency_plan(self, start: int, stop: int) -> List[int]:
+        """the frequencies the firmware steps through from start to stop"""
+        return device_grid(start, stop, self.datapoints).tolist()
+
+    def queryFrequencies(self) -> List[int]:
         return [int(f) for f in self.readValues("frequencies")]
 
+    def readFrequencies(self) -> List[int]:
+        planned = self.frequency_plan(self.start, self.stop)
+        self._plan_reads += 1
+        if self.plan_verified and self._plan_reads % PLAN_CHECK_INTERVAL:
+            return planned
+        frequencies = self.queryFrequencies()
+        if frequencies == planned:
+            if not self.plan_verified:
+                logger.info("Frequency plan of %s verified", self.name)
+            self.plan_verified = True
+        elif self.plan_verified:
+            logger.warning("Frequency plan mismatch, querying %s again",
+                           self.name)
+            self.plan_verified = False
+        return frequencies
+
     def resetSweep(self, start: int, stop: int):
         pass
 
@@ -155,7 +225,9 @@ class VNA:
     def getCalibration(self) -> str:
         return " ".join(list(self.exec_command("cal")))
 
-    def getScreenshot(self) -> QtGui.QPixmap:
+    def getScreenshot(self) -> 'QtGui.QPixmap':
+        # imported here, the drivers are used without Qt as well
+        from PyQt5 import QtGui  # pylint: disable=import-outside-toplevel
         return QtGui.QPixmap()
 
     def flushSerialBuffers(self):
@@ -186,4 +258,6 @@ class VNA:
         return Version(result[0])
 
     def setSweep(self, start, stop):
+        self.start = start
+        self.stop = stop
         list(self.exec_command(f"sweep {start} {stop} {self.datapoints}"))
@@ -76,13 +76,13 @@ class Value():
         # handle boundaries
         if index == 0:
             index = 1
-            s11data = [s11data[0], ] + s11data
+            s11data = [s11data[0], ] + list(s11data)
             if s21data:
-                s21data = [s21data[0], ] + s21data
+                s21data = [s21data[0], ] + list(s21data)
         if index == len(s11data):
-            s11data = s11data + [s11data[-1], ]
+            s11data = list(s11data) + [s11data[-1], ]
             if s21data:
-                s21data = s21data + [s21data[-1], ]
+                s21data = list(s21data) + [s21data[-1], ]
         self.freq = s11data[1].freq
         self.s11data = s11data[index-1:index+2]
         if s21data:
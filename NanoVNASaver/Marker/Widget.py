@@ -19,10 +19,12 @@
 import math
 from typing import List
 
+import numpy as np
 from PyQt5 import QtGui, QtWidgets, QtCore
 from PyQt5.QtCore import pyqtSignal
 
 from NanoVNASaver import RFTools
+from NanoVNASaver.Derived import derive
 from NanoVNASaver.Formatting import (
     format_capacitance,
     format_complex_imp,
@@ -238,7 +240,10 @@ class Marker(QtCore.QObject, Value):
     def getRow(self):
         return QtWidgets.QLabel(self.name), self.layout
 
-    def findLocation(self, data: List[RFTools.Datapoint]):
+    def findLocation(self, data: List[RFTools.Datapoint],
+                     frequencies: np.ndarray = None):
+        """finds the nearest data point, frequencies are the
+        frequencies of data if already available as array"""
         self.location = -1
         self.frequencyInput.nextFrequency = -1
         self.frequencyInput.previousFrequency = -1
@@ -247,31 +252,28 @@ class Marker(QtCore.QObject, Value):
             # Set the frequency before loading any data
             return
 
-        min_freq = data[0].freq
-        max_freq = data[-1].freq
-        lower_stepsize = data[1].freq - data[0].freq
-        upper_stepsize = data[-1].freq - data[-2].freq
+        if frequencies is None:
+            frequencies = np.array([dp.freq for dp in data])
+        min_freq = frequencies[0]
+        max_freq = frequencies[-1]
+        lower_stepsize = frequencies[1] - frequencies[0]
+        upper_stepsize = frequencies[-1] - frequencies[-2]
 
         # We are outside the bounds of the data, so we can't put in a marker
         if (self.freq + lower_stepsize/2 < min_freq or
                 self.freq - upper_stepsize/2 > max_freq):
             return
 
-        min_distance = max_freq
-        for i, item in enumerate(data):
-            if abs(item.freq - self.freq) <= min_distance:
-                min_distance = abs(item.freq - self.freq)
-            else:
-                # We have now started moving away from the nearest point
-                self.location = i-1
-                if i < datasize:
-                    self.frequencyInput.nextFrequency = item.freq
-                if (i-2) >= 0:
-                    self.frequencyInput.previousFrequency = data[i-2].freq
-                return
-        # If we still didn't find a best spot, it was the last value
-        self.location = datasize - 1
-        self.frequencyInput.previousFrequency = data[-2].freq
+        i = int(np.searchsorted(frequencies, self.freq))
+        if i == datasize or (
+                i > 0 and
+                self.freq - frequencies[i - 1] < frequencies[i] - self.freq):
+            i -= 1
+        self.location = i
+        if i + 1 < datasize:
+            self.frequencyInput.nextFrequency = int(frequencies[i + 1])
+        if i > 0:
+            self.frequencyInput.previousFrequency = int(frequencies[i - 1])
 
     def get_data_layout(self) -> QtWidgets.QGroupBox:
         return self.group_box
@@ -329,7 +331,8 @@ class Marker(QtCore.QObject, Value):
         self.label['returnloss'].setText(
             format_gain(s11.gain, self.returnloss_is_positive))
         self.label['s11groupdelay'].setText(
-            format_group_delay(RFTools.groupDelay(s11data, self.location)))
+            format_group_delay(float(
+                derive(s11data).groupDelay()[self.location])))
         self.label['s11mag'].setText(format_magnitude(abs(s11.z)))
         self.label['s11phase'].setText(format_phase(s11.phase))
         self.label['s11polar'].setText(
@@ -346,7 +349,8 @@ class Marker(QtCore.QObject, Value):
             s21 = s21data[self.location]
             self.label['s21gain'].setText(format_gain(s21.gain))
             self.label['s21groupdelay'].setText(
-                format_group_delay(RFTools.groupDelay(s21data, self.location) / 2))
+                format_group_delay(float(
+                    derive(s21data).groupDelay()[self.location]) / 2))
             self.label['s21mag'].setText(format_magnitude(abs(s21.z)))
             self.label['s21phase'].setText(format_phase(s21.phase))
             self.label['s21polar'].setText(
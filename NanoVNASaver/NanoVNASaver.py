@@ -18,10 +18,12 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import logging
 import sys
-import threading
 from collections import OrderedDict
+from functools import partial
 from time import sleep, strftime, localtime
-from typing import List
+from typing import List, Tuple
+
+import numpy as np
 
 from PyQt5 import QtWidgets, QtCore, QtGui
 
@@ -46,8 +48,13 @@ from .Charts import (
     SmithChart, SParameterChart, TDRChart,
 )
 from .Calibration import Calibration
+from .Derived import as_trace
+from .Snapshot import Snapshot
+from .Coalescer import UpdateCoalescer, MAX_RATE
+from .Scheduler import RenderScheduler
 from .Marker import Marker, DeltaMarker
 from .SweepWorker import SweepWorker
+from .core.History import CAPACITY, MAX_BYTES, SweepHistory
 from .Settings import BandsModel, Sweep
 from .Touchstone import Touchstone
 from .About import VERSION
@@ -62,7 +69,6 @@ class NanoVNASaver(QtWidgets.QWidget):
 
     def __init__(self):
         super().__init__()
-        self.s21att = 0.0
         if getattr(sys, 'frozen', False):
             logger.debug("Running from pyinstaller bundle")
             self.icon = QtGui.QIcon(f"{sys._MEIPASS}/icon_48x48.png")  # pylint: disable=no-member
@@ -76,7 +82,18 @@ class NanoVNASaver(QtWidgets.QWidget):
         self.threadpool = QtCore.QThreadPool()
         self.sweep = Sweep()
         self.worker = SweepWorker(self)
-
+        self.s21att = 0.0
+        self.history.capacity = self.settings.value(
+            "HistorySweeps", CAPACITY, int)
+        self.history.max_bytes = self.settings.value(
+            "HistoryMemory", MAX_BYTES, int)
+
+        self.coalescer = UpdateCoalescer(
+            self.settings.value("MaxRefreshRate", MAX_RATE, float), self)
+        self.scheduler = RenderScheduler(self.coalescer.max_rate, self)
+        self.coalescer.updated.connect(self.dataUpdated)
+        self.worker.signals.dataChanged.connect(
+            self.coalescer.notify, QtCore.Qt.DirectConnection)
         self.worker.signals.updated.connect(self.dataUpdated)
         self.worker.signals.finished.connect(self.sweepFinished)
         self.worker.signals.sweepError.connect(self.showSweepError)
@@ -97,14 +114,12 @@ class NanoVNASaver(QtWidgets.QWidget):
         self.interface = Interface("serial", "None")
         self.vna = VNA(self.interface)
 
-        self.dataLock = threading.Lock()
         # TODO: use Touchstone class as data container
-        self.data11: List[Datapoint] = []
-        self.data21: List[Datapoint] = []
+        self.snapshot = Snapshot()
+        self.shownVersion = 0
         self.referenceS11data: List[Datapoint] = []
         self.referenceS21data: List[Datapoint] = []
 
-        self.sweepSource = ""
         self.referenceSource = ""
 
         self.calibration = Calibration()
@@ -186,6 +201,7 @@ class NanoVNASaver(QtWidgets.QWidget):
 
         for c in self.subscribing_charts:
             c.popoutRequested.connect(self.popoutChart)
+            self.scheduler.add(c)
 
         self.charts_layout = QtWidgets.QGridLayout()
 
@@ -600,27 +616,63 @@ class NanoVNASaver(QtWidgets.QWidget):
     def sweep_stop(self):
         self.worker.stopped = True
 
+    # the sweep engine owns device, calibration and attenuation so a
+    # running sweep always uses the current ones
+    @property
+    def vna(self) -> VNA:
+        return self.worker.engine.vna
+
+    @vna.setter
+    def vna(self, vna: VNA):
+        self.worker.engine.vna = vna
+
+    @property
+    def calibration(self) -> Calibration:
+        return self.worker.engine.calibration
+
+    @calibration.setter
+    def calibration(self, calibration: Calibration):
+        self.worker.engine.calibration = calibration
+
+    @property
+    def s21att(self) -> float:
+        return self.worker.engine.s21att
+
+    @s21att.setter
+    def s21att(self, att: float):
+        self.worker.engine.s21att = att
+
+    @property
+    def history(self) -> SweepHistory:
+        return self.worker.engine.history
+
+    @property
+    def data11(self) -> Tuple[Datapoint, ...]:
+        return self.snapshot.s11
+
+    @property
+    def data21(self) -> Tuple[Datapoint, ...]:
+        return self.snapshot.s21
+
+    @property
+    def sweepSource(self) -> str:
+        return self.snapshot.source
+
     def saveData(self, data, data21, source=None):
-        with self.dataLock:
-            self.data11 = data
-            self.data21 = data21
-            if self.s21att > 0:
-                self.data21 = corr_att_data(self.data21, self.s21att)
-        if source is not None:
-            self.sweepSource = source
-        else:
-            self.sweepSource = (
+        if source is None:
+            source = (
                 f"{self.sweep.properties.name}"
                 f" {strftime('%Y-%m-%d %H:%M:%S', localtime())}"
             ).lstrip()
+        self.snapshot = Snapshot(data, data21, source)
 
     def markerUpdated(self, marker: Marker):
-        with self.dataLock:
-            marker.findLocation(self.data11)
-            marker.resetLabels()
-            marker.updateLabels(self.data11, self.data21)
-            for c in self.subscribing_charts:
-                c.update()
+        snapshot = self.snapshot
+        marker.findLocation(snapshot.s11, snapshot.freq)
+        marker.resetLabels()
+        marker.updateLabels(snapshot.s11, snapshot.s21)
+        for c in self.subscribing_charts:
+            self.scheduler.update(c)
         if Marker.count() >= 2 and not self.delta_marker_layout.isHidden():
             self.delta_marker.set_markers(self.markers[0], self.markers[1])
             self.delta_marker.resetLabels()
@@ -629,29 +681,37 @@ class NanoVNASaver(QtWidgets.QWidget):
             except IndexError:
                 pass
 
-    def dataUpdated(self):
-        with self.dataLock:
-            s11data = self.data11[:]
-            s21data = self.data21[:]
+    def dataUpdated(self, start: int = 0, stop: int = -1):
+        """refreshes the GUI, start and stop give the changed index range,
+        nothing changed but the progress if they are equal. Unless called
+        without range, an already shown snapshot is not drawn again."""
+        self.sweep_control.progress_bar.setValue(self.worker.percentage)
+        snapshot = self.snapshot
+        if start == stop or (
+                stop != -1 and snapshot.version == self.shownVersion):
+            return
+        self.shownVersion = snapshot.version
+        s11data = snapshot.s11
+        s21data = snapshot.s21
 
         for m in self.markers:
             m.resetLabels()
             m.updateLabels(s11data, s21data)
 
         for c in self.s11charts:
-            c.setData(s11data)
+            self.scheduler.setInputs(c, "data", c.setData, s11data)
 
         for c in self.s21charts:
-            c.setData(s21data)
+            self.scheduler.setInputs(c, "data", c.setData, s21data)
 
         for c in self.combinedCharts:
-            c.setCombinedData(s11data, s21data)
+            self.scheduler.setInputs(
+                c, "data", c.setCombinedData, s11data, s21data)
 
-        self.sweep_control.progress_bar.setValue(self.worker.percentage)
         self.windows["tdr"].updateTDR()
 
         if s11data:
-            min_vswr = min(s11data, key=lambda data: data.vswr)
+            min_vswr = s11data[int(np.argmin(snapshot.derived11.vswr))]
             self.s11_min_swr_label.setText(
                 f"{format_vswr(min_vswr.vswr)} @ {format_frequency(min_vswr.freq)}")
             self.s11_min_rl_label.setText(format_gain(min_vswr.gain))
@@ -660,8 +720,9 @@ class NanoVNASaver(QtWidgets.QWidget):
             self.s11_min_rl_label.setText("")
 
         if s21data:
-            min_gain = min(s21data, key=lambda data: data.gain)
-            max_gain = min(s21data, key=lambda data: data.gain)
+            gain = snapshot.derived21.gain
+            min_gain = s21data[int(np.argmin(gain))]
+            max_gain = s21data[int(np.argmax(gain))]
             self.s21_min_gain_label.setText(
                 f"{format_gain(min_gain.gain)}"
                 f" @ {format_frequency(min_gain.freq)}")
@@ -676,6 +737,7 @@ class NanoVNASaver(QtWidgets.QWidget):
         self.dataAvailable.emit()
 
     def sweepFinished(self):
+        self.coalescer.flush()
         self.sweep_control.progress_bar.setValue(100)
         self.sweep_control.btn_start.setDisabled(False)
         self.sweep_control.btn_stop.setDisabled(True)
@@ -687,20 +749,23 @@ class NanoVNASaver(QtWidgets.QWidget):
 
     def setReference(self, s11data=None, s21data=None, source=None):
         if not s11data:
-            with self.dataLock:
-                s11data = self.data11[:]
-                s21data = self.data21[:]
+            snapshot = self.snapshot
+            s11data = snapshot.s11
+            s21data = snapshot.s21
 
+        s11data = as_trace(s11data)
+        s21data = as_trace(s21data)
         self.referenceS11data = s11data
         for c in self.s11charts:
-            c.setReference(s11data)
+            self.scheduler.setInputs(c, "reference", c.setReference, s11data)
 
         self.referenceS21data = s21data
         for c in self.s21charts:
-            c.setReference(s21data)
+            self.scheduler.setInputs(c, "reference", c.setReference, s21data)
 
         for c in self.combinedCharts:
-            c.setCombinedReference(s11data, s21data)
+            self.scheduler.setInputs(c, "reference", c.setCombinedReference,
+                                     s11data, s21data)
 
         self.btnResetReference.setDisabled(False)
 
@@ -731,7 +796,7 @@ class NanoVNASaver(QtWidgets.QWidget):
         self.referenceSource = ""
         self.updateTitle()
         for c in self.subscribing_charts:
-            c.resetReference()
+            self.scheduler.setInputs(c, "reference", c.resetReference)
         self.btnResetReference.setDisabled(True)
 
     def loadReferenceFile(self):
@@ -747,11 +812,10 @@ class NanoVNASaver(QtWidgets.QWidget):
         filename, _ = QtWidgets.QFileDialog.getOpenFileName(
             filter="Touchstone Files (*.s1p *.s2p);;All files (*.*)")
         if filename != "":
-            self.data11 = []
-            self.data21 = []
             t = Touchstone(filename)
             t.load()
-            self.saveData(t.s11data, t.s21data, filename)
+            self.saveData(t.s11data, corr_att_data(t.s21data, self.s21att),
+                          filename)
             self.dataUpdated()
 
     def sizeHint(self) -> QtCore.QSize:
@@ -781,6 +845,7 @@ class NanoVNASaver(QtWidgets.QWidget):
         logger.debug("Requested popout for chart: %s", chart.name)
         new_chart = self.copyChart(chart)
         new_chart.isPopout = True
+        new_chart.setAttribute(QtCore.Qt.WA_DeleteOnClose)
         new_chart.show()
         new_chart.setWindowTitle(new_chart.name)
 
@@ -794,8 +859,18 @@ class NanoVNASaver(QtWidgets.QWidget):
         if chart in self.combinedCharts:
             self.combinedCharts.append(new_chart)
         new_chart.popoutRequested.connect(self.popoutChart)
+        new_chart.destroyed.connect(partial(self.removeChart, new_chart))
+        self.scheduler.add(new_chart, chart)
         return new_chart
 
+    def removeChart(self, chart: Chart):
+        """drops a deleted chart copy from the chart lists"""
+        for charts in (self.subscribing_charts, self.s11charts,
+                       self.s21charts, self.combinedCharts):
+            if chart in charts:
+                charts.remove(chart)
+        self.scheduler.remove(chart)
+
     def closeEvent(self, a0: QtGui.QCloseEvent) -> None:
         self.worker.stopped = True
         self.settings.setValue("MarkerCount", Marker.count())
@@ -88,15 +88,35 @@ def gamma_to_impedance(gamma: complex, ref_impedance: float = 50) -> complex:
         return math.inf
 
 
-def groupDelay(data: List[Datapoint], index: int) -> float:
-    idx0 = clamp_value(index - 1, 0, len(data) - 1)
-    idx1 = clamp_value(index + 1, 0, len(data) - 1)
-    delta_angle = data[idx1].phase - data[idx0].phase
-    delta_freq = data[idx1].freq - data[idx0].freq
-    if delta_freq == 0:
-        return 0
-    val = -delta_angle / math.tau / delta_freq
-    return val
+def group_delay(freq: np.ndarray, phase: np.ndarray,
+                aperture: int = 1) -> np.ndarray:
+    """group delays in seconds from the wrapped phases in radians.
+
+    The unwrapped phase is differenced over aperture points to either
+    side, one sided at the ends, and divided by the frequency span of
+    that window, so non uniform sweeps are handled as well. Wider
+    apertures smooth the result. Zero frequency spans give 0."""
+    if aperture < 1:
+        raise ValueError("aperture must be at least 1")
+    phase = np.unwrap(np.asarray(phase, dtype=float))
+    freq = np.asarray(freq, dtype=float)
+    index = np.arange(len(phase))
+    low = np.maximum(index - aperture, 0)
+    high = np.minimum(index + aperture, len(phase) - 1)
+    dphase = phase[high] - phase[low]
+    dfreq = freq[high] - freq[low]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(dfreq == 0, 0.0, -dphase / math.tau / dfreq)
+
+
+def groupDelay(data: List[Datapoint], index: int, aperture: int = 1) -> float:
+    """group delay at index, same as group_delay() over the whole data"""
+    low = clamp_value(index - aperture, 0, len(data) - 1)
+    high = clamp_value(index + aperture, 0, len(data) - 1)
+    window = data[low:high + 1]
+    return float(group_delay([d.freq for d in window],
+                             [d.phase for d in window],
+                             aperture)[index - low])
 
 
 def impedance_to_capacitance(z: complex, freq: float) -> float:
@@ -0,0 +1,128 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+from time import monotonic
+from typing import Callable, Dict, Set, Tuple
+
+from PyQt5 import QtCore, QtWidgets
+
+from NanoVNASaver.Coalescer import MAX_RATE
+
+logger = logging.getLogger(__name__)
+
+Inputs = Tuple[Callable, tuple]
+
+
+def same_inputs(a: Inputs, b: Inputs) -> bool:
+    return (a is not None and b is not None and a[0] == b[0] and
+            len(a[1]) == len(b[1]) and
+            all(x is y for x, y in zip(a[1], b[1])))
+
+
+class RenderScheduler(QtCore.QObject):
+    """Hands data to charts and repaints them, skipping needless work.
+
+    Inputs are given per chart and slot (e.g. "data" or "reference") as
+    setter and arguments. They are dropped if the chart already got the
+    same objects, and held back while the chart is hidden, e.g. not
+    selected or a closed popout, until it is shown. Inputs and repaints
+    are applied at most max_rate times per second."""
+
+    def __init__(self, max_rate: float = MAX_RATE,
+                 parent: QtCore.QObject = None):
+        super().__init__(parent)
+        self.max_rate = max_rate
+        self.applied: Dict[QtWidgets.QWidget, Dict[str, Inputs]] = {}
+        self.pending: Dict[QtWidgets.QWidget, Dict[str, Inputs]] = {}
+        self.dirty: Set[QtWidgets.QWidget] = set()
+        self._last = 0.0
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.run)
+
+    def add(self, chart: QtWidgets.QWidget, template=None):
+        """registers a chart, a copied chart takes over the inputs of
+        its template"""
+        chart.installEventFilter(self)
+        if template is not None:
+            self.applied[chart] = dict(self.applied.get(template, {}))
+            self.pending[chart] = {
+                slot: (getattr(chart, setter.__name__), args)
+                for slot, (setter, args) in
+                self.pending.get(template, {}).items()}
+
+    def remove(self, chart: QtWidgets.QWidget):
+        """forgets a chart, e.g. a closed popout, and the inputs held
+        for it"""
+        self.applied.pop(chart, None)
+        self.pending.pop(chart, None)
+        self.dirty.discard(chart)
+
+    def setInputs(self, chart: QtWidgets.QWidget, slot: str,
+                  setter: Callable, *args):
+        inputs = (setter, args)
+        pending = self.pending.setdefault(chart, {})
+        if same_inputs(self.applied.get(chart, {}).get(slot), inputs):
+            pending.pop(slot, None)
+            return
+        pending[slot] = inputs
+        self.schedule()
+
+    def update(self, chart: QtWidgets.QWidget):
+        self.dirty.add(chart)
+        self.schedule()
+
+    def schedule(self):
+        if self._timer.isActive():
+            return
+        wait = 0.0
+        if self.max_rate > 0:
+            wait = self._last + 1 / self.max_rate - monotonic()
+        if wait <= 0:
+            self.run()
+        else:
+            self._timer.start(round(wait * 1000))
+
+    def run(self):
+        self._last = monotonic()
+        for chart in list(self.pending):
+            if self.visible(chart):
+                self.apply(chart)
+        for chart in list(self.dirty):
+            if self.visible(chart):
+                chart.update()
+        self.dirty.clear()
+
+    def visible(self, chart: QtWidgets.QWidget) -> bool:
+        try:
+            return chart.isVisible()
+        except RuntimeError:  # deleted on the C++ side
+            self.remove(chart)
+            return False
+
+    def apply(self, chart: QtWidgets.QWidget):
+        applied = self.applied.setdefault(chart, {})
+        for slot, (setter, args) in self.pending.pop(chart, {}).items():
+            setter(*args)
+            applied[slot] = (setter, args)
+
+    def eventFilter(self, obj: QtCore.QObject, event: QtCore.QEvent) -> bool:
+        if event.type() == QtCore.QEvent.Show and self.pending.get(obj):
+            self.apply(obj)
+        return False
@@ -0,0 +1,358 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+Local automation server for test executives, e.g.
+
+    NanoVNASaver serve --socket /tmp/nanovna.sock
+
+HTTP with JSON requests on a Unix socket. All device requests are queued
+to a single acquisition thread, results are sent as binary .npy arrays.
+Use AutomationClient to talk to it from Python.
+
+    POST /connect      {"port": "/dev/ttyACM0"}
+    POST /disconnect
+    POST /sweep        {"start": 1000000, "stop": 30000000, "points": 101,
+                        "segments": 1, "averages": 1}
+    POST /calibration  {"filename": "sol.cal"}
+    POST /run
+    GET  /results      structured array with freq, s11 and s21
+
+Errors are JSON objects with an "error" message: 400 for invalid
+parameters, 404 for unknown requests and 409 for requests out of
+order, e.g. /results before a successful /run.
+"""
+import argparse
+import http.client
+import inspect
+import io
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler
+from queue import Queue
+from typing import Callable, Tuple
+
+import numpy as np
+
+from NanoVNASaver import CLI
+from NanoVNASaver.Settings.Sweep import Properties, Sweep, SweepMode
+from NanoVNASaver.core import SweepEngine
+
+logger = logging.getLogger(__name__)
+
+RESULT_DTYPE = np.dtype([("freq", "<i8"), ("s11", "<c16"), ("s21", "<c16")])
+
+
+class RequestError(Exception):
+    """a request that can not be served, status is the HTTP status"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_params(route: Callable, body: bytes) -> dict:
+    """the JSON object in body, checked against the route's signature"""
+    try:
+        params = json.loads(body or b"{}")
+    except ValueError as exc:
+        raise RequestError(f"invalid JSON: {exc}") from exc
+    if not isinstance(params, dict):
+        raise RequestError("parameters have to be a JSON object")
+    try:
+        inspect.signature(route).bind(**params)
+    except TypeError as exc:
+        raise RequestError(f"invalid parameters: {exc}") from exc
+    return params
+
+
+def remove_stale_socket(path: str):
+    """removes a socket left behind by a server that is gone, anything
+    else at path raises IOError"""
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise IOError(f"{path} exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        logger.debug("Removing stale socket %s", path)
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise IOError(f"{path} is in use by another server")
+
+
+class Handler(BaseHTTPRequestHandler):
+    server: "AutomationServer"
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        logger.debug("%s", format % args)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def _handle(self, method: str):
+        route = self.server.routes.get((method, self.path))
+        try:
+            if route is None:
+                raise RequestError(f"no such request: {method} {self.path}",
+                                   404)
+            length = int(self.headers.get("Content-Length", 0))
+            params = parse_params(route, self.rfile.read(length))
+            result = self.server.submit(route, params)
+        except RequestError as exc:
+            self._reply(exc.status, {"error": str(exc)})
+            return
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error("%s %s failed: %s", method, self.path, exc)
+            self._reply(500, {"error": str(exc)})
+            return
+        self._reply(200, result)
+
+    def _reply(self, status: int, result):
+        if isinstance(result, bytes):
+            body = result
+            content_type = "application/octet-stream"
+        else:
+            body = json.dumps(result).encode()
+            content_type = "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+# Unix sockets, and so the server, are not available on all platforms
+AVAILABLE = hasattr(socket, "AF_UNIX")
+
+if AVAILABLE:
+    class AutomationServer(socketserver.ThreadingMixIn,
+                           socketserver.UnixStreamServer):
+        """Serves one SweepEngine on a Unix socket. Requests are handled
+        in their own threads but executed one by one on the acquisition
+        thread, so a long sweep delays the following requests."""
+        daemon_threads = True
+
+        def __init__(self, path: str):
+            remove_stale_socket(path)
+            super().__init__(path, Handler)
+            self.engine = SweepEngine()
+            self.sweep = Sweep()
+            self.measured = False
+            self.jobs: Queue = Queue()
+            self.routes = {
+                ("POST", "/connect"): self.connect,
+                ("POST", "/disconnect"): self.disconnect,
+                ("POST", "/sweep"): self.configure,
+                ("POST", "/calibration"): self.load_calibration,
+                ("POST", "/run"): self.run,
+                ("GET", "/results"): self.results,
+            }
+            self._acquisition = threading.Thread(
+                target=self._acquire, name="AutomationAcquisition",
+                daemon=True)
+            self._acquisition.start()
+
+        def _acquire(self):
+            while True:
+                job = self.jobs.get()
+                if job is None:
+                    return
+                func, params, future = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(func(**params))
+                except Exception as exc:  # pylint: disable=broad-except
+                    future.set_exception(exc)
+
+        def submit(self, func: Callable, params: dict):
+            """queues func(**params) to the acquisition thread and waits"""
+            future = Future()
+            self.jobs.put((func, params, future))
+            return future.result()
+
+        def server_close(self):
+            self.jobs.put(None)
+            self._acquisition.join()
+            self.disconnect()
+            super().server_close()
+            if os.path.exists(self.server_address):
+                os.unlink(self.server_address)
+
+        def _vna(self):
+            if self.engine.vna is None:
+                raise RequestError("not connected", 409)
+            return self.engine.vna
+
+        def connect(self, port: str = None) -> dict:
+            self.disconnect()
+            self.measured = False
+            self.engine.vna = CLI.open_vna(port)
+            vna = self.engine.vna
+            return {"name": vna.name,
+                    "version": str(vna.version),
+                    "valid_datapoints": list(vna.valid_datapoints)}
+
+        def disconnect(self) -> dict:
+            if self.engine.vna is not None:
+                self.engine.vna.serial.close()
+                self.engine.vna = None
+            return {}
+
+        def configure(self, start: int, stop: int, points: int = 101,
+                      segments: int = 1, averages: int = 1) -> dict:
+            vna = self._vna()
+            try:
+                start, stop, points, segments, averages = (
+                    int(value) for value in
+                    (start, stop, points, segments, averages))
+                if points not in vna.valid_datapoints:
+                    raise ValueError(
+                        f"{vna.name} supports {list(vna.valid_datapoints)}"
+                        f" data points")
+                mode = SweepMode.AVERAGE if averages > 1 else SweepMode.SINGLE
+                sweep = Sweep(start, stop, points, segments,
+                              Properties(mode=mode, averages=(averages, 0)))
+            except (TypeError, ValueError) as exc:
+                raise RequestError(str(exc)) from exc
+            self.sweep = sweep
+            vna.datapoints = points
+            return {"points": self.sweep.points * self.sweep.segments}
+
+        def load_calibration(self, filename: str) -> dict:
+            self.engine.calibration = CLI.load_calibration(filename)
+            return {"source": self.engine.calibration.source}
+
+        def run(self) -> dict:
+            self._vna()
+            self.measured = False
+            data11, _ = self.engine.measure(self.sweep)
+            self.measured = True
+            return {"points": len(data11)}
+
+        def results(self) -> bytes:
+            if not self.measured:
+                raise RequestError("no results, run a sweep first", 409)
+            result = np.empty(len(self.engine.data11), dtype=RESULT_DTYPE)
+            result["freq"] = [dp.freq for dp in self.engine.data11]
+            result["s11"] = [dp.z for dp in self.engine.data11]
+            result["s21"] = [dp.z for dp in self.engine.data21]
+            buffer = io.BytesIO()
+            np.save(buffer, result, allow_pickle=False)
+            return buffer.getvalue()
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float = 60.0):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class AutomationClient:
+    """Minimal client for AutomationServer, raises IOError with the
+    server's message if a request fails"""
+
+    def __init__(self, path: str, timeout: float = 60.0):
+        self.path = path
+        self.timeout = timeout
+
+    def request(self, method: str, url: str, **params):
+        conn = UnixHTTPConnection(self.path, self.timeout)
+        try:
+            conn.request(method, url, body=json.dumps(params),
+                         headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            body = response.read()
+        finally:
+            conn.close()
+        if response.getheader("Content-Type") == "application/octet-stream":
+            return body
+        result = json.loads(body)
+        if response.status != 200:
+            raise IOError(result.get("error", response.reason))
+        return result
+
+    def connect(self, port: str = None) -> dict:
+        return self.request("POST", "/connect", port=port)
+
+    def disconnect(self):
+        self.request("POST", "/disconnect")
+
+    def configure(self, start: int, stop: int, points: int = 101,
+                  segments: int = 1, averages: int = 1) -> dict:
+        return self.request("POST", "/sweep", start=start, stop=stop,
+                            points=points, segments=segments,
+                            averages=averages)
+
+    def load_calibration(self, filename: str) -> dict:
+        return self.request("POST", "/calibration", filename=filename)
+
+    def run(self) -> dict:
+        return self.request("POST", "/run")
+
+    def results(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """frequencies, s11 and s21 of the last run"""
+        result = np.load(io.BytesIO(self.request("GET", "/results")),
+                         allow_pickle=False)
+        return result["freq"], result["s11"], result["s21"]
+
+
+def add_parser(subparsers: argparse._SubParsersAction):
+    parser = subparsers.add_parser(
+        "serve", help="serve local automation requests on a Unix socket",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket", default="/tmp/nanovna-saver.sock",
+                        help="socket path (default: %(default)s)")
+
+
+def serve(args: argparse.Namespace) -> int:
+    try:
+        server = AutomationServer(args.socket)
+    except IOError as exc:
+        logger.error("%s", exc)
+        return 1
+    logger.warning("Serving on %s", args.socket)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
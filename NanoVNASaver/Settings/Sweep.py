@@ -18,9 +18,12 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import logging
 from enum import Enum
+from functools import lru_cache
 from math import log
 from threading import Lock
-from typing import Iterator, Tuple
+from typing import Iterator, List, Tuple
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -29,17 +32,60 @@ class SweepMode(Enum):
     SINGLE = 0
     CONTINOUS = 1
     AVERAGE = 2
+    SMOOTHED = 3
+    ADAPTIVE = 4
+
+
+def device_grid(start: int, stop: int, points: int) -> np.ndarray:
+    """the frequencies a NanoVNA steps through from start to stop"""
+    if points < 2:
+        return np.array([start], dtype=np.int64)
+    return (start + (stop - start) * np.arange(points, dtype=np.int64) //
+            (points - 1))
+
+
+class FrequencyPlan():
+    """The frequencies of all segments of a sweep as read-only array"""
+
+    def __init__(self, ranges: List[Tuple[int, int]], points: int):
+        self.ranges = ranges
+        self.points = points
+        if ranges:
+            self.frequencies = np.concatenate(
+                [device_grid(start, stop, points) for start, stop in ranges])
+        else:
+            self.frequencies = np.empty(0, dtype=np.int64)
+        self.frequencies.setflags(write=False)
+
+    def __len__(self) -> int:
+        return len(self.frequencies)
+
+    def slice(self, index: int) -> slice:
+        return slice(index * self.points, (index + 1) * self.points)
+
+    def segment(self, index: int) -> np.ndarray:
+        return self.frequencies[self.slice(index)]
+
+
+@lru_cache(maxsize=16)
+def _frequency_plan(ranges: Tuple[Tuple[int, int], ...],
+                    points: int) -> FrequencyPlan:
+    return FrequencyPlan(list(ranges), points)
 
 
 class Properties():
     def __init__(self, name: str = "",
                  mode: 'SweepMode' = SweepMode.SINGLE,
                  averages: Tuple[int, int] = (3, 0),
-                 logarithmic: bool = False):
+                 logarithmic: bool = False,
+                 adaptive_bandwidth: bool = False,
+                 snr: float = 20.0):
         self.name = name
         self.mode = mode
         self.averages = averages
         self.logarithmic = logarithmic
+        self.adaptive_bandwidth = adaptive_bandwidth
+        self.snr = snr
 
     def __repr__(self):
         return (
@@ -57,6 +103,8 @@ class Sweep():
         self.segments = segments
         self.properties = properties
         self.lock = Lock()
+        self._plan: FrequencyPlan = None
+        self._plan_key: Tuple = ()
         self.check()
         logger.debug("%s", self)
 
@@ -105,11 +153,19 @@ class Sweep():
         logger.debug("get_index_range(%s) -> (%s, %s)", index, start, end)
         return (start, end)
 
+    @property
+    def plan(self) -> FrequencyPlan:
+        """the frequency plan, shared between equal sweeps. Computed
+        once per instance and again only if the sweep was changed."""
+        key = (self.start, self.end, self.points, self.segments,
+               self.properties.logarithmic)
+        if self._plan is None or self._plan_key != key:
+            self._plan = _frequency_plan(
+                tuple(self.get_index_range(i)
+                      for i in range(self.segments)),
+                self.points)
+            self._plan_key = key
+        return self._plan
+
     def get_frequencies(self) -> Iterator[int]:
-        for i in range(self.segments):
-            start, stop = self.get_index_range(i)
-            step = (stop - start) / self.points
-            freq = start
-            for _ in range(self.points):
-                yield round(freq)
-                freq += step
+        yield from self.plan.frequencies.tolist()
@@ -1,2 +1,9 @@
-from .Bands import BandsModel
 from .Sweep import Sweep
+
+
+def __getattr__(name):
+    # BandsModel needs Qt, import it only when asked for
+    if name == "BandsModel":
+        from .Bands import BandsModel  # pylint: disable=import-outside-toplevel
+        return BandsModel
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
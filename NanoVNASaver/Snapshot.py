@@ -0,0 +1,71 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import itertools
+from typing import Sequence
+
+import numpy as np
+
+from NanoVNASaver.Derived import Derived, Trace
+from NanoVNASaver.RFTools import Datapoint
+
+_versions = itertools.count(1)
+
+
+class Snapshot:
+    """An immutable, versioned set of sweep data.
+
+    Snapshots are published by replacing the reference holding them,
+    so readers never need a lock and can compare versions to skip work.
+    The data are Traces, so quantities derived from them are calculated
+    at most once per snapshot and shared by all readers."""
+    __slots__ = ("version", "s11", "s21", "source")
+
+    def __init__(self, s11: Sequence[Datapoint] = (),
+                 s21: Sequence[Datapoint] = (), source: str = ""):
+        self.version = next(_versions)
+        self.s11 = Trace(s11)
+        self.s21 = Trace(s21)
+        self.source = source
+
+    def __repr__(self) -> str:
+        return (f"Snapshot(version={self.version}, points={len(self.s11)},"
+                f" source='{self.source}')")
+
+    def __len__(self) -> int:
+        return len(self.s11)
+
+    @property
+    def derived11(self) -> Derived:
+        return self.s11.derived
+
+    @property
+    def derived21(self) -> Derived:
+        return self.s21.derived
+
+    @property
+    def freq(self) -> np.ndarray:
+        return self.s11.derived.freq
+
+    @property
+    def z11(self) -> np.ndarray:
+        return self.s11.derived.z
+
+    @property
+    def z21(self) -> np.ndarray:
+        return self.s21.derived.z
@@ -0,0 +1,102 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+from typing import List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAX_REFINEMENTS = 4
+THRESHOLD = 4.0
+
+
+def interval_scores(s11: np.ndarray, s21: np.ndarray) -> np.ndarray:
+    """rates the detail between neighbouring points of complex traces
+    by step length, phase change and curvature"""
+    score = np.zeros(max(len(s11) - 1, 0))
+    for trace in (s11, s21):
+        if len(trace) != len(s11) or len(trace) < 3:
+            continue
+        score += np.abs(np.diff(trace))
+        score += np.abs(np.diff(np.unwrap(np.angle(trace)))) / np.pi
+        curvature = np.abs(np.diff(trace, 2))
+        score[:-1] += curvature
+        score[1:] += curvature
+    return score
+
+
+class AdaptivePlanner:
+    """Plans dense sweep segments from a coarse pass.
+
+    Intervals scoring more than threshold times the median are grouped
+    into regions, the max_segments regions with the highest score are
+    returned as frequency ranges of at least points Hz."""
+
+    def __init__(self, points: int = 101,
+                 max_segments: int = MAX_REFINEMENTS,
+                 threshold: float = THRESHOLD):
+        self.points = points
+        self.max_segments = max_segments
+        self.threshold = threshold
+
+    def plan(self, freq: np.ndarray, s11: np.ndarray,
+             s21: np.ndarray) -> List[Tuple[int, int]]:
+        score = interval_scores(s11, s21)
+        if len(score) < 2:
+            return []
+        base = np.median(score)
+        if base <= 0:
+            base = np.mean(score)
+        if base <= 0:
+            return []
+        hot = np.flatnonzero(score > self.threshold * base)
+        if not len(hot):
+            return []
+        runs = np.split(hot, np.flatnonzero(np.diff(hot) > 1) + 1)
+        runs.sort(key=lambda run: score[run].sum(), reverse=True)
+
+        ranges = []
+        for run in runs[:self.max_segments]:
+            lo = max(run[0] - 1, 0)
+            hi = min(run[-1] + 2, len(freq) - 1)
+            ranges.append(self._widen(int(freq[lo]), int(freq[hi]),
+                                      int(freq[0]), int(freq[-1])))
+        ranges.sort()
+
+        merged = [ranges[0]]
+        for start, stop in ranges[1:]:
+            if start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(stop, merged[-1][1]))
+            else:
+                merged.append((start, stop))
+        logger.debug("Planned refinements: %s", merged)
+        return merged
+
+    def _widen(self, start: int, stop: int,
+               lower: int, upper: int) -> Tuple[int, int]:
+        missing = self.points - 1 - (stop - start)
+        if missing > 0:
+            start -= missing // 2
+            stop = start + self.points - 1
+            if start < lower:
+                start, stop = lower, lower + self.points - 1
+            if stop > upper:
+                start, stop = max(lower, upper - self.points + 1), upper
+        return start, stop
@@ -432,24 +432,22 @@ class CalibrationWindow(QtWidgets.QWidget):
         self.calibration_source_label.setText("Device")
         self.notes_textedit.clear()
 
-        if len(self.app.worker.rawData11) > 0:
+        if len(self.app.worker.engine.rawData11) > 0:
             # There's raw data, so we can get corrected data
             logger.debug("Saving and displaying raw data.")
-            self.app.saveData(self.app.worker.rawData11,
-                              self.app.worker.rawData21, self.app.sweepSource)
+            self.app.saveData(*self.app.worker.engine.recalibrate(),
+                              self.app.sweepSource)
             self.app.worker.signals.updated.emit()
 
     def setOffsetDelay(self, value: float):
         logger.debug("New offset delay value: %f ps", value)
-        self.app.worker.offsetDelay = value / 1e12
-        if len(self.app.worker.rawData11) > 0:
+        self.app.worker.engine.offsetDelay = value / 1e12
+        if len(self.app.worker.engine.rawData11) > 0:
             # There's raw data, so we can get corrected data
             logger.debug("Applying new offset to existing sweep data.")
-            self.app.worker.data11, self.app.worker.data21 = \
-                self.app.worker.applyCalibration(
-                    self.app.worker.rawData11, self.app.worker.rawData21)
             logger.debug("Saving and displaying corrected data.")
-            self.app.saveData(self.app.worker.data11, self.app.worker.data21, self.app.sweepSource)
+            self.app.saveData(*self.app.worker.engine.recalibrate(),
+                              self.app.sweepSource)
             self.app.worker.signals.updated.emit()
 
     def calculate(self):
@@ -538,14 +536,12 @@ class CalibrationWindow(QtWidgets.QWidget):
                 self.calibration_source_label.setText(
                     self.app.calibration.source + " (Standards: Custom)")
 
-            if len(self.app.worker.rawData11) > 0:
+            if len(self.app.worker.engine.rawData11) > 0:
                 # There's raw data, so we can get corrected data
                 logger.debug("Applying calibration to existing sweep data.")
-                self.app.worker.data11, self.app.worker.data21 = self.app.worker.applyCalibration(
-                    self.app.worker.rawData11, self.app.worker.rawData21)
                 logger.debug("Saving and displaying corrected data.")
-                self.app.saveData(self.app.worker.data11,
-                                  self.app.worker.data21, self.app.sweepSource)
+                self.app.saveData(*self.app.worker.engine.recalibrate(),
+                                  self.app.sweepSource)
                 self.app.worker.signals.updated.emit()
         except ValueError as e:
             # showError here hides the calibration window, so we need to pop up our own
@@ -643,7 +639,8 @@ class CalibrationWindow(QtWidgets.QWidget):
             self.btn_automatic.setDisabled(False)
             return
 
-        if self.app.sweep.properties.mode == SweepMode.CONTINOUS:
+        if self.app.sweep.properties.mode in (SweepMode.CONTINOUS,
+                                              SweepMode.SMOOTHED):
             QtWidgets.QMessageBox(
                 QtWidgets.QMessageBox.Information,
                 "Continuous sweep enabled",
@@ -70,6 +70,15 @@ class DisplaySettingsWindow(QtWidgets.QWidget):
         self.show_lines_option.stateChanged.connect(self.changeShowLines)
         display_options_layout.addRow(self.show_lines_option, show_lines_label)
 
+        self.background_rendering_option = QtWidgets.QCheckBox(
+            "Background rendering")
+        background_rendering_label = QtWidgets.QLabel(
+            "Renders traces on worker threads, may lag one frame behind")
+        self.background_rendering_option.stateChanged.connect(
+            self.changeBackgroundRendering)
+        display_options_layout.addRow(self.background_rendering_option,
+                                      background_rendering_label)
+
         self.dark_mode_option = QtWidgets.QCheckBox("Dark mode")
         dark_mode_label = QtWidgets.QLabel("Black background with white text")
         self.dark_mode_option.stateChanged.connect(self.changeDarkMode)
@@ -448,6 +457,8 @@ class DisplaySettingsWindow(QtWidgets.QWidget):
             self.app.settings.value("DarkMode", False, bool))
         self.show_lines_option.setChecked(
             self.app.settings.value("ShowLines", False, bool))
+        self.background_rendering_option.setChecked(
+            self.app.settings.value("BackgroundRendering", False, bool))
         self.show_marker_number_option.setChecked(
             self.app.settings.value("ShowMarkerNumbers", False, bool))
         self.filled_marker_option.setChecked(
@@ -509,6 +520,8 @@ class DisplaySettingsWindow(QtWidgets.QWidget):
             w = old_widget.widget()
             self.app.charts_layout.removeWidget(w)
             w.hide()
+            if w not in self.app.selectable_charts:  # a duplicate
+                w.deleteLater()
         if found is not None:
             if self.app.charts_layout.indexOf(found) > -1:
                 logger.debug("%s is already shown, duplicating.", found.name)
@@ -528,7 +541,7 @@ class DisplaySettingsWindow(QtWidgets.QWidget):
         self.marker_window.exampleMarker.returnloss_is_positive = state
         self.marker_window.updateMarker()
         self.app.charts["s11"]["log_mag"].isInverted = state
-        self.app.charts["s11"]["log_mag"].update()
+        self.app.charts["s11"]["log_mag"].invalidateBackground()
 
     def changeShowLines(self):
         state = self.show_lines_option.isChecked()
@@ -536,6 +549,12 @@ class DisplaySettingsWindow(QtWidgets.QWidget):
         for c in self.app.subscribing_charts:
             c.setDrawLines(state)
 
+    def changeBackgroundRendering(self):
+        state = self.background_rendering_option.isChecked()
+        self.app.settings.setValue("BackgroundRendering", state)
+        for c in self.app.subscribing_charts:
+            c.setBackgroundRendering(state)
+
     def changeShowMarkerNumber(self):
         state = self.show_marker_number_option.isChecked()
         self.app.settings.setValue("ShowMarkerNumbers", state)
@@ -696,7 +715,7 @@ class DisplaySettingsWindow(QtWidgets.QWidget):
         self.app.bands.settings.setValue("ShowBands", show_bands)
         self.app.bands.settings.sync()
         for c in self.app.subscribing_charts:
-            c.update()
+            c.invalidateBackground()
 
     def changeFont(self):
         font_size = self.font_dropdown.currentText()
@@ -83,6 +83,21 @@ class SweepSettingsWindow(QtWidgets.QWidget):
             lambda: self.update_mode(SweepMode.AVERAGE))
         layout.addWidget(radio_button)
 
+        radio_button = QtWidgets.QRadioButton("Smoothed continous sweep")
+        radio_button.setChecked(
+            self.app.sweep.properties.mode == SweepMode.SMOOTHED)
+        radio_button.clicked.connect(
+            lambda: self.update_mode(SweepMode.SMOOTHED))
+        layout.addWidget(radio_button)
+
+        radio_button = QtWidgets.QRadioButton(
+            "Adaptive sweep (adds dense segments where the data changes)")
+        radio_button.setChecked(
+            self.app.sweep.properties.mode == SweepMode.ADAPTIVE)
+        radio_button.clicked.connect(
+            lambda: self.update_mode(SweepMode.ADAPTIVE))
+        layout.addWidget(radio_button)
+
         # Log sweep
         label = QtWidgets.QLabel(
             "Logarithmic sweeping changes the step width in each segment"
@@ -100,7 +115,9 @@ class SweepSettingsWindow(QtWidgets.QWidget):
         # Averaging
         label = QtWidgets.QLabel(
             "Averaging allows discarding outlying samples to get better"
-            " averages. Common values are 3/0, 5/2, 9/4 and 25/6.")
+            " averages. Common values are 3/0, 5/2, 9/4 and 25/6."
+            " Smoothed sweeps average over about as many past sweeps"
+            " without discarding.")
         label.setWordWrap(True)
         layout.addRow(label)
         averages = QtWidgets.QLineEdit(
@@ -114,6 +131,23 @@ class SweepSettingsWindow(QtWidgets.QWidget):
         layout.addRow("Number of measurements to average", averages)
         layout.addRow("Number to discard", truncates)
 
+        # Adaptive bandwidth
+        label = QtWidgets.QLabel(
+            "Adaptive IF bandwidth narrows the bandwidth only in segments"
+            " where S21 was close to the noise floor in the last sweep."
+            " The signal to noise ratio sets the required distance.")
+        label.setWordWrap(True)
+        layout.addRow(label)
+        checkbox_bw = QtWidgets.QCheckBox("Adaptive IF bandwidth")
+        checkbox_bw.setChecked(self.app.sweep.properties.adaptive_bandwidth)
+        checkbox_bw.toggled.connect(
+            lambda: self.update_adaptive_bandwidth(checkbox_bw.isChecked()))
+        layout.addWidget(checkbox_bw)
+        input_snr = QtWidgets.QLineEdit(str(self.app.sweep.properties.snr))
+        input_snr.editingFinished.connect(
+            lambda: self.update_snr(input_snr))
+        layout.addRow("Signal to noise ratio in dB", input_snr)
+
         # TODO: is this more a device than a sweep property?
         label = QtWidgets.QLabel(
             "Some times when you measure amplifiers you need to use an"
@@ -194,6 +228,23 @@ class SweepSettingsWindow(QtWidgets.QWidget):
         value.setText(str(att))
         self.app.s21att = att
 
+    def update_adaptive_bandwidth(self, adaptive: bool):
+        logger.debug("update_adaptive_bandwidth(%s)", adaptive)
+        with self.app.sweep.lock:
+            self.app.sweep.properties.adaptive_bandwidth = adaptive
+
+    def update_snr(self, value: 'QtWidgets.QLineEdit'):
+        try:
+            snr = float(value.text())
+            assert snr > 0
+        except (ValueError, AssertionError):
+            logger.warning("Illegal signal to noise ratio, set default")
+            snr = 20.0
+        logger.debug("update_snr(%s)", snr)
+        value.setText(str(snr))
+        with self.app.sweep.lock:
+            self.app.sweep.properties.snr = snr
+
     def update_averaging(self,
                          averages: 'QtWidgets.QLineEdit',
                          truncs: 'QtWidgets.QLineEdit'):
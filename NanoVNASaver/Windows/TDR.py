@@ -18,17 +18,45 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import logging
 import math
+from typing import Sequence
 
 import numpy as np
-import scipy.signal as signal
 from PyQt5 import QtWidgets, QtCore
 
+from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.core.TDR import (
+    DEFAULT_FFT_POINTS, FFT_POINTS, TDREngine, TDRResult)
 
 logger = logging.getLogger(__name__)
 
 
+class TDRJob(QtCore.QRunnable):
+    def __init__(self, window: "TDRWindow", serial: int,
+                 data: Sequence[Datapoint]):
+        super().__init__()
+        self.window = window
+        self.serial = serial
+        self.data = data
+
+    def run(self):
+        if self.serial != self.window.serial:
+            return  # superseded before it started
+        try:
+            result = self.window.engine.transform(self.data)
+        except ValueError as exc:
+            logger.info("TDR failed: %s", exc)
+            return
+        try:
+            self.window.finished.emit(self.serial, result)
+        except RuntimeError:
+            logger.debug("TDR window was deleted during transform")
+
+
 class TDRWindow(QtWidgets.QWidget):
+    """Shows the TDR of the S11 sweep. The transform runs on the thread
+    pool and only when S11 or the FFT size change."""
     updated = QtCore.pyqtSignal()
+    finished = QtCore.pyqtSignal(int, object)
 
     def __init__(self, app: QtWidgets.QWidget):
         super().__init__()
@@ -39,6 +67,12 @@ class TDRWindow(QtWidgets.QWidget):
         self.step_response = []
         self.step_response_Z = []
 
+        self.engine = TDREngine(self.app.settings.value(
+            "TDRFFTPoints", DEFAULT_FFT_POINTS, int))
+        self.pool = QtCore.QThreadPool.globalInstance()
+        self.serial = 0
+        self.finished.connect(self.transformed)
+
         self.setWindowTitle("TDR")
         self.setWindowIcon(self.app.icon)
 
@@ -93,20 +127,31 @@ class TDRWindow(QtWidgets.QWidget):
         self.tdr_velocity_input = QtWidgets.QLineEdit()
         self.tdr_velocity_input.setDisabled(True)
         self.tdr_velocity_input.setText("0.66")
-        self.tdr_velocity_input.textChanged.connect(self.app.dataUpdated)
+        self.tdr_velocity_input.textChanged.connect(self.updateTDR)
 
         layout.addRow("Velocity factor", self.tdr_velocity_input)
 
+        self.tdr_points_dropdown = QtWidgets.QComboBox()
+        for points in FFT_POINTS:
+            self.tdr_points_dropdown.addItem(f"{points} points", points)
+        self.tdr_points_dropdown.setCurrentIndex(max(
+            self.tdr_points_dropdown.findData(self.engine.fft_points), 0))
+        self.tdr_points_dropdown.currentIndexChanged.connect(
+            self.setFFTPoints)
+
+        layout.addRow("Resolution", self.tdr_points_dropdown)
+
         self.tdr_result_label = QtWidgets.QLabel()
         layout.addRow("Estimated cable length:", self.tdr_result_label)
 
         layout.addRow(self.app.tdr_chart)
 
-    def updateTDR(self):
-        c = 299792458
-        # TODO: Let the user select whether to use high or low resolution TDR?
-        FFT_POINTS = 2**14
+    def setFFTPoints(self):
+        self.engine.fft_points = self.tdr_points_dropdown.currentData()
+        self.app.settings.setValue("TDRFFTPoints", self.engine.fft_points)
+        self.updateTDR()
 
+    def updateTDR(self):
         if len(self.app.data11) < 2:
             return
 
@@ -116,32 +161,33 @@ class TDRWindow(QtWidgets.QWidget):
             self.tdr_velocity_input.setDisabled(True)
             self.tdr_velocity_input.setText(str(self.tdr_velocity_dropdown.currentData()))
 
-        try:
-            v = float(self.tdr_velocity_input.text())
-        except ValueError:
-            return
-
-        step_size = self.app.data11[1].freq - self.app.data11[0].freq
-        if step_size == 0:
+        data = self.app.data11
+        if data[1].freq == data[0].freq:
             self.tdr_result_label.setText("")
             logger.info("Cannot compute cable length at 0 span")
             return
 
-        s11 = []
-        for d in self.app.data11:
-            s11.append(np.complex(d.re, d.im))
-
-        window = np.blackman(len(self.app.data11))
+        result = self.engine.cached(data)
+        self.serial += 1
+        if result is not None:
+            self.showResult(result)
+        else:
+            self.pool.start(TDRJob(self, self.serial, data))
 
-        windowed_s11 = window * s11
-        self.td = np.abs(np.fft.ifft(windowed_s11, FFT_POINTS))
-        step = np.ones(FFT_POINTS)
-        self.step_response = signal.convolve(self.td, step)
+    def transformed(self, serial: int, result: TDRResult):
+        if serial == self.serial:
+            self.showResult(result)
 
-        self.step_response_Z = 50 * (1 + self.step_response) / (1 - self.step_response)
+    def showResult(self, result: TDRResult):
+        try:
+            v = float(self.tdr_velocity_input.text())
+        except ValueError:
+            return
 
-        time_axis = np.linspace(0, 1/step_size, FFT_POINTS)
-        self.distance_axis = time_axis * v * c
+        self.td = result.td
+        self.step_response = result.step_response
+        self.step_response_Z = result.step_response_Z
+        self.distance_axis = result.distance_axis(v)
         # peak = np.max(td)
         #  We should check that this is an actual *peak*, and not just a vague maximum
         index_peak = np.argmax(self.td)
@@ -28,12 +28,11 @@ resulting data.
 """
 import argparse
 import logging
+import socket
 import sys
 
-from PyQt5 import QtWidgets, QtCore
-
+from NanoVNASaver import CLI
 from NanoVNASaver.About import VERSION, INFO
-from NanoVNASaver.NanoVNASaver import NanoVNASaver
 
 
 def main():
@@ -46,12 +45,19 @@ def main():
                         help="File to write debug logging output to")
     parser.add_argument("--version", action="version",
                         version=f"NanoVNASaver {VERSION}")
+    subparsers = parser.add_subparsers(dest="command")
+    CLI.add_parser(subparsers)
+    if hasattr(socket, "AF_UNIX"):  # the server needs Unix sockets
+        # pylint: disable=import-outside-toplevel
+        from NanoVNASaver import Server
+        Server.add_parser(subparsers)
     args = parser.parse_args()
 
     console_log_level = logging.WARNING
     file_log_level = logging.DEBUG
 
-    print(INFO)
+    if args.command is None:
+        print(INFO)
 
     if args.debug:
         console_log_level = logging.DEBUG
@@ -74,6 +80,17 @@ def main():
 
     logger.info("Startup...")
 
+    if args.command == "sweep":
+        sys.exit(CLI.run(args))
+    if args.command == "serve":
+        # pylint: disable=import-outside-toplevel
+        from NanoVNASaver import Server
+        sys.exit(Server.serve(args))
+
+    # pylint: disable=import-outside-toplevel
+    from PyQt5 import QtWidgets, QtCore
+    from NanoVNASaver.NanoVNASaver import NanoVNASaver
+
     QtWidgets.QApplication.setAttribute(QtCore.Qt.AA_EnableHighDpiScaling,
                                         True)
     app = QtWidgets.QApplication(sys.argv)
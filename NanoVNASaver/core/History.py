@@ -0,0 +1,221 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+from contextlib import contextmanager
+from threading import RLock
+from time import time
+from typing import Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CAPACITY = 100
+MAX_BYTES = 64 * 1024 * 1024
+
+
+class SweepHistory:
+    """Ring buffer of the last sweeps on one frequency grid.
+
+    All sweeps live in one preallocated complex array of shape
+    (capacity, 2, points), S11 in [:, 0] and S21 in [:, 1]. The capacity
+    is limited so the buffer never exceeds max_bytes, changing either
+    resizes the buffer and keeps the latest sweeps. A sweep on a
+    different grid clears the history.
+
+    The sweep engine appends from its processing thread while the GUI
+    reads, so all access holds a lock. Readers get read-only views into
+    the buffer, which stay valid while they hold locked()."""
+
+    def __init__(self, capacity: int = CAPACITY,
+                 max_bytes: int = MAX_BYTES):
+        self._lock = RLock()
+        self._capacity = capacity
+        self._max_bytes = max_bytes
+        self.freq = np.empty(0, dtype=np.int64)
+        self._data = np.empty((0, 2, 0), dtype=complex)
+        self._times = np.empty(0)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @contextmanager
+    def locked(self):
+        """holds off appends and resizes, so views read within it do
+        not change"""
+        with self._lock:
+            yield self
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @capacity.setter
+    def capacity(self, capacity: int):
+        with self._lock:
+            self._capacity = capacity
+            self._resize()
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes: int):
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._resize()
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes + self._times.nbytes
+
+    def _limit(self) -> int:
+        per_sweep = len(self.freq) * 2 * 16 + 8
+        capacity = max(min(self._capacity, self._max_bytes // per_sweep), 1)
+        if capacity < self._capacity:
+            logger.info("Sweep history limited to %d sweeps", capacity)
+        return capacity
+
+    def _resize(self):
+        """reallocates for the current limits, keeping the latest
+        sweeps that fit"""
+        if not len(self.freq):
+            return
+        capacity = self._limit()
+        if capacity == len(self._data):
+            return
+        slots = self.order()[-capacity:]
+        data = np.empty((capacity, 2, len(self.freq)), dtype=complex)
+        times = np.empty(capacity)
+        data[:len(slots)] = self._data[slots]
+        times[:len(slots)] = self._times[slots]
+        self._data = data
+        self._times = times
+        self._count = len(slots)
+        self._next = self._count % capacity
+
+    def reset(self, freq: Sequence[int]):
+        """clears the history and allocates it for the frequency grid"""
+        with self._lock:
+            self.freq = np.array(freq, dtype=np.int64)
+            capacity = self._limit()
+            self._data = np.empty((capacity, 2, len(self.freq)),
+                                  dtype=complex)
+            self._times = np.empty(capacity)
+            self._next = 0
+            self._count = 0
+
+    def append(self, freq: Sequence[int], s11: Sequence[complex],
+               s21: Sequence[complex], timestamp: float = None):
+        with self._lock:
+            if len(freq) != len(self.freq) or not np.array_equal(
+                    freq, self.freq):
+                self.reset(freq)
+            slot = self._next
+            self._data[slot, 0] = s11
+            self._data[slot, 1] = s21
+            self._times[slot] = time() if timestamp is None else timestamp
+            self._next = (slot + 1) % len(self._data)
+            self._count = min(self._count + 1, len(self._data))
+
+    def _slot(self, index: int) -> int:
+        if not -self._count <= index < self._count:
+            raise IndexError("sweep history index out of range")
+        if index < 0:
+            index += self._count
+        return (self._next - self._count + index) % len(self._data)
+
+    def __getitem__(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """S11 and S21 of a sweep, 0 is the oldest, -1 the latest.
+        The arrays are read-only views, see locked()."""
+        with self._lock:
+            sweep = self._data[self._slot(index)]
+        sweep.flags.writeable = False
+        return sweep[0], sweep[1]
+
+    def timestamp(self, index: int) -> float:
+        with self._lock:
+            return float(self._times[self._slot(index)])
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """timestamps of all sweeps, oldest first"""
+        with self._lock:
+            return self._times[self.order()]
+
+    def order(self) -> np.ndarray:
+        """buffer slots of all sweeps, oldest first"""
+        with self._lock:
+            return (np.arange(self._count) + self._next -
+                    self._count) % max(len(self._data), 1)
+
+    def index_at(self, timestamp: float) -> int:
+        """index of the latest sweep taken at or before timestamp"""
+        index = int(np.searchsorted(self.timestamps, timestamp,
+                                    side="right")) - 1
+        if index < 0:
+            raise IndexError("no sweep before this time")
+        return index
+
+    def sweeps(self) -> np.ndarray:
+        """read-only view of all stored sweeps in buffer order, for
+        reductions that do not depend on the order, see locked()"""
+        with self._lock:
+            sweeps = self._data[:self._count]
+        sweeps.flags.writeable = False
+        return sweeps
+
+    def ordered(self, start: float = None, stop: float = None) -> np.ndarray:
+        """read-only sweeps taken between start and stop, oldest first,
+        e.g. for waterfall views. A view, see locked(), unless the
+        sweeps wrap around the end of the buffer."""
+        with self._lock:
+            slots = self.order()
+            times = self._times[slots]
+            mask = np.ones(len(slots), dtype=bool)
+            if start is not None:
+                mask &= times >= start
+            if stop is not None:
+                mask &= times <= stop
+            slots = slots[mask]
+            if len(slots) and slots[-1] - slots[0] == len(slots) - 1:
+                sweeps = self._data[slots[0]:slots[-1] + 1]
+            else:
+                sweeps = self._data[slots]
+        sweeps.flags.writeable = False
+        return sweeps
+
+    def _hold(self, reduce) -> np.ndarray:
+        with self._lock:
+            if not self._count:
+                return np.full((2, len(self.freq)), np.nan)
+            return reduce(np.abs(self._data[:self._count]), axis=0)
+
+    def max_hold(self) -> np.ndarray:
+        """largest magnitude seen per point, shape (2, points), NaN
+        before the first sweep"""
+        return self._hold(np.max)
+
+    def min_hold(self) -> np.ndarray:
+        """smallest magnitude seen per point, shape (2, points), NaN
+        before the first sweep"""
+        return self._hold(np.min)
@@ -0,0 +1,627 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from copy import copy
+from queue import Queue
+from time import perf_counter, sleep
+from typing import Callable, Iterator, List, Tuple
+
+import numpy as np
+
+from NanoVNASaver.Calibration import Calibration, correct_delay
+from NanoVNASaver.Hardware.Bandwidth import BandwidthScheduler
+from NanoVNASaver.Hardware.VNA import VNA, parse_values
+from NanoVNASaver.RFTools import Datapoint, corr_att_data
+from NanoVNASaver.Settings.Sweep import Sweep, SweepMode
+from NanoVNASaver.SweepPlanner import AdaptivePlanner
+from NanoVNASaver.core.History import SweepHistory
+
+logger = logging.getLogger(__name__)
+
+# a partial re-read is only tried if less than this fraction of a segment
+# is corrupt, otherwise the whole segment is read again
+RECOVERY_MAX_BAD = 0.25
+RECOVERY_RETRIES = 3
+# segment reads buffered between acquisition and processing, acquisition
+# blocks while the queue is full
+QUEUE_SIZE = 4
+
+
+def bad_windows(bad: List[int], width: int,
+                points: int) -> Iterator[Tuple[int, int]]:
+    """groups sorted bad indices into index ranges of width points
+    inside a segment of the given number of points"""
+    i = 0
+    while i < len(bad):
+        lo = min(bad[i], points - width)
+        hi = lo + width
+        while i < len(bad) and bad[i] < hi:
+            i += 1
+        yield lo, hi
+
+
+def to_complex(values: List[Tuple[float, float]]) -> np.ndarray:
+    """converts (re, im) tuples into a complex array"""
+    values = np.asarray(values, dtype=float).reshape(-1, 2)
+    return values[:, 0] + 1j * values[:, 1]
+
+
+def truncate(values: np.ndarray, count: int) -> np.ndarray:
+    """truncate drops the count extrema at every point if averaging is
+    active. values is a complex array of shape (averages, points)"""
+    keep = len(values) - count
+    logger.debug("Truncating from %d values to %d", len(values), keep)
+    if count < 1 or keep < 1:
+        logger.info("Not doing illegal truncate")
+        return values
+    distance = np.abs(values - values.mean(axis=0))
+    nearest = np.argpartition(distance, keep - 1, axis=0)[:keep]
+    return np.take_along_axis(values, nearest, axis=0)
+
+
+def ema_update(buffer: np.ndarray, offset: int, values: np.ndarray,
+               alpha: float, seeded: bool) -> np.ndarray:
+    """updates the exponential moving average of values in buffer
+    at offset in place, returns the updated part of buffer"""
+    view = buffer[offset:offset + len(values)]
+    if seeded:
+        view += alpha * (values - view)
+    else:
+        view[:] = values
+    return view
+
+
+class Averager:
+    """Averages the complex reads of one segment.
+
+    Without truncation only a streaming (Welford) mean is kept, else the
+    reads are collected in a preallocated (averages, points) array."""
+
+    def __init__(self, averages: int, truncates: int = 0):
+        self.averages = averages
+        self.truncates = truncates if averages > 1 else 0
+        self.count = 0
+        self._mean: np.ndarray = None
+        self._reads: np.ndarray = None
+
+    @property
+    def complete(self) -> bool:
+        return self.count >= self.averages
+
+    def add(self, values: np.ndarray):
+        if self.truncates > 0:
+            if self._reads is None:
+                self._reads = np.empty((self.averages, len(values)),
+                                       dtype=complex)
+            self._reads[self.count] = values
+            self.count += 1
+            return
+        self.count += 1
+        if self._mean is None:
+            self._mean = np.array(values, dtype=complex)
+            return
+        self._mean += (values - self._mean) / self.count
+
+    def mean(self) -> np.ndarray:
+        if self._reads is None:
+            return self._mean
+        return truncate(self._reads[:self.count],
+                        self.truncates).mean(axis=0)
+
+
+def _ignore(*_args):
+    pass
+
+
+class SweepEngine:
+    """Runs sweeps on a VNA driver and keeps the calibrated results.
+
+    Plain Python, no Qt. Progress is reported through the optional
+    callbacks, which are called from the engine's threads:
+
+    on_data(data11, data21): the calibrated data changed
+    on_changed(start, stop): indices changed, empty range for progress only
+    on_error(message): the sweep was aborted, see error_message
+    on_finished(): run() is done"""
+
+    def __init__(self, vna: VNA = None, calibration: Calibration = None,
+                 on_data: Callable = None, on_changed: Callable = None,
+                 on_error: Callable = None, on_finished: Callable = None):
+        self.vna = vna
+        self.calibration = calibration or Calibration()
+        self.s21att = 0.0
+        self.offsetDelay = 0
+        self.on_data = on_data or _ignore
+        self.on_changed = on_changed or _ignore
+        self.on_error = on_error or _ignore
+        self.on_finished = on_finished or _ignore
+        self.sweep = Sweep()
+        self.percentage = 0
+        self.data11: List[Datapoint] = []
+        self.data21: List[Datapoint] = []
+        self.rawData11: List[Datapoint] = []
+        self.rawData21: List[Datapoint] = []
+        self.init_data()
+        self.stopped = False
+        self.running = False
+        self.error_message = ""
+        self.retries = Counter()
+        self.timing = Counter()
+        self.queue: Queue = None
+        self.scheduler: BandwidthScheduler = None
+        self.history = SweepHistory()
+
+    def run(self, sweep: Sweep):
+        """sweeps until done, stopped or failed, errors are reported
+        through on_error. sweep must not be changed while running."""
+        try:
+            self._run(sweep)
+        except BaseException as exc:  # pylint: disable=broad-except
+            logger.exception("%s", exc)
+            self.fail(f"ERROR during sweep\n\nStopped\n\n{exc}")
+
+    def measure(self, sweep: Sweep
+                ) -> Tuple[List[Datapoint], List[Datapoint]]:
+        """blocking single sweep, returns the calibrated data.
+        Raises IOError without a connected VNA or if the sweep fails or
+        is stopped before completion."""
+        if self.vna is None or not self.vna.connected():
+            raise IOError("Not connected to a VNA")
+        if sweep.properties.mode in (SweepMode.CONTINOUS,
+                                     SweepMode.SMOOTHED):
+            sweep = sweep.copy()
+            sweep.properties = copy(sweep.properties)
+            sweep.properties.mode = SweepMode.SINGLE
+        self.stopped = False
+        self.error_message = ""
+        self.run(sweep)
+        if self.error_message:
+            raise IOError(self.error_message)
+        if self.stopped:
+            raise IOError("Sweep stopped before completion")
+        return self.data11[:], self.data21[:]
+
+    def recalibrate(self) -> Tuple[List[Datapoint], List[Datapoint]]:
+        """re-applies calibration and offset delay to the raw data of
+        the last sweep, e.g. after the calibration changed"""
+        self.data11, self.data21 = self.applyCalibration(
+            self.rawData11, self.rawData21)
+        return self.data11, self.data21
+
+    def _run(self, sweep: Sweep):
+        logger.info("Starting sweep")
+        self.running = True
+        self.percentage = 0
+        self.retries.clear()
+        self.timing.clear()
+
+        if self.vna is None or not self.vna.connected():
+            logger.debug(
+                "Attempted to run without being connected to the NanoVNA")
+            self.running = False
+            return
+
+        averages = 1
+        smoothing = 0.0
+        if sweep.properties.mode == SweepMode.AVERAGE:
+            averages = sweep.properties.averages[0]
+            logger.info("%d averages", averages)
+        elif sweep.properties.mode == SweepMode.SMOOTHED:
+            smoothing = 2 / (sweep.properties.averages[0] + 1)
+            logger.info("Smoothing factor %.3f", smoothing)
+
+        if (sweep != self.sweep or
+                sweep.properties.mode == SweepMode.ADAPTIVE):
+            # adaptive sweeps leave a non-uniform grid behind
+            self.sweep = sweep
+            self.init_data()
+            if self.scheduler:
+                self.scheduler.reset()
+
+        self.updateScheduler(sweep)
+
+        self.queue = Queue(QUEUE_SIZE)
+        processor = threading.Thread(
+            target=self.process, args=(averages, smoothing),
+            name="SweepProcessor", daemon=True)
+        processor.start()
+        try:
+            self.acquire(sweep, averages)
+        finally:
+            self.queue.put(None)
+            processor.join()
+            if self.scheduler:
+                self.restoreBandwidth()
+
+        if sweep.segments > 1:
+            start = sweep.start
+            end = sweep.end
+            logger.debug("Resetting NanoVNA sweep to full range: %d to %d",
+                         start, end)
+            self.vna.resetSweep(start, end)
+
+        if self.retries:
+            logger.info("Read retries: %s", dict(self.retries))
+        logger.info("Stage timing: %s",
+                    {k: round(v, 3) for k, v in self.timing.items()})
+        self.percentage = 100
+        self.running = False
+        self.on_finished()
+
+    def acquire(self, sweep: Sweep, averages: int):
+        """reads all segments from the device and hands them over to
+        the processing stage, nothing else happens on this thread"""
+        coarse = []
+        finished = False
+        while not finished:
+            for i in range(sweep.segments):
+                logger.debug("Sweep segment no %d", i)
+                start, stop = sweep.get_index_range(i)
+                if self.scheduler:
+                    self.setBandwidth(self.scheduler.choose(i))
+                logger.info("Reading from %d to %d. Averaging %d values",
+                            start, stop, averages)
+                for n in range(averages):
+                    if self.stopped:
+                        logger.debug("Stopping sweeping as signalled")
+                        return
+                    logger.debug("Reading average no %d / %d", n + 1,
+                                 averages)
+                    tick = perf_counter()
+                    freq, values11, values21 = self.readSegment(start, stop)
+                    self.timing["acquisition"] += perf_counter() - tick
+                    if self.scheduler:
+                        self.scheduler.update(i, values21)
+                    tick = perf_counter()
+                    self.queue.put((i, freq, values11, values21))
+                    self.timing["backpressure"] += perf_counter() - tick
+                if sweep.properties.mode == SweepMode.ADAPTIVE:
+                    coarse.append((freq, values11, values21))
+
+            if sweep.properties.mode not in (SweepMode.CONTINOUS,
+                                             SweepMode.SMOOTHED):
+                finished = True
+
+        if sweep.properties.mode == SweepMode.ADAPTIVE:
+            self.refine(sweep, coarse)
+
+    def refine(self, sweep: Sweep, coarse: List[Tuple]):
+        """reads dense segments where the coarse pass shows detail,
+        they are queued as segments beyond sweep.segments"""
+        freq = np.array([f for segment in coarse for f in segment[0]])
+        s11 = to_complex([v for segment in coarse for v in segment[1]])
+        s21 = to_complex([v for segment in coarse for v in segment[2]])
+        if not len(freq) == len(s11) == len(s21):
+            logger.warning("Incomplete coarse sweep, not refining")
+            return
+        ranges = AdaptivePlanner(sweep.points).plan(freq, s11, s21)
+        logger.info("Refining %d ranges", len(ranges))
+        for i, (start, stop) in enumerate(ranges, sweep.segments):
+            if self.stopped:
+                logger.debug("Stopping refinement as signalled")
+                return
+            tick = perf_counter()
+            freq, values11, values21 = self.readSegment(start, stop)
+            self.timing["acquisition"] += perf_counter() - tick
+            self.queue.put((i, freq, values11, values21))
+
+    def process(self, averages: int, smoothing: float = 0.0):
+        """processing stage: averages the reads of a segment, applies
+        calibration, offset delay and attenuation and publishes the
+        result. Runs until None is queued.
+
+        With smoothing set, every point is additionally kept as
+        exponential moving average over successive sweeps."""
+        pending = {}
+        failed = False
+        truncates = self.sweep.properties.averages[1]
+        size = self.sweep.points * self.sweep.segments
+        ema11 = np.zeros(size, dtype=complex)
+        ema21 = np.zeros(size, dtype=complex)
+        seeded = set()
+        while True:
+            item = self.queue.get()
+            if item is None:
+                if pending:
+                    logger.warning(
+                        "Stop during average. Discarding sweep result.")
+                return
+            if failed:
+                continue
+            index, freq, values11, values21 = item
+            tick = perf_counter()
+            try:
+                if index not in pending:
+                    pending[index] = (Averager(averages, truncates),
+                                      Averager(averages, truncates))
+                avg11, avg21 = pending[index]
+                avg11.add(to_complex(values11))
+                avg21.add(to_complex(values21))
+                if index < self.sweep.segments:
+                    self.percentage += 100 / (self.sweep.segments * averages)
+                if not avg11.complete:
+                    self.timing["processing"] += perf_counter() - tick
+                    self.on_changed(0, 0)
+                    continue
+                del pending[index]
+                logger.debug("Averaging %d values", avg11.count)
+                values11 = avg11.mean()
+                values21 = avg21.mean()
+                if smoothing:
+                    offset = self.sweep.points * index
+                    values11 = ema_update(ema11, offset, values11,
+                                          smoothing, index in seeded)
+                    values21 = ema_update(ema21, offset, values21,
+                                          smoothing, index in seeded)
+                    seeded.add(index)
+                self.percentage = min(
+                    (index + 1) * 100 / self.sweep.segments, 100)
+                self.updateData(freq, values11, values21, index)
+                if (index == self.sweep.segments - 1 and
+                        self.sweep.properties.mode != SweepMode.ADAPTIVE):
+                    self.record()
+            except ValueError as e:
+                failed = True
+                self.fail(str(e))
+            except Exception as exc:  # pylint: disable=broad-except
+                failed = True
+                logger.exception("%s", exc)
+                self.fail(f"ERROR during sweep\n\nStopped\n\n{exc}")
+            self.timing["processing"] += perf_counter() - tick
+
+    def updateScheduler(self, sweep: Sweep):
+        vna = self.vna
+        if not (sweep.properties.adaptive_bandwidth and
+                "Bandwidth" in vna.features):
+            self.scheduler = None
+            return
+        if self.scheduler is None:
+            self.scheduler = BandwidthScheduler(
+                vna.get_bandwidths(), vna.bandwidth)
+        # the user may have changed the bandwidth since the last sweep
+        self.scheduler.default = vna.bandwidth
+        self.scheduler.snr = sweep.properties.snr
+        logger.debug("Estimated sweep time %d retries",
+                     self.scheduler.estimate(sweep.segments, sweep.points))
+
+    def restoreBandwidth(self):
+        """sets the bandwidth back to the one from before the sweep,
+        a failure is only logged to keep the error of the sweep"""
+        try:
+            self.setBandwidth(self.scheduler.default)
+        except IOError as exc:
+            logger.warning("Restoring IF bandwidth failed: %s", exc)
+
+    def setBandwidth(self, bandwidth: int):
+        if bandwidth == self.vna.bandwidth:
+            return
+        logger.debug("Setting IF bandwidth to %d", bandwidth)
+        self.vna.set_bandwidth(bandwidth)
+
+    def init_data(self):
+        self.data11 = []
+        self.data21 = []
+        self.rawData11 = []
+        self.rawData21 = []
+        for freq in self.sweep.plan.frequencies.tolist():
+            dp = Datapoint(freq, 0.0, 0.0)
+            self.data11.append(dp)
+            self.data21.append(dp)
+            self.rawData11.append(dp)
+            self.rawData21.append(dp)
+        logger.debug("Init data length: %s", len(self.data11))
+
+    def updateData(self, frequencies, values11, values21, index):
+        # Update the data from (i*101) to (i+1)*101
+        logger.debug(
+            "Calculating data and inserting in existing data at index %d",
+            index)
+        offset = self.sweep.plan.slice(index).start
+        raw_data11 = [Datapoint(freq, v.real, v.imag) for freq, v in
+                      zip(frequencies, np.asarray(values11).tolist())]
+        raw_data21 = [Datapoint(freq, v.real, v.imag) for freq, v in
+                      zip(frequencies, np.asarray(values21).tolist())]
+
+        data11, data21 = self.applyCalibration(raw_data11, raw_data21)
+        if index >= self.sweep.segments:
+            offset = self.mergeData(data11, data21, raw_data11, raw_data21)
+            changed = (offset, len(self.data11))
+        else:
+            logger.debug("update Freqs: %s, Offset: %s",
+                         len(frequencies), offset)
+            for i in range(len(frequencies)):
+                self.data11[offset + i] = data11[i]
+                self.data21[offset + i] = data21[i]
+                self.rawData11[offset + i] = raw_data11[i]
+                self.rawData21[offset + i] = raw_data21[i]
+            changed = (offset, offset + len(frequencies))
+
+        logger.debug("Saving data to application (%d and %d points)",
+                     len(self.data11), len(self.data21))
+        self.on_data(self.data11, self.data21)
+        self.on_changed(*changed)
+
+    def record(self):
+        """appends the calibrated data of a complete sweep to the
+        history"""
+        self.history.append([dp.freq for dp in self.data11],
+                            [dp.z for dp in self.data11],
+                            [dp.z for dp in self.data21])
+
+    def mergeData(self, *new_data: List[Datapoint]) -> int:
+        """merges the points of a refinement segment into the sorted
+        data lists, new points replace ones of equal frequency.
+        Returns the first changed index."""
+        if not new_data[0]:
+            return len(self.data11)
+        freqs = [dp.freq for dp in self.data11]
+        lo = bisect_left(freqs, new_data[0][0].freq)
+        hi = bisect_right(freqs, new_data[0][-1].freq)
+        for target, new in zip((self.data11, self.data21,
+                                self.rawData11, self.rawData21), new_data):
+            merged = {dp.freq: dp for dp in target[lo:hi]}
+            merged.update((dp.freq, dp) for dp in new)
+            target[lo:hi] = [merged[f] for f in sorted(merged)]
+        return lo
+
+    def applyCalibration(self,
+                         raw_data11: List[Datapoint],
+                         raw_data21: List[Datapoint]
+                         ) -> Tuple[List[Datapoint], List[Datapoint]]:
+        if self.offsetDelay != 0:
+            tmp = []
+            for dp in raw_data11:
+                tmp.append(correct_delay(dp, self.offsetDelay, reflect=True))
+            raw_data11 = tmp
+            tmp = []
+            for dp in raw_data21:
+                tmp.append(correct_delay(dp, self.offsetDelay))
+            raw_data21 = tmp
+
+        if not self.calibration.isCalculated:
+            return raw_data11, corr_att_data(raw_data21, self.s21att)
+
+        data11: List[Datapoint] = []
+        data21: List[Datapoint] = []
+
+        if self.calibration.isValid1Port():
+            for dp in raw_data11:
+                data11.append(self.calibration.correct11(dp))
+        else:
+            data11 = raw_data11
+
+        if self.calibration.isValid2Port():
+            for dp in raw_data21:
+                data21.append(self.calibration.correct21(dp))
+        else:
+            data21 = raw_data21
+        return data11, corr_att_data(data21, self.s21att)
+
+    def readSegment(self, start, stop):
+        logger.debug("Setting sweep range to %d to %d", start, stop)
+        self.vna.setSweep(start, stop)
+
+        frequencies = self.vna.readFrequencies()
+        logger.debug("Read %s frequencies", len(frequencies))
+        values11, bad11 = self.readChannel("data 0")
+        values21, bad21 = self.readChannel("data 1")
+        if not len(frequencies) == len(values11) == len(values21):
+            logger.info("No valid data during this run")
+            return [], [], []
+        bad = sorted(set(bad11) | set(bad21))
+        if bad and not self.recoverPoints(
+                start, stop, frequencies, values11, values21, bad):
+            logger.debug("Partial re-read impossible, re-reading segment")
+            self.retries["full"] += 1
+            values11 = self.readData("data 0")
+            values21 = self.readData("data 1")
+        return frequencies, values11, values21
+
+    def readChannel(self, data) -> Tuple[List[Tuple[float, float]],
+                                         List[int]]:
+        tmpdata = self.vna.readValues(data)
+        logger.debug("Read %d values", len(tmpdata))
+        return parse_values(tmpdata, self.vna.validateInput)
+
+    def recoverPoints(self, start: int, stop: int,
+                      frequencies: List[int],
+                      values11: List[Tuple[float, float]],
+                      values21: List[Tuple[float, float]],
+                      bad: List[int]) -> bool:
+        """re-acquires narrow sub-sweeps around corrupt points and splices
+        the results into values11 and values21.
+
+        Returns False if the segment has to be read again as a whole."""
+        vna = self.vna
+        points = len(frequencies)
+        width = min(vna.valid_datapoints)
+        if ("Customizable data points" not in vna.features or
+                width >= points or
+                len(bad) > points * RECOVERY_MAX_BAD):
+            return False
+        logger.info("Recovering %d corrupt points", len(bad))
+        self.retries["bad_points"] += len(bad)
+        datapoints = vna.datapoints
+        try:
+            vna.datapoints = width
+            for _ in range(RECOVERY_RETRIES):
+                if self.stopped:
+                    return False
+                still_bad = []
+                for lo, hi in bad_windows(bad, width, points):
+                    self.retries["partial"] += 1
+                    window = [i for i in bad if lo <= i < hi]
+                    vna.setSweep(frequencies[lo], frequencies[hi - 1])
+                    sub11, bad11 = self.readChannel("data 0")
+                    sub21, bad21 = self.readChannel("data 1")
+                    if not len(sub11) == len(sub21) == width:
+                        still_bad.extend(window)
+                        continue
+                    sub_bad = set(bad11) | set(bad21)
+                    for i in window:
+                        if i - lo in sub_bad:
+                            still_bad.append(i)
+                            continue
+                        values11[i] = sub11[i - lo]
+                        values21[i] = sub21[i - lo]
+                bad = still_bad
+                if not bad:
+                    return True
+                logger.debug("%d points still corrupt", len(bad))
+            return False
+        finally:
+            vna.datapoints = datapoints
+            vna.setSweep(start, stop)
+
+    def readData(self, data):
+        logger.debug("Reading %s", data)
+        count = 0
+        while True:
+            returndata, bad = self.readChannel(data)
+            if not bad:
+                return returndata
+            logger.debug("Re-reading %s", data)
+            self.retries["full"] += 1
+            sleep(0.2)
+            count += 1
+            if count == 5:
+                logger.error("Tried and failed to read %s %d times.",
+                             data, count)
+                logger.debug("trying to reconnect")
+                self.retries["reconnect"] += 1
+                self.vna.reconnect()
+            if count >= 10:
+                logger.critical(
+                    "Tried and failed to read %s %d times. Giving up.",
+                    data, count)
+                raise IOError(
+                    f"Failed reading {data} {count} times.\n"
+                    f"Data outside expected valid ranges,"
+                    f" or in an unexpected format.\n\n"
+                    f"You can disable data validation on the"
+                    f"device settings screen.")
+
+    def fail(self, message: str):
+        self.error_message = message
+        self.stopped = True
+        self.running = False
+        self.on_error(message)
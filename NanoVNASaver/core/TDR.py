@@ -0,0 +1,112 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+Time domain reflectometry: the inverse FFT of the windowed S11 sweep
+gives the impulse response, its running sum the step response.
+"""
+import logging
+from functools import lru_cache
+from typing import NamedTuple, Sequence
+
+import numpy as np
+import scipy.fft
+
+from NanoVNASaver.Derived import derive
+from NanoVNASaver.RFTools import Datapoint
+
+logger = logging.getLogger(__name__)
+
+FFT_POINTS = (2**12, 2**13, 2**14, 2**15, 2**16)
+DEFAULT_FFT_POINTS = 2**14
+
+# propagation speed in vacuum in m/s
+SPEED_OF_LIGHT = 299792458
+
+
+@lru_cache(maxsize=8)
+def blackman(points: int) -> np.ndarray:
+    """cached read-only Blackman window"""
+    window = np.blackman(points)
+    window.setflags(write=False)
+    return window
+
+
+class TDRResult(NamedTuple):
+    # time of flight there and back in seconds
+    time_axis: np.ndarray
+    # magnitude of the impulse response
+    td: np.ndarray
+    step_response: np.ndarray
+    # impedance seen along the line in ohms
+    step_response_Z: np.ndarray
+
+    def distance_axis(self, velocity: float) -> np.ndarray:
+        """round trip distances in m for the velocity factor given"""
+        return self.time_axis * velocity * SPEED_OF_LIGHT
+
+
+class TDREngine:
+    """Calculates TDR results with a selectable FFT size.
+
+    The result for the latest S11 data is kept, so asking again for the
+    same data and settings is free. cached() may be called from any
+    thread while another one runs transform()."""
+
+    def __init__(self, fft_points: int = DEFAULT_FFT_POINTS,
+                 workers: int = -1, ref_impedance: float = 50):
+        self.fft_points = fft_points
+        # scipy.fft worker threads, -1 uses all CPUs
+        self.workers = workers
+        self.ref_impedance = ref_impedance
+        # data, settings and result of the latest transform
+        self._latest = (None, None, None)
+
+    def settings(self) -> tuple:
+        return self.fft_points, self.ref_impedance
+
+    def cached(self, data: Sequence[Datapoint]) -> TDRResult:
+        """the result for data if it has been calculated, else None"""
+        latest_data, settings, result = self._latest
+        if latest_data is data and settings == self.settings():
+            return result
+        return None
+
+    def transform(self, data: Sequence[Datapoint]) -> TDRResult:
+        """raises ValueError for sweeps too short or without span"""
+        result = self.cached(data)
+        if result is not None:
+            return result
+        # the settings may change while a worker transforms
+        settings = fft_points, ref_impedance = self.settings()
+        if len(data) < 2:
+            raise ValueError("TDR needs at least two datapoints")
+        step_size = data[1].freq - data[0].freq
+        if step_size == 0:
+            raise ValueError("Cannot compute cable length at 0 span")
+        s11 = derive(data).z
+        td = np.abs(scipy.fft.ifft(blackman(len(s11)) * s11,
+                                   fft_points, workers=self.workers))
+        step_response = np.cumsum(td)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step_response_z = (ref_impedance * (1 + step_response) /
+                               (1 - step_response))
+        time_axis = np.linspace(0, 1 / step_size, fft_points)
+        result = TDRResult(time_axis, td, step_response, step_response_z)
+        self._latest = (data, settings, result)
+        return result
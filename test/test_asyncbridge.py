@@ -0,0 +1,105 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import asyncio
+import unittest
+
+from PyQt5 import QtCore, QtWidgets
+
+# Import targets to be tested
+from NanoVNASaver.Hardware.AsyncBridge import AsyncBridge
+from NanoVNASaver.Hardware.AsyncVNA import AsyncVNA
+from NanoVNASaver.Hardware.Emulator import Emulator
+from NanoVNASaver.Hardware.Hardware import get_VNA
+from NanoVNASaver.Hardware.Serial import Interface
+
+
+def wait_for(condition, timeout: float = 5.0):
+    """processes Qt events until condition() or the timeout"""
+    timer = QtCore.QElapsedTimer()
+    timer.start()
+    while not condition() and timer.elapsed() < timeout * 1000:
+        QtCore.QCoreApplication.processEvents(
+            QtCore.QEventLoop.AllEvents, 10)
+
+
+class TestCases(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = (QtWidgets.QApplication.instance() or
+                   QtWidgets.QApplication([]))
+
+    def setUp(self):
+        self.bridge = AsyncBridge()
+        self.results = []
+
+    def tearDown(self):
+        self.bridge.stop()
+
+    def callback(self, result):
+        self.results.append(
+            (QtCore.QThread.currentThread(), result))
+
+    def test_result(self):
+        async def double(value):
+            await asyncio.sleep(0.01)
+            return 2 * value
+
+        self.bridge.submit(double(21), self.callback)
+        wait_for(lambda: self.results)
+        self.assertEqual(self.results,
+                         [(self.app.thread(), 42)])
+
+    def test_error(self):
+        async def fail():
+            raise IOError("no device")
+
+        self.bridge.submit(fail(), self.fail, self.callback)
+        wait_for(lambda: self.results)
+        thread, exc = self.results[0]
+        self.assertIs(thread, self.app.thread())
+        self.assertIsInstance(exc, IOError)
+
+    def test_cancel(self):
+        future = self.bridge.submit(asyncio.sleep(10), self.callback,
+                                    self.callback)
+        future.cancel()
+        done = []
+        self.bridge.submit(asyncio.sleep(0), done.append)
+        wait_for(lambda: done)
+        self.assertTrue(future.cancelled())
+        self.assertEqual(self.results, [])
+
+    def test_device(self):
+        emulator = Emulator()
+        iface = Interface("serial", "emulator")
+        iface.port = emulator.port
+        iface.open()
+        device = AsyncVNA(get_VNA(iface), timeout=5)
+        try:
+            self.bridge.submit(device.read_segment(1000000, 11000000),
+                               self.callback)
+            wait_for(lambda: self.results)
+        finally:
+            device.close()
+            iface.close()
+            emulator.close()
+        freq, values11, values21 = self.results[0][1]
+        self.assertEqual(len(freq), 101)
+        self.assertEqual(len(values11), len(values21))
@@ -0,0 +1,103 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import asyncio
+import threading
+import time
+import unittest
+
+# Import targets to be tested
+from NanoVNASaver.Hardware.AsyncVNA import AsyncVNA, sweep_devices
+from NanoVNASaver.Hardware.Emulator import Emulator
+from NanoVNASaver.Hardware.Hardware import get_VNA
+from NanoVNASaver.Hardware.Serial import Interface
+from NanoVNASaver.Settings.Sweep import Sweep
+
+
+def connect(emulator: Emulator) -> AsyncVNA:
+    iface = Interface("serial", "emulator")
+    iface.port = emulator.port
+    iface.open()
+    return AsyncVNA(get_VNA(iface), timeout=5)
+
+
+class TestCases(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.emulators = [Emulator(), Emulator(info="NanoVNA-H 4")]
+        cls.devices = [connect(e) for e in cls.emulators]
+
+    @classmethod
+    def tearDownClass(cls):
+        for device in cls.devices:
+            device.close()
+            device.vna.serial.close()
+        for emulator in cls.emulators:
+            emulator.close()
+
+    def test_read_segment(self):
+        device = self.devices[0]
+        self.assertEqual(device.vna.name, "NanoVNA-H")
+        freq, values11, values21 = asyncio.run(
+            device.read_segment(1000000, 11000000))
+        self.assertEqual(len(freq), 101)
+        self.assertEqual(freq[1], 1100000)
+        self.assertEqual(len(values11), 101)
+        self.assertEqual(len(values21), 101)
+        self.assertTrue(abs(complex(*values11[0])) <= 1)
+
+    def test_sweep_devices(self):
+        results = asyncio.run(sweep_devices(
+            self.devices, Sweep(1000000, 30000000, segments=2)))
+        self.assertEqual(self.devices[1].vna.name, "NanoVNA-H4")
+        for freq, values11, values21 in results:
+            self.assertEqual(len(freq), 202)
+            self.assertEqual(len(values11), 202)
+            self.assertEqual(len(values21), 202)
+
+    def test_timeout(self):
+        device = self.devices[0]
+        self.emulators[0].delay = 1
+
+        async def slow():
+            with self.assertRaises(asyncio.TimeoutError):
+                await device.command("info", timeout=0.2)
+
+        asyncio.run(slow())
+        self.emulators[0].delay = 0
+
+    def test_abort(self):
+        vna = self.devices[0].vna
+        vna.abort()  # idle abort does not affect later commands
+        self.assertTrue(list(vna.exec_command("info")))
+        errors = []
+
+        def queued():
+            try:
+                list(vna.exec_command("info"))
+            except IOError as exc:
+                errors.append(exc)
+
+        with vna.serial.lock:
+            thread = threading.Thread(target=queued)
+            thread.start()
+            time.sleep(0.2)
+            vna.abort()
+        thread.join(5)
+        self.assertEqual(len(errors), 1)
@@ -0,0 +1,54 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+
+# Import targets to be tested
+from NanoVNASaver.Hardware.Bandwidth import BandwidthScheduler, noise_floor
+from NanoVNASaver.Hardware.VNA import DISLORD_BW
+
+
+class TestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = BandwidthScheduler(
+            list(DISLORD_BW.keys()), 1000, snr=20, floor=-80)
+
+    def test_noise_floor(self):
+        self.assertAlmostEqual(noise_floor(1000, -80), -80)
+        self.assertAlmostEqual(noise_floor(10, -80), -100)
+
+    def test_unknown_segment(self):
+        self.assertEqual(self.scheduler.choose(0), 1000)
+
+    def test_choose(self):
+        self.scheduler.update(0, [(0.5, 0.0), (0.1, 0.0)])  # -20 dB
+        self.scheduler.update(1, [(0.001, 0.0)])  # -60 dB
+        self.scheduler.update(2, [(0.0001, 0.0)])  # -80 dB
+        self.scheduler.update(3, [(0.0, 0.0)])
+        self.assertEqual(self.scheduler.choose(0), 2000)
+        self.assertEqual(self.scheduler.choose(1), 1000)
+        self.assertEqual(self.scheduler.choose(2), 10)
+        self.assertEqual(self.scheduler.choose(3), 10)
+
+    def test_estimate(self):
+        self.scheduler.update(0, [(0.5, 0.0)])
+        self.scheduler.update(1, [(0.001, 0.0)])
+        fast = self.scheduler.estimate(2, 101)
+        self.scheduler.snr = 40
+        self.assertGreater(self.scheduler.estimate(2, 101), fast)
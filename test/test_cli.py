@@ -0,0 +1,71 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Import targets to be tested
+from NanoVNASaver import CLI
+from NanoVNASaver.Hardware.Emulator import Emulator
+from NanoVNASaver.Touchstone import Touchstone
+
+
+def parse(*args: str) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    CLI.add_parser(parser.add_subparsers(dest="command"))
+    return parser.parse_args(["sweep", *args])
+
+
+class TestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Emulator()
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.emulator.close()
+        self.tmpdir.cleanup()
+
+    def test_no_qt(self):
+        result = subprocess.run(
+            [sys.executable, "-c",
+             "import sys, NanoVNASaver.__main__;"
+             "print(any(m.startswith('PyQt5') for m in sys.modules))"],
+            stdout=subprocess.PIPE, check=True)
+        self.assertEqual(result.stdout.strip(), b"False")
+
+    def test_sweep(self):
+        out = os.path.join(self.tmpdir.name, "dut.s2p")
+        args = parse("--port", self.emulator.port, "--start", "27M",
+                     "--stop", "30M", "--segments", "2",
+                     "--cal", "./test/data/sol_27_30.cal", "--out", out)
+        self.assertEqual(CLI.run(args), 0)
+        ts = Touchstone(out)
+        ts.load()
+        self.assertEqual(len(ts.s11data), 202)
+        self.assertEqual(ts.s11data[0].freq, 27000000)
+        self.assertEqual(len(ts.s21data), 202)
+
+    def test_invalid_points(self):
+        args = parse("--port", self.emulator.port, "--start", "1M",
+                     "--stop", "30M", "--points", "77")
+        self.assertEqual(CLI.run(args), 1)
@@ -0,0 +1,74 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+from threading import Thread
+
+from PyQt5 import QtWidgets
+from PyQt5.QtTest import QTest
+
+# Import targets to be tested
+from NanoVNASaver.Coalescer import UpdateCoalescer
+
+
+class TestCases(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = (QtWidgets.QApplication.instance() or
+                   QtWidgets.QApplication([]))
+
+    def setUp(self):
+        self.coalescer = UpdateCoalescer(max_rate=10)
+        self.received = []
+        self.coalescer.updated.connect(
+            lambda start, stop: self.received.append((start, stop)))
+
+    def test_coalesce(self):
+        def worker():
+            for i in range(10):
+                self.coalescer.notify(i * 101, (i + 1) * 101)
+            self.coalescer.notify(0, 0)
+        thread = Thread(target=worker)
+        thread.start()
+        thread.join()
+        QTest.qWait(50)
+        self.assertEqual(self.received, [(0, 1010)])
+
+    def test_rate_limit(self):
+        self.coalescer.notify(0, 101)
+        QTest.qWait(20)
+        self.coalescer.notify(101, 202)
+        QTest.qWait(20)
+        self.assertEqual(self.received, [(0, 101)])
+        self.coalescer.flush()
+        self.assertEqual(self.received, [(0, 101), (101, 202)])
+
+    def test_flush_queued(self):
+        self.coalescer.notify(0, 101)
+        self.coalescer.flush()  # before the queued _schedule ran
+        self.assertEqual(self.received, [(0, 101)])
+        QTest.qWait(150)
+        self.assertEqual(self.received, [(0, 101)])
+        self.coalescer.flush()
+        self.assertEqual(self.received, [(0, 101)])
+
+    def test_progress_only(self):
+        self.coalescer.notify(0, 0)
+        QTest.qWait(20)
+        self.assertEqual(self.received, [(0, 0)])
@@ -0,0 +1,111 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import math
+import unittest
+
+import numpy as np
+
+# Import targets to be tested
+from NanoVNASaver.Derived import Derived, Trace, as_trace, derive
+from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.Snapshot import Snapshot
+
+
+class TestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.data = [
+            Datapoint(0, 0.5, 0.5),
+            Datapoint(1000, 0.0, 0.0),
+            Datapoint(2000, 1.0, 0.0),
+            Datapoint(3000, 0.2, 0.0),
+            Datapoint(4000, -0.3, 0.4),
+            Datapoint(5000, 0.1, -0.9),
+        ]
+
+    def assertMatches(self, values, expected):
+        self.assertEqual(len(values), len(expected))
+        for value, scalar in zip(values, expected):
+            if math.isinf(abs(scalar)):
+                self.assertEqual(value, scalar)
+            else:
+                self.assertAlmostEqual(value, scalar)
+
+    def test_datapoint_parity(self):
+        derived = Derived(self.data)
+        self.assertEqual(len(derived), 6)
+        self.assertEqual(list(derived.freq), [d.freq for d in self.data])
+        self.assertMatches(derived.z, [d.z for d in self.data])
+        self.assertMatches(derived.gain, [d.gain for d in self.data])
+        self.assertMatches(derived.phase, [d.phase for d in self.data])
+        self.assertMatches(derived.vswr, [d.vswr for d in self.data])
+        self.assertMatches(derived.impedance(),
+                           [d.impedance() for d in self.data])
+        self.assertMatches(derived.impedance(75),
+                           [d.impedance(75) for d in self.data])
+        self.assertMatches(derived.qFactor(),
+                           [d.qFactor() for d in self.data])
+        self.assertMatches(derived.capacitiveEquivalent(),
+                           [d.capacitiveEquivalent() for d in self.data])
+        self.assertMatches(derived.inductiveEquivalent(),
+                           [d.inductiveEquivalent() for d in self.data])
+        self.assertAlmostEqual(derived.admittance()[3], 1 / 75)
+
+    def test_group_delay(self):
+        freq = np.linspace(100e6, 200e6, 101)
+        delay = 50e-9
+        data = [Datapoint(int(f), math.cos(-math.tau * f * delay),
+                          math.sin(-math.tau * f * delay)) for f in freq]
+        derived = Derived(data)
+        self.assertGreater(np.ptp(derived.unwrappedPhase), math.tau)
+        np.testing.assert_allclose(derived.groupDelay(), delay, rtol=1e-6)
+        self.assertEqual(len(Derived(data[:1]).groupDelay()), 1)
+        self.assertEqual(len(Derived([]).groupDelay()), 0)
+
+    def test_cache(self):
+        derived = Derived(self.data)
+        self.assertIs(derived.gain, derived.gain)
+        self.assertIs(derived.impedance(), derived.impedance(50))
+        with self.assertRaises(ValueError):
+            derived.vswr[0] = 0
+        trace = Trace(self.data)
+        self.assertIs(derive(trace), trace.derived)
+        self.assertIsNot(derive(self.data), derive(self.data))
+        self.assertIs(as_trace(trace), trace)
+        self.assertIsInstance(as_trace(self.data), Trace)
+        snapshot = Snapshot(self.data, self.data)
+        self.assertIs(snapshot.derived11, snapshot.s11.derived)
+        self.assertIs(snapshot.freq, snapshot.derived11.freq)
+        self.assertIsNot(snapshot.derived11, snapshot.derived21)
+
+    def test_extent(self):
+        derived = Derived(self.data)
+        self.assertEqual(derived.extent("gain", lambda d: d.gain),
+                         (derived.gain[3], 0.0))
+        self.assertEqual(derived.extent("gain", lambda d: d.gain, 3000),
+                         (derived.gain[3], derived.gain[5]))
+        low, high = derived.extent("gain", lambda d: d.gain, 1000, 1000)
+        self.assertTrue(math.isnan(low) and math.isnan(high))
+        self.assertEqual(derived.extent(
+            "both", lambda d: np.stack((d.z.real, d.z.imag)), 4000),
+            (-0.9, 0.4))
+        calls = []
+        derived.extent("count", lambda d: calls.append(1) or d.mag)
+        derived.extent("count", lambda d: calls.append(1) or d.mag)
+        self.assertEqual(len(calls), 1)
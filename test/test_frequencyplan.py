@@ -0,0 +1,66 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+
+# Import targets to be tested
+from NanoVNASaver.Hardware import VNA as VNA_module
+from NanoVNASaver.Hardware.Emulator import Emulator
+from NanoVNASaver.Hardware.Hardware import get_VNA
+from NanoVNASaver.Hardware.Serial import Interface
+
+
+def connect(emulator: Emulator):
+    iface = Interface("serial", "emulator")
+    iface.port = emulator.port
+    iface.open()
+    return get_VNA(iface)
+
+
+class SkewedEmulator(Emulator):
+    def frequencies(self, start, stop, points):
+        return [f + 1 for f in super().frequencies(start, stop, points)]
+
+
+class TestCases(unittest.TestCase):
+
+    def sweep(self, emulator: Emulator, reads: int):
+        vna = connect(emulator)
+        try:
+            emulator.commands.clear()
+            for i in range(reads):
+                vna.setSweep(1000000 + i, 30000000)
+                freq = vna.readFrequencies()
+                self.assertEqual(
+                    freq, emulator.frequencies(1000000 + i, 30000000, 101))
+            return vna, [c for c in emulator.commands
+                         if c.endswith("0b001")]
+        finally:
+            vna.serial.close()
+            emulator.close()
+
+    def test_local_plan(self):
+        reads = VNA_module.PLAN_CHECK_INTERVAL + 5
+        vna, queries = self.sweep(Emulator(), reads)
+        self.assertTrue(vna.plan_verified)
+        self.assertLess(len(queries), 4)
+
+    def test_mismatch(self):
+        vna, queries = self.sweep(SkewedEmulator(), 5)
+        self.assertFalse(vna.plan_verified)
+        self.assertEqual(len(queries), 5)
@@ -0,0 +1,126 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import threading
+import unittest
+
+import numpy as np
+
+# Import targets to be tested
+from NanoVNASaver.core import SweepHistory
+
+FREQ = [1000, 2000, 3000]
+
+
+def sweep(n: int):
+    return np.full(3, n, dtype=complex), np.full(3, -n, dtype=complex)
+
+
+class TestCases(unittest.TestCase):
+
+    def test_ring(self):
+        history = SweepHistory(capacity=3)
+        self.assertEqual(len(history), 0)
+        for n in range(5):
+            history.append(FREQ, *sweep(n), timestamp=100.0 + n)
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history[0][0][0], 2)
+        self.assertEqual(history[-1][1][0], -4)
+        self.assertEqual(history.timestamp(-1), 104.0)
+        np.testing.assert_array_equal(history.timestamps, [102, 103, 104])
+        with self.assertRaises(IndexError):
+            history[3]  # pylint: disable=pointless-statement
+        with self.assertRaises(ValueError):
+            history[0][0][0] = 0
+
+    def test_time_query(self):
+        history = SweepHistory(capacity=4)
+        for n in range(6):
+            history.append(FREQ, *sweep(n), timestamp=10.0 * n)
+        self.assertEqual(history.index_at(35), 1)
+        self.assertEqual(history.index_at(50), 3)
+        with self.assertRaises(IndexError):
+            history.index_at(15)
+        ordered = history.ordered(25, 45)
+        self.assertEqual(ordered.shape, (2, 2, 3))
+        np.testing.assert_array_equal(ordered[:, 0, 0], [3, 4])
+        # in slots 3 and 0, a copy
+        self.assertFalse(np.shares_memory(ordered, history.sweeps()))
+        latest = history.ordered(35)
+        np.testing.assert_array_equal(latest[:, 0, 0], [4, 5])
+        self.assertTrue(np.shares_memory(latest, history.sweeps()))
+        for sweeps in (ordered, latest, history.sweeps()):
+            with self.assertRaises(ValueError):
+                sweeps[0, 0, 0] = 0
+
+    def test_hold(self):
+        history = SweepHistory(capacity=3)
+        for n in (1, 5, 2):
+            history.append(FREQ, *sweep(n))
+        np.testing.assert_array_equal(history.max_hold()[0], [5, 5, 5])
+        np.testing.assert_array_equal(history.min_hold()[1], [1, 1, 1])
+
+    def test_hold_empty(self):
+        history = SweepHistory()
+        self.assertEqual(history.max_hold().shape, (2, 0))
+        history.reset(FREQ)
+        self.assertTrue(np.isnan(history.max_hold()).all())
+        self.assertEqual(history.min_hold().shape, (2, 3))
+
+    def test_limits(self):
+        history = SweepHistory(capacity=100, max_bytes=1000)
+        history.append(FREQ, *sweep(1))
+        self.assertLessEqual(history.nbytes, 1000)
+        self.assertEqual(len(history.sweeps()), 1)
+        history.append(FREQ[:2], *(v[:2] for v in sweep(2)))
+        self.assertEqual(len(history), 1)
+        np.testing.assert_array_equal(history.freq, FREQ[:2])
+
+    def test_resize(self):
+        history = SweepHistory(capacity=4)
+        for n in range(6):
+            history.append(FREQ, *sweep(n), timestamp=float(n))
+        history.capacity = 2
+        self.assertEqual(len(history), 2)
+        np.testing.assert_array_equal(history.timestamps, [4, 5])
+        history.append(FREQ, *sweep(6), timestamp=6.0)
+        self.assertEqual(history[0][0][0], 5)
+        history.capacity = 10
+        self.assertEqual(len(history), 2)
+        history.append(FREQ, *sweep(7), timestamp=7.0)
+        np.testing.assert_array_equal(history.timestamps, [5, 6, 7])
+        history.max_bytes = 2 * (len(FREQ) * 2 * 16 + 8)
+        np.testing.assert_array_equal(history.timestamps, [6, 7])
+        self.assertLessEqual(history.nbytes, history.max_bytes)
+
+    def test_concurrent_reads(self):
+        history = SweepHistory(capacity=2)
+        history.append(FREQ, *sweep(0))
+
+        def writer():
+            for n in range(1, 2000):
+                history.append(FREQ, *sweep(n))
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        while thread.is_alive():
+            with history.locked():
+                s11, s21 = history[-1]
+                np.testing.assert_array_equal(s11, -s21)
+                self.assertEqual(len(set(s11.real)), 1)
+        thread.join()
@@ -0,0 +1,139 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+from unittest import mock
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor
+
+# Import targets to be tested
+from NanoVNASaver.Charts import LogMagChart, SmithChart
+from NanoVNASaver.Charts.Layer import LayeredPainter, StaticLayer
+from NanoVNASaver.RFTools import Datapoint
+
+
+def sweep(gain: float, start: int = 1000000) -> list:
+    return [Datapoint(start + 1000 * i, gain * (1 + i % 3) / 4, 0)
+            for i in range(20)]
+
+
+class Widget(QtWidgets.QWidget):
+    def __init__(self):
+        super().__init__()
+        self.layer = StaticLayer()
+        self.grid = QtCore.Qt.red
+        self.pixmaps = []
+        self.backgrounds = 0
+        self.resize(40, 30)
+
+    def setGrid(self, color):
+        self.grid = color
+        self.layer.invalidate()
+
+    def paintEvent(self, _event):
+        qp = LayeredPainter(QtGui.QPainter(self), self.layer, self)
+        if not qp.cached:
+            self.backgrounds += 1
+            pen = QtGui.QPen(self.grid)
+            qp.setPen(pen)
+            qp.drawLine(0, 10, 40, 10)
+            pen.setColor(QtCore.Qt.green)
+            qp.setPen(pen)
+            qp.save()
+            qp.translate(0, 10)
+            qp.drawLine(0, 10, 40, 10)
+            qp.restore()
+        qp.drawLine(0, 25, 40, 25)  # dropped when cached
+        qp.dynamic()
+        self.pixmaps.append(self.layer.pixmap)
+        qp.setPen(QtGui.QPen(QtCore.Qt.blue))
+        qp.drawPoint(5, 5)
+        qp.end()
+
+
+class TestCases(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = (QtWidgets.QApplication.instance() or
+                   QtWidgets.QApplication([]))
+
+    def test_layers(self):
+        widget = Widget()
+        image = widget.grab().toImage()
+        self.assertEqual(image.pixelColor(3, 10), QColor(Qt.red))
+        self.assertEqual(image.pixelColor(3, 20), QColor(Qt.green))
+        self.assertEqual(image.pixelColor(5, 5), QColor(Qt.blue))
+        self.assertEqual(image.pixelColor(3, 25), QColor(Qt.green))
+        image = widget.grab().toImage()
+        self.assertIs(widget.pixmaps[0], widget.pixmaps[1])
+        self.assertEqual(widget.backgrounds, 1)
+        self.assertEqual(image.pixelColor(3, 20), QColor(Qt.green))
+        widget.setGrid(QtCore.Qt.black)
+        image = widget.grab().toImage()
+        self.assertIsNot(widget.pixmaps[1], widget.pixmaps[2])
+        self.assertEqual(image.pixelColor(3, 10), QColor(Qt.black))
+        self.assertEqual(widget.backgrounds, 2)
+        widget.resize(50, 30)
+        widget.grab()
+        self.assertIsNot(widget.pixmaps[2], widget.pixmaps[3])
+        self.assertEqual(widget.backgrounds, 3)
+
+    def test_data_keeps_background(self):
+        chart = SmithChart("test")
+        chart.resize(290, 290)
+        # grabbing hidden widgets resends their resize events
+        chart.show()
+        chart.setData(sweep(0.5))
+        chart.grab()
+        pixmap = chart.staticLayer.pixmap
+        chart.setData(sweep(0.1))
+        chart.setReference(sweep(0.2))
+        chart.grab()
+        self.assertIs(chart.staticLayer.pixmap, pixmap)
+
+    def test_data_changing_axes(self):
+        def chart():
+            chart = LogMagChart("test")
+            chart.resize(400, 300)
+            chart.bands = mock.Mock(enabled=False)
+            chart.show()
+            return chart
+
+        logmag = chart()
+        logmag.setData(sweep(0.5))
+        logmag.grab()
+        pixmap = logmag.staticLayer.pixmap
+        # same 10 dB scale
+        logmag.setData(sweep(0.6))
+        logmag.grab()
+        self.assertIs(logmag.staticLayer.pixmap, pixmap)
+        logmag.setData(sweep(0.01))
+        image = logmag.grab().toImage()
+        self.assertIsNot(logmag.staticLayer.pixmap, pixmap)
+        fresh = chart()
+        fresh.setData(sweep(0.01))
+        self.assertEqual(image, fresh.grab().toImage())
+        pixmap = logmag.staticLayer.pixmap
+        logmag.setData(sweep(0.01, start=2000000))
+        image = logmag.grab().toImage()
+        self.assertIsNot(logmag.staticLayer.pixmap, pixmap)
+        fresh.setData(sweep(0.01, start=2000000))
+        self.assertEqual(image, fresh.grab().toImage())
@@ -0,0 +1,203 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+from unittest import mock
+
+import numpy as np
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+# Import targets to be tested
+from NanoVNASaver.Charts import (
+    LogMagChart, QualityFactorChart, RealImaginaryChart, VSWRChart)
+from NanoVNASaver.Derived import as_trace, derive
+from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.Charts.Renderer import (
+    RenderJob, TraceRenderer, clip_segments, decimate, draw_trace,
+    polygon, runs)
+
+RECT = (0, 0, 10, 10)
+RED = QtGui.QColor(255, 0, 0)
+
+
+class Widget(QtWidgets.QWidget):
+    def __init__(self):
+        super().__init__()
+        self.resize(12, 12)
+        self.pool = QtCore.QThreadPool()
+        self.renderer = TraceRenderer(self, self.pool)
+        self.y = 5
+
+    def paintEvent(self, _event):
+        qp = QtGui.QPainter(self)
+        self.renderer.add(qp, [1, 5, 20], [self.y] * 3, RECT,
+                          QtGui.QPen(RED), QtGui.QPen(RED))
+        self.renderer.finish()
+        qp.end()
+
+    def rendered(self) -> QtGui.QImage:
+        self.pool.waitForDone()
+        QtWidgets.QApplication.processEvents()
+        return self.grab().toImage()
+
+
+class TestCases(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = (QtWidgets.QApplication.instance() or
+                   QtWidgets.QApplication([]))
+
+    def test_clip_segments(self):
+        x = np.array([-5, 5, 5, 8, 20, 30])
+        y = np.array([5, 5, 20, 5, 5, 5])
+        cx0, cy0, cx1, cy1, visible, t0, t1 = clip_segments(x, y, RECT)
+        np.testing.assert_array_equal(visible, [True] * 4 + [False])
+        self.assertEqual((cx0[0], cy0[0], cx1[0], cy1[0]), (0, 5, 5, 5))
+        self.assertEqual((cx1[1], cy1[1]), (5, 10))
+        self.assertEqual((cx0[2], cy0[2], cx1[2], cy1[2]), (7, 10, 8, 5))
+        self.assertEqual((cx0[3], cx1[3]), (8, 10))
+        self.assertEqual(t0[1], 0)
+        self.assertLess(t1[1], 1)
+
+    def test_runs(self):
+        x = np.arange(8, dtype=float)
+        y = np.array([1, 2, 20, 3, 4, np.nan, 5, 6])
+        result = list(runs(x, y, RECT))
+        self.assertEqual(len(result), 3)
+        np.testing.assert_allclose(result[0], [[0, 1], [1, 2], [1.444, 10]],
+                                   atol=1e-3)
+        np.testing.assert_allclose(result[1][-2:], [[3, 3], [4, 4]])
+        np.testing.assert_array_equal(result[2], [[6, 5], [7, 6]])
+        self.assertEqual(list(runs(x[:1], y[:1], RECT)), [])
+
+    def test_polygon(self):
+        points = np.array([[1.5, 2], [3, 4]])
+        poly = polygon(points)
+        self.assertEqual([(p.x(), p.y()) for p in poly],
+                         [(1.5, 2), (3, 4)])
+        self.assertEqual(len(polygon(np.empty((0, 2)))), 0)
+
+    def test_draw_trace(self):
+        image = QtGui.QImage(12, 12, QtGui.QImage.Format_RGB32)
+        image.fill(0)
+        qp = QtGui.QPainter(image)
+        pen = QtGui.QPen(QtGui.QColor(255, 0, 0))
+        draw_trace(qp, [1, 5, 20], [5, 5, 5], RECT, pen, pen)
+        qp.end()
+        red = QtGui.QColor(255, 0, 0).rgb()
+        self.assertEqual(image.pixel(3, 5), red)
+        self.assertEqual(image.pixel(10, 5), red)
+        self.assertNotEqual(image.pixel(11, 5), red)
+
+    def test_decimate(self):
+        x = np.linspace(-10, 110, 100001).round()
+        y = np.sin(np.arange(len(x)) / 50.0)
+        y[50000] = 5
+        y[50001] = -5
+        y[60000] = np.nan
+        keep = decimate(x, y, 0, 100)
+        self.assertLessEqual(len(keep), 4 * 102)
+        self.assertIn(50000, keep)
+        self.assertIn(50001, keep)
+        self.assertTrue(np.all(np.diff(keep) > 0))
+        self.assertTrue(np.all(x[keep[1:-1]] >= 0))
+        self.assertTrue(np.all(x[keep[1:-1]] <= 100))
+        self.assertLess(x[keep[0]], 0)
+        self.assertGreater(x[keep[-1]], 100)
+        sparse = np.linspace(0, 100, 300).round()
+        np.testing.assert_array_equal(decimate(sparse, y[:300], 0, 100),
+                                      np.arange(300))
+
+    def test_chart_decimation(self):
+        rng = np.random.default_rng(1)
+        freq = np.linspace(1e6, 30e6, 5001)
+        z = 0.5 * np.exp(1j * freq / 3e5) * (1 + 0.3 * rng.random(5001))
+        data = as_trace([Datapoint(int(f), v.real, v.imag)
+                         for f, v in zip(freq, z)])
+
+        def render():
+            chart = RealImaginaryChart("test")
+            chart.resize(400, 300)
+            chart.bands = mock.Mock(enabled=False)
+            chart.setData(data)
+            chart.grab()
+            # zooming into y has to pick the extremes anew
+            chart.fixedValues = True
+            chart.minDisplayValue = -20
+            chart.maxDisplayValue = 20
+            return chart.grab().toImage()
+
+        decimated = render()
+        with mock.patch("NanoVNASaver.Charts.Frequency.decimate",
+                        lambda x, y, left, right: np.arange(len(x))):
+            full = render()
+        self.assertEqual(decimated, full)
+
+    def test_y_positions(self):
+        rng = np.random.default_rng(2)
+        z = rng.random(200) * np.exp(2j * np.pi * rng.random(200))
+        z[5] = 0
+        data = as_trace([Datapoint(1000000 + 1000 * i, v.real, v.imag)
+                         for i, v in enumerate(z)])
+        derived = derive(data)
+        logmag = LogMagChart("test")
+        vswr = VSWRChart("test")
+        vswr.logarithmicY = True
+        ri = RealImaginaryChart("test")
+        for chart, y_positions, y_function, values in (
+                (logmag, None, None, logmag.logMags),
+                (vswr, None, None, vswr.vswrs),
+                (QualityFactorChart("test"), None, None,
+                 lambda d: d.qFactor()),
+                (ri, ri.getReYPositions, ri.getReYPosition,
+                 lambda d: d.impedance().real),
+                (ri, ri.getImYPositions, ri.getImYPosition,
+                 lambda d: d.impedance().imag)):
+            chart.resize(400, 300)
+            chart.bands = mock.Mock(enabled=False)
+            chart.setData(data)
+            chart.grab()
+            y_positions = y_positions or chart.getYPositions
+            y_function = y_function or chart.getYPosition
+            expected = [np.nan if y is None else y
+                        for y in map(y_function, data)]
+            np.testing.assert_array_equal(y_positions(values(derived)),
+                                          expected)
+
+    def test_trace_renderer(self):
+        widget = Widget()
+        self.assertNotEqual(widget.grab().toImage().pixelColor(3, 5), RED)
+        self.assertEqual(widget.renderer.serial, 1)
+        image = widget.rendered()
+        self.assertEqual(widget.renderer.shown, 1)
+        self.assertEqual(image.pixelColor(3, 5), RED)
+        self.assertEqual(widget.renderer.serial, 1)
+        widget.y = 7
+        widget.grab()
+        self.assertEqual(widget.renderer.serial, 2)
+        image = widget.rendered()
+        self.assertEqual(image.pixelColor(3, 7), RED)
+        self.assertNotEqual(image.pixelColor(3, 5), RED)
+        frames = []
+        widget.renderer.finished.connect(
+            lambda *args: frames.append(args), QtCore.Qt.DirectConnection)
+        RenderJob(widget.renderer, 1, (12, 12, 1.0), []).run()
+        self.assertEqual(frames, [])
+        widget.renderer.show(1, QtGui.QImage())
+        self.assertEqual(widget.renderer.shown, 2)
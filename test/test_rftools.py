@@ -19,13 +19,15 @@
 import math
 import unittest
 
+import numpy as np
+
 # Import targets to be tested
 from NanoVNASaver.RFTools import Datapoint, \
     norm_to_impedance, impedance_to_norm, \
     reflection_coefficient, gamma_to_impedance, clamp_value, \
     parallel_to_serial, serial_to_parallel, \
     impedance_to_capacitance, impedance_to_inductance, \
-    groupDelay, corr_att_data
+    groupDelay, group_delay, corr_att_data
 
 
 class TestRFTools(unittest.TestCase):
@@ -121,6 +123,31 @@ class TestRFTools(unittest.TestCase):
         self.assertAlmostEqual(groupDelay(dpoints, 1), -9.514e-5)
         self.assertEqual(groupDelay(dpoints0, 1), 0.0)
 
+    def test_group_delay(self):
+        # 20 ns delay on a non uniform grid, the phase wraps around
+        freq = np.array([1e6, 2e6, 4e6, 5e6, 9e6, 10e6, 30e6, 31e6, 40e6])
+        phase = np.angle(np.exp(-1j * math.tau * freq * 20e-9))
+        np.testing.assert_allclose(group_delay(freq, phase), 20e-9)
+        np.testing.assert_allclose(group_delay(freq, phase, 3), 20e-9)
+        data = [Datapoint(int(f), math.cos(p), math.sin(p))
+                for f, p in zip(freq, phase)]
+        delays = group_delay(freq, phase, 2)
+        for i, delay in enumerate(delays):
+            self.assertAlmostEqual(groupDelay(data, i, 2), delay)
+        self.assertEqual(group_delay([5, 5], [0.1, 0.2]).tolist(), [0, 0])
+        self.assertEqual(len(group_delay([], [])), 0)
+        with self.assertRaises(ValueError):
+            group_delay(freq, phase, 0)
+
+    def test_group_delay_aperture(self):
+        freq = np.arange(100) * 1e6
+        noise = np.resize([0.01, -0.01], 100)
+        phase = -math.tau * freq * 5e-9 + noise
+        raw = group_delay(freq, phase)
+        smooth = group_delay(freq, phase, 5)
+        self.assertLess(np.ptp(smooth[5:-5]), np.ptp(raw[1:-1]) / 4)
+        self.assertAlmostEqual(smooth[50], 5e-9)
+
     def test_cor_att_data(self):
         dp1 = [
             Datapoint(100000, 0.1091, 0.3118),
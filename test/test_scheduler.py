@@ -0,0 +1,115 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+
+from PyQt5 import QtWidgets, sip
+from PyQt5.QtTest import QTest
+
+# Import targets to be tested
+from NanoVNASaver.Scheduler import RenderScheduler
+
+
+class FakeChart(QtWidgets.QWidget):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+        self.updates = 0
+
+    def setData(self, data):
+        self.calls.append(("setData", data))
+
+    def resetReference(self):
+        self.calls.append(("resetReference",))
+
+    def update(self):
+        self.updates += 1
+
+
+class TestCases(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = (QtWidgets.QApplication.instance() or
+                   QtWidgets.QApplication([]))
+
+    def setUp(self):
+        self.scheduler = RenderScheduler(max_rate=0)
+        self.shown = FakeChart()
+        self.hidden = FakeChart()
+        for chart in (self.shown, self.hidden):
+            self.scheduler.add(chart)
+        self.shown.show()
+
+    def tearDown(self):
+        self.shown.close()
+
+    def test_unchanged_inputs(self):
+        chart = self.shown
+        data = [1, 2]
+        self.scheduler.setInputs(chart, "data", chart.setData, data)
+        self.scheduler.setInputs(chart, "data", chart.setData, data)
+        self.assertEqual(chart.calls, [("setData", data)])
+        self.scheduler.setInputs(chart, "data", chart.setData, [1, 2])
+        self.assertEqual(len(self.shown.calls), 2)
+        self.scheduler.setInputs(
+            self.shown, "reference", self.shown.resetReference)
+        self.assertEqual(self.shown.calls[-1], ("resetReference",))
+
+    def test_hidden(self):
+        first, second = [1], [2]
+        for data in (first, second):
+            self.scheduler.setInputs(
+                self.hidden, "data", self.hidden.setData, data)
+        self.scheduler.update(self.hidden)
+        self.assertEqual(self.hidden.calls, [])
+        self.assertEqual(self.hidden.updates, 0)
+        self.hidden.show()
+        self.assertEqual(self.hidden.calls, [("setData", second)])
+        self.hidden.close()
+        copy = FakeChart()
+        self.scheduler.setInputs(
+            self.hidden, "data", self.hidden.setData, first)
+        self.scheduler.add(copy, self.hidden)
+        copy.show()
+        self.assertEqual(copy.calls, [("setData", first)])
+        copy.close()
+
+    def test_remove(self):
+        self.scheduler.setInputs(
+            self.hidden, "data", self.hidden.setData, [1])
+        self.scheduler.remove(self.hidden)
+        self.assertNotIn(self.hidden, self.scheduler.pending)
+        deleted = FakeChart()
+        self.scheduler.add(deleted)
+        self.scheduler.setInputs(deleted, "data", deleted.setData, [1])
+        self.scheduler.update(deleted)
+        sip.delete(deleted)
+        self.scheduler.run()
+        self.assertNotIn(deleted, self.scheduler.pending)
+        self.assertNotIn(deleted, self.scheduler.dirty)
+
+    def test_rate(self):
+        self.scheduler.max_rate = 20
+        self.scheduler.update(self.shown)
+        self.assertEqual(self.shown.updates, 1)
+        self.scheduler.update(self.shown)
+        self.scheduler.update(self.shown)
+        self.assertEqual(self.shown.updates, 1)
+        QTest.qWait(100)
+        self.assertEqual(self.shown.updates, 2)
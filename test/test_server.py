@@ -0,0 +1,127 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+# Import targets to be tested
+from NanoVNASaver.Hardware.Emulator import Emulator
+from NanoVNASaver import Server
+from NanoVNASaver.Server import AutomationClient, UnixHTTPConnection
+
+
+@unittest.skipUnless(Server.AVAILABLE, "needs Unix sockets")
+class TestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Emulator()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmpdir.name, "nanovna.sock")
+        self.server = Server.AutomationServer(path)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.client = AutomationClient(path, timeout=20)
+        self.path = path
+
+    def status(self, method: str, url: str, body: bytes) -> int:
+        conn = UnixHTTPConnection(self.path, 20)
+        try:
+            conn.request(method, url, body=body)
+            response = conn.getresponse()
+            self.assertIn("error", json.loads(response.read()))
+            return response.status
+        finally:
+            conn.close()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        self.emulator.close()
+        self.tmpdir.cleanup()
+
+    def test_sweep(self):
+        info = self.client.connect(self.emulator.port)
+        self.assertEqual(info["name"], "NanoVNA-H")
+        self.assertEqual(self.client.configure(
+            27000000, 30000000, segments=2)["points"], 202)
+        self.client.load_calibration("./test/data/sol_27_30.cal")
+        self.assertEqual(self.client.run()["points"], 202)
+        freq, s11, s21 = self.client.results()
+        self.assertEqual(len(freq), 202)
+        self.assertEqual(freq[0], 27000000)
+        self.assertEqual(freq.dtype, np.int64)
+        self.assertEqual(s11.dtype, np.complex128)
+        self.assertTrue(np.all(np.abs(s21) > 0))
+        self.client.disconnect()
+
+    def test_errors(self):
+        with self.assertRaises(IOError) as cm:
+            self.client.run()
+        self.assertIn("not connected", str(cm.exception))
+        self.client.connect(self.emulator.port)
+        with self.assertRaises(IOError):
+            self.client.configure(1000000, 30000000, points=77)
+        with self.assertRaises(IOError):
+            self.client.request("GET", "/nothing")
+
+    def test_bad_requests(self):
+        self.assertEqual(self.status("GET", "/results", b""), 409)
+        self.client.connect(self.emulator.port)
+        self.assertEqual(self.status("GET", "/results", b""), 409)
+        for body in (b"{", b"[1]", b'{"stop": 30000000}',
+                     b'{"start": 1000000, "stop": 30000000, "foo": 1}',
+                     b'{"start": "x", "stop": 30000000}',
+                     b'{"start": 30000000, "stop": 1000000}'):
+            self.assertEqual(self.status("POST", "/sweep", body), 400)
+        self.assertEqual(self.status("POST", "/run", b'{"now": 1}'), 400)
+
+    def test_socket_path(self):
+        with self.assertRaises(IOError):
+            Server.AutomationServer(self.path)  # in use
+        path = os.path.join(self.tmpdir.name, "file")
+        with open(path, "w") as file:
+            file.write("keep")
+        with self.assertRaises(IOError):
+            Server.AutomationServer(path)
+        self.assertTrue(os.path.exists(path))
+        path = os.path.join(self.tmpdir.name, "stale.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+        server = Server.AutomationServer(path)
+        server.server_close()
+
+    def test_queued(self):
+        self.client.connect(self.emulator.port)
+        self.client.configure(1000000, 30000000)
+        results = []
+        clients = [threading.Thread(
+            target=lambda: results.append(self.client.run()["points"]))
+            for _ in range(3)]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        self.assertEqual(results, [101] * 3)
@@ -0,0 +1,55 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+
+# Import targets to be tested
+from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.Snapshot import Snapshot
+
+
+class TestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.s11 = [Datapoint(1000000 + i, 0.1 * i, -0.1) for i in range(5)]
+        self.s21 = [Datapoint(1000000 + i, 0.5, 0.01 * i) for i in range(5)]
+
+    def test_versions(self):
+        first = Snapshot(self.s11, self.s21, "test")
+        second = Snapshot(self.s11, self.s21)
+        self.assertGreater(second.version, first.version)
+        self.assertEqual(len(first), 5)
+        self.assertEqual(first.source, "test")
+
+    def test_immutable(self):
+        snapshot = Snapshot(self.s11, self.s21)
+        self.s11.pop()
+        self.assertEqual(len(snapshot.s11), 5)
+        self.assertIsInstance(snapshot.s11, tuple)
+        with self.assertRaises(AttributeError):
+            snapshot.data = []
+
+    def test_arrays(self):
+        snapshot = Snapshot(self.s11, self.s21)
+        self.assertEqual(snapshot.freq[4], 1000004)
+        self.assertAlmostEqual(snapshot.z11[2], 0.2 - 0.1j)
+        self.assertAlmostEqual(snapshot.z21[3], 0.5 + 0.03j)
+        self.assertIs(snapshot.z11, snapshot.z11)
+        with self.assertRaises(ValueError):
+            snapshot.z11[0] = 0
+        self.assertEqual(len(Snapshot().z21), 0)
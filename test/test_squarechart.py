@@ -0,0 +1,75 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+
+from PyQt5 import QtWidgets
+
+# Import targets to be tested
+from NanoVNASaver.Charts import PolarChart, SmithChart
+from NanoVNASaver.RFTools import Datapoint
+
+
+def sweep(start: int, values) -> list:
+    return [Datapoint(start + 1000 * i, re, im)
+            for i, (re, im) in enumerate(values)]
+
+
+class TestCases(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = (QtWidgets.QApplication.instance() or
+                   QtWidgets.QApplication([]))
+
+    def chart(self, cls):
+        chart = cls("test")
+        chart.resize(290, 290)
+        return chart
+
+    def test_pixels(self):
+        chart = self.chart(SmithChart)
+        pixels = chart.pixels(sweep(1000, [(0, 0), (1, 0), (0, 1), (-1, -1)]))
+        self.assertEqual(pixels.tolist(), [
+            complex(145, 145), complex(270, 145),
+            complex(145, 20), complex(20, 270)])
+        data = sweep(1000, [(0.3, -0.7)])
+        pixel = chart.pixels(data)[0]
+        self.assertEqual(chart.getPosition(data[0]),
+                         (int(pixel.real), int(pixel.imag)))
+
+    def test_lines(self):
+        for cls in (PolarChart, SmithChart):
+            chart = self.chart(cls)
+            chart.setData(sweep(1000, [(0.5, 0.5), (0.5, -0.5)]))
+            points = chart.grab().toImage()
+            chart.setDrawLines(True)
+            lines = chart.grab().toImage()
+            self.assertNotEqual(points.pixelColor(207, 120),
+                                lines.pixelColor(207, 120))
+
+    def test_reference_range(self):
+        chart = self.chart(SmithChart)
+        chart.setData(sweep(2000, [(0, 0)]))
+        background = chart.grab().toImage()
+        # only the middle point is within the sweep
+        chart.setReference(sweep(1000, [(0.5, 0), (0, 0.5), (-0.5, 0)]))
+        image = chart.grab().toImage()
+        for x, y in ((144, 82), (206, 144), (81, 144)):
+            unchanged = image.pixelColor(x, y) == background.pixelColor(x, y)
+            self.assertEqual(unchanged, (x, y) != (144, 82))
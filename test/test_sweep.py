@@ -17,9 +17,10 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import unittest
+from unittest import mock
 
 # Import targets to be tested
-from NanoVNASaver.Settings.Sweep import Sweep, Properties
+from NanoVNASaver.Settings.Sweep import Sweep, Properties, device_grid
 
 class TestCases(unittest.TestCase):
 
@@ -35,12 +36,42 @@ class TestCases(unittest.TestCase):
         self.assertEqual(sweep.get_index_range(1), (12429117, 21170817))
         data = list(sweep.get_frequencies())
         self.assertEqual(data[0], 3600000)
-        self.assertEqual(data[-1], 29913383)
+        self.assertEqual(data[-1], 29999934)
+        self.assertEqual(data[100], 12341700)
+        self.assertEqual(data[101], 12429117)
         sweep = Sweep(segments=3, properties=Properties(logarithmic=True))
         self.assertEqual(sweep.get_index_range(1), (9078495, 16800000))
         data = list(sweep.get_frequencies())
         self.assertEqual(data[0], 3600000)
-        self.assertEqual(data[-1], 29869307)
+        self.assertEqual(data[-1], 30000000)
+        self.assertEqual(len(data), 303)
 
         sweep2 = sweep.copy()
         self.assertEqual(sweep, sweep2)
+        self.assertIs(sweep.plan, sweep2.plan)
+        self.assertEqual(sweep.plan.segment(1)[0], 9078495)
+        self.assertEqual(sweep.plan.segment(1)[-1], 16800000)
+        self.assertEqual(sweep.plan.slice(2), slice(202, 303))
+
+    def test_plan_cache(self):
+        sweep = Sweep(segments=50)
+        plan = sweep.plan
+        with mock.patch.object(Sweep, "get_index_range") as get_range:
+            for i in range(sweep.segments):
+                self.assertIs(sweep.plan, plan)
+            get_range.assert_not_called()
+        sweep.end = 20000000
+        self.assertEqual(sweep.plan.frequencies[-1],
+                         sweep.get_index_range(49)[1])
+        sweep.properties = Properties(logarithmic=True)
+        self.assertEqual(sweep.plan.frequencies[-1], 20000000)
+
+    def test_device_grid(self):
+        for start, stop, points in ((50000, 900000000, 101),
+                                    (1000000, 1000100, 101),
+                                    (3600000, 30000000, 1023)):
+            self.assertEqual(
+                device_grid(start, stop, points).tolist(),
+                [start + (stop - start) * i // (points - 1)
+                 for i in range(points)])
+        self.assertEqual(device_grid(1000, 2000, 1).tolist(), [1000])
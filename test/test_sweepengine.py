@@ -0,0 +1,264 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import math
+import unittest
+
+import numpy as np
+
+# Import targets to be tested
+from NanoVNASaver.Hardware.Emulator import resonator
+from NanoVNASaver.Hardware.VNA import parse_values
+from NanoVNASaver.Settings.Sweep import Properties, Sweep, SweepMode
+from NanoVNASaver.core import SweepEngine
+from NanoVNASaver.core.SweepEngine import (
+    Averager, bad_windows, ema_update, to_complex, truncate)
+
+
+class FakeVNA:
+    """Serves values derived from the frequency, corrupting the
+    points listed in glitches on the first full read"""
+    features = {"Customizable data points"}
+    valid_datapoints = (101, 51, 11)
+    validateInput = True
+
+    def __init__(self, glitches=()):
+        self.datapoints = 101
+        self.glitches = set(glitches)
+        self.sweeps = []
+
+    def connected(self):
+        return True
+
+    def resetSweep(self, start, stop):
+        self.sweeps.append((start, stop, self.datapoints))
+
+    def setSweep(self, start, stop):
+        self.sweeps.append((start, stop, self.datapoints))
+
+    def readFrequencies(self):
+        start, stop, points = self.sweeps[-1]
+        step = (stop - start) / (points - 1)
+        return [round(start + i * step) for i in range(points)]
+
+    def readValues(self, value):
+        freqs = self.readFrequencies()
+        lines = [f"{f / 1e9} {-f / 1e9}" for f in freqs]
+        if value == "data 1" and len(freqs) == 101:
+            for i in self.glitches:
+                lines[i] = "12.0 0.0"
+            self.glitches = set()
+        return lines
+
+
+class ResonatorVNA(FakeVNA):
+    def readValues(self, value):
+        channel = int(value[-1])
+        return [f"{v.real} {v.imag}" for v in (
+            resonator(f, l=100e-6, c=1.27e-12)[channel]
+            for f in self.readFrequencies())]
+
+
+class BandwidthVNA(FakeVNA):
+    """Fails reading the segments listed in failures"""
+    features = {"Customizable data points", "Bandwidth"}
+
+    def __init__(self, failures=()):
+        super().__init__()
+        self.bandwidth = 1000
+        self.failures = set(failures)
+
+    def get_bandwidths(self):
+        return [10, 100, 1000]
+
+    def set_bandwidth(self, bandwidth):
+        self.bandwidth = bandwidth
+
+    def readValues(self, value):
+        if len(self.sweeps) in self.failures:
+            raise IOError("read failed")
+        return [f"{1e-4} 0.0"] * self.datapoints
+
+
+class FakeCalibration:
+    isCalculated = False
+
+
+def engine(vna):
+    saved = []
+    result = SweepEngine(
+        vna, FakeCalibration(),
+        on_data=lambda data11, data21: saved.append((data11[:], data21[:])))
+    return result, saved
+
+
+class TestCases(unittest.TestCase):
+
+    def test_parse_values(self):
+        values, bad = parse_values(["0.5 -0.5", "10 0", "x y", "1"], True)
+        self.assertEqual(values[0], (0.5, -0.5))
+        self.assertEqual(bad, [1, 2, 3])
+        self.assertTrue(math.isnan(values[1][0]))
+        values, bad = parse_values(["0.5 -0.5", "10 0"])
+        self.assertEqual(values, [(0.5, -0.5), (10.0, 0.0)])
+        self.assertEqual(bad, [])
+
+    def test_bad_windows(self):
+        self.assertEqual(list(bad_windows([], 11, 101)), [])
+        self.assertEqual(list(bad_windows([3, 5, 13, 14], 11, 101)),
+                         [(3, 14), (14, 25)])
+        self.assertEqual(list(bad_windows([99, 100], 11, 101)), [(90, 101)])
+
+    def test_truncate(self):
+        values = np.array([[1, 1j], [1.1, 5j], [0.9, 1j], [9, 1.1j]])
+        result = truncate(values, 2)
+        self.assertEqual(result.shape, (2, 2))
+        self.assertEqual(sorted(result[:, 0].real), [1, 1.1])
+        self.assertEqual(sorted(result[:, 1].imag), [1, 1.1])
+        self.assertIs(truncate(values, 4), values)
+
+    def test_averager(self):
+        reads = [to_complex([(i, -i), (2 * i, 0)]) for i in range(1, 5)]
+        averager = Averager(4)
+        for read in reads:
+            self.assertFalse(averager.complete)
+            averager.add(read)
+        self.assertTrue(averager.complete)
+        np.testing.assert_allclose(averager.mean(), [2.5 - 2.5j, 5])
+        averager = Averager(4, 2)
+        for read in reads:
+            averager.add(read)
+        np.testing.assert_allclose(averager.mean(), [2.5 - 2.5j, 5])
+
+    def test_ema_update(self):
+        buffer = np.zeros(4, dtype=complex)
+        view = ema_update(buffer, 2, np.array([1 + 1j, 2]), 0.5, False)
+        np.testing.assert_allclose(buffer, [0, 0, 1 + 1j, 2])
+        ema_update(buffer, 2, np.array([3 + 1j, 0]), 0.5, True)
+        np.testing.assert_allclose(view, [2 + 1j, 1])
+        np.testing.assert_allclose(buffer[:2], [0, 0])
+
+    def test_partial_reread(self):
+        vna = FakeVNA(glitches=(0, 4, 50, 100))
+        worker, _ = engine(vna)
+        freq, values11, values21 = worker.readSegment(1000000, 101000000)
+        self.assertEqual(len(freq), 101)
+        for f, v in zip(freq, values21):
+            self.assertAlmostEqual(v[0], f / 1e9)
+        self.assertEqual(worker.retries["bad_points"], 4)
+        self.assertEqual(worker.retries["partial"], 3)
+        self.assertEqual(worker.retries["full"], 0)
+        self.assertEqual(vna.sweeps[-1], (1000000, 101000000, 101))
+        self.assertEqual(vna.sweeps[1], (1000000, 11000000, 11))
+
+    def test_full_reread(self):
+        vna = FakeVNA(glitches=range(0, 101, 2))
+        worker, _ = engine(vna)
+        _, _, values21 = worker.readSegment(1000000, 101000000)
+        self.assertEqual(worker.retries["partial"], 0)
+        self.assertEqual(worker.retries["full"], 1)
+        self.assertFalse(any(math.isnan(v[0]) for v in values21))
+
+    def test_pipeline(self):
+        vna = FakeVNA()
+        sweep = Sweep(1000000, 21000000, segments=2, properties=Properties(
+            mode=SweepMode.AVERAGE, averages=(3, 1)))
+        worker, saved = engine(vna)
+        worker.s21att = 20
+        worker.run(sweep)
+        self.assertEqual(len(saved), 2)
+        data11, data21 = saved[-1]
+        self.assertEqual(len(data11), 202)
+        for dp11, dp21 in zip(data11, data21):
+            self.assertAlmostEqual(dp11.re, dp11.freq / 1e9)
+            self.assertAlmostEqual(dp21.re, dp21.freq / 1e8)
+        self.assertEqual(worker.percentage, 100)
+        self.assertEqual(len(worker.history), 1)
+        np.testing.assert_allclose(worker.history[-1][1],
+                                   [dp.z for dp in data21])
+        self.assertIn("acquisition", worker.timing)
+        self.assertIn("processing", worker.timing)
+
+    def test_adaptive(self):
+        vna = ResonatorVNA()
+        sweep = Sweep(1000000, 30000000, properties=Properties(
+            mode=SweepMode.ADAPTIVE))
+        worker, saved = engine(vna)
+        worker.run(sweep)
+        data11, _ = saved[-1]
+        freqs = [dp.freq for dp in data11]
+        self.assertGreater(len(freqs), 101)
+        self.assertEqual(freqs, sorted(set(freqs)))
+        dense = [f for f in freqs if 13000000 < f < 15000000]
+        self.assertGreater(len(dense), 20)
+        self.assertEqual(worker.percentage, 100)
+
+    def test_bandwidth_restore(self):
+        vna = BandwidthVNA()
+        sweep = Sweep(1000000, 21000000, segments=2, properties=Properties(
+            adaptive_bandwidth=True))
+        worker, _ = engine(vna)
+        worker.run(sweep)
+        self.assertEqual(vna.bandwidth, 1000)
+        vna.bandwidth = 100  # changed by the user between sweeps
+        vna.failures = {len(vna.sweeps) + 2}
+        worker.run(sweep)
+        self.assertTrue(worker.error_message)
+        self.assertEqual(worker.scheduler.default, 100)
+        self.assertEqual(vna.bandwidth, 100)
+
+    def test_measure(self):
+        sweep = Sweep(1000000, 11000000, properties=Properties(
+            mode=SweepMode.CONTINOUS))
+        worker, _ = engine(FakeVNA())
+        data11, data21 = worker.measure(sweep)
+        self.assertEqual(len(data11), 101)
+        self.assertEqual(len(data21), 101)
+        self.assertEqual(data11[-1].freq, 11000000)
+        self.assertEqual(sweep.properties.mode, SweepMode.CONTINOUS)
+        worker.offsetDelay = 1e-9
+        data11, _ = worker.recalibrate()
+        self.assertNotAlmostEqual(data11[-1].re, 0.011)
+        self.assertEqual(worker.rawData11[-1].re, 0.011)
+
+    def test_measure_error(self):
+        vna = FakeVNA()
+        vna.readFrequencies = lambda: 1 / 0
+        worker, _ = engine(vna)
+        with self.assertRaises(IOError):
+            worker.measure(Sweep(1000000, 11000000))
+        self.assertFalse(worker.running)
+
+    def test_measure_incomplete(self):
+        sweep = Sweep(1000000, 11000000)
+        worker, _ = engine(None)
+        self.assertRaises(IOError, worker.measure, sweep)
+        vna = FakeVNA()
+        vna.connected = lambda: False
+        worker, _ = engine(vna)
+        self.assertRaises(IOError, worker.measure, sweep)
+        vna = FakeVNA()
+        worker, _ = engine(vna)
+        read = vna.readFrequencies
+
+        def stop():
+            worker.stopped = True
+            return read()
+        vna.readFrequencies = stop
+        self.assertRaises(IOError, worker.measure,
+                          Sweep(1000000, 21000000, segments=2))
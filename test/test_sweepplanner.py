@@ -0,0 +1,63 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+
+import numpy as np
+
+# Import targets to be tested
+from NanoVNASaver.Hardware.Emulator import resonator
+from NanoVNASaver.SweepPlanner import AdaptivePlanner, interval_scores
+
+
+def trace(freq, **kwargs):
+    values = np.array([resonator(f, **kwargs) for f in freq])
+    return values[:, 0], values[:, 1]
+
+
+class TestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.freq = np.linspace(1000000, 30000000, 101).astype(int)
+
+    def test_scores(self):
+        s11, s21 = trace(self.freq, l=100e-6, c=1.27e-12)
+        score = interval_scores(s11, s21)
+        self.assertEqual(len(score), 100)
+        peak = self.freq[np.argmax(score)]
+        self.assertAlmostEqual(peak / 1e6, 14.1, delta=0.5)
+
+    def test_plan(self):
+        s11, s21 = trace(self.freq, l=100e-6, c=1.27e-12)
+        ranges = AdaptivePlanner(101).plan(self.freq, s11, s21)
+        self.assertEqual(len(ranges), 1)
+        start, stop = ranges[0]
+        self.assertLess(start, 14122717)
+        self.assertGreater(stop, 14122717)
+
+    def test_flat(self):
+        flat = np.full(101, 0.5 + 0j)
+        self.assertEqual(AdaptivePlanner().plan(self.freq, flat, flat), [])
+        self.assertEqual(AdaptivePlanner().plan(self.freq[:2], flat[:2],
+                                                flat[:2]), [])
+
+    def test_widen(self):
+        planner = AdaptivePlanner(101)
+        self.assertEqual(planner._widen(1000, 1010, 0, 10000), (955, 1055))
+        self.assertEqual(planner._widen(10, 20, 0, 10000), (0, 100))
+        self.assertEqual(planner._widen(9990, 9995, 0, 10000), (9900, 10000))
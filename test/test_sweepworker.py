@@ -0,0 +1,70 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import unittest
+
+from PyQt5 import QtCore
+
+# Import targets to be tested
+from NanoVNASaver.Settings.Sweep import Sweep
+from NanoVNASaver.SweepWorker import SweepWorker
+from test.test_sweepengine import FakeCalibration, FakeVNA
+
+
+class FakeApp:
+    def __init__(self, sweep):
+        self.sweep = sweep
+        self.saved = []
+
+    def saveData(self, data11, data21):
+        self.saved.append((data11[:], data21[:]))
+
+
+class TestCases(unittest.TestCase):
+
+    def test_run(self):
+        app = FakeApp(Sweep(1000000, 21000000, segments=2))
+        worker = SweepWorker(app)
+        worker.engine.vna = FakeVNA()
+        worker.engine.calibration = FakeCalibration()
+        changed = []
+        finished = []
+        worker.signals.dataChanged.connect(
+            lambda start, stop: changed.append((start, stop)),
+            QtCore.Qt.DirectConnection)
+        worker.signals.finished.connect(lambda: finished.append(True))
+        worker.run()
+        self.assertEqual(changed, [(0, 101), (101, 202)])
+        self.assertEqual(finished, [True])
+        self.assertEqual(len(app.saved[-1][0]), 202)
+        self.assertEqual(worker.percentage, 100)
+        worker.engine.percentage = 100 / 3
+        self.assertIsInstance(worker.percentage, int)
+        self.assertFalse(worker.running)
+
+    def test_error(self):
+        app = FakeApp(Sweep(1000000, 21000000))
+        worker = SweepWorker(app)
+        worker.engine.vna = FakeVNA()
+        worker.engine.vna.readFrequencies = lambda: 1 / 0
+        errors = []
+        worker.signals.sweepError.connect(lambda: errors.append(True))
+        worker.run()
+        self.assertEqual(errors, [True])
+        self.assertTrue(worker.stopped)
+        self.assertIn("division by zero", worker.error_message)
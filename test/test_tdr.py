@@ -0,0 +1,99 @@
+#  NanoVNASaver
+#
+#  A python program to view and export Touchstone data from a NanoVNA
+#  Copyright (C) 2019, 2020  Rune B. Broberg
+#  Copyright (C) 2020 NanoVNA-Saver Authors
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import math
+import unittest
+from unittest import mock
+
+import numpy as np
+import scipy.signal as signal
+
+# Import targets to be tested
+from NanoVNASaver.Derived import as_trace
+from NanoVNASaver.RFTools import Datapoint
+from NanoVNASaver.core import TDREngine
+from NanoVNASaver.core.TDR import SPEED_OF_LIGHT, blackman
+
+
+def open_line(length: float, velocity: float = 0.66, points: int = 101):
+    """S11 of an open ended lossless line"""
+    delay = 2 * length / (velocity * SPEED_OF_LIGHT)
+    return as_trace([
+        Datapoint(int(f), math.cos(-math.tau * f * delay),
+                  math.sin(-math.tau * f * delay))
+        for f in np.linspace(50e3, 300e6, points)])
+
+
+class TestCases(unittest.TestCase):
+
+    def test_cable_length(self):
+        engine = TDREngine()
+        result = engine.transform(open_line(10))
+        distance = result.distance_axis(0.66)
+        self.assertAlmostEqual(
+            distance[np.argmax(result.td)] / 2, 10, delta=0.1)
+        self.assertEqual(len(result.td), 2**14)
+
+    def test_step_response(self):
+        data = open_line(3)
+        result = TDREngine(2**12).transform(data)
+        s11 = np.array([complex(d.re, d.im) for d in data])
+        td = np.abs(np.fft.ifft(np.blackman(len(s11)) * s11, 2**12))
+        np.testing.assert_allclose(result.td, td, atol=1e-12)
+        np.testing.assert_allclose(
+            result.step_response,
+            signal.convolve(td, np.ones(2**12))[:2**12], atol=1e-9)
+
+    def test_cache(self):
+        engine = TDREngine(2**12)
+        data = open_line(5)
+        self.assertIsNone(engine.cached(data))
+        result = engine.transform(data)
+        self.assertIs(engine.cached(data), result)
+        self.assertIs(engine.transform(data), result)
+        self.assertIsNone(engine.cached(open_line(5)))
+        engine.fft_points = 2**13
+        self.assertIsNone(engine.cached(data))
+        self.assertEqual(len(engine.transform(data).td), 2**13)
+        self.assertIs(blackman(101), blackman(101))
+
+    def test_settings_changed_meanwhile(self):
+        engine = TDREngine(2**12)
+        data = open_line(5)
+        ifft = np.fft.ifft
+
+        def change_settings(*args, **_kwargs):
+            engine.fft_points = 2**13
+            engine.ref_impedance = 75
+            return ifft(*args)
+
+        with mock.patch("scipy.fft.ifft", change_settings):
+            result = engine.transform(data)
+        self.assertEqual(len(result.td), 2**12)
+        self.assertEqual(len(result.time_axis), 2**12)
+        step = result.step_response[:10]
+        np.testing.assert_allclose(result.step_response_Z[:10],
+                                   50 * (1 + step) / (1 - step))
+        self.assertIsNone(engine.cached(data))
+
+    def test_invalid(self):
+        engine = TDREngine()
+        with self.assertRaises(ValueError):
+            engine.transform(open_line(1, points=1))
+        with self.assertRaises(ValueError):
+            engine.transform([Datapoint(1000, 1, 0)] * 3)